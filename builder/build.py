@@ -1,221 +1,722 @@
 from functools import reduce
 import itertools
 import logging
-from xml.dom.minidom import Element
 import requests
 import pandas
+import pyarrow
+import pyarrow.ipc
+import pyarrow.parquet
+import openpyxl
 import json
 from jsmin import jsmin
 import sys
 import re
-import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from typing import Iterable, Iterator, Optional
 import regex
 import pathlib
-import random
+import hashlib
+import os
+import tempfile
+import threading
+import time
+import concurrent.futures
+import functools
+import pickle
+import heapq
+import contextlib
+import cProfile
+import tracemalloc
+import gzip
+import brotli
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from thai_address.collation import thai_sort_key
+import thai_address
+from thai_address.binary import encode_binary
+from thai_address.columnar import decode_columnar, encode_columnar
+from thai_address.addresses import (
+    address_zip,
+    district_name,
+    parse_address,
+    province_name,
+    subdistrict_name,
+)
+from thai_address.delta import diff_flattened
+from thai_address.fuzzy import encode_match_index
+from thai_address.shards import (
+    encode_shard,
+    encode_shard_manifest,
+    flatten_province,
+    shard_file_name,
+)
+from thai_address.sqlite import encode_sqlite
+from thai_address.streets import STREET_ZIPS_FORMAT_VERSION
 
 TUMBON_RESOURCE_URL = "https://stat.bora.dopa.go.th/dload/ccaatt.xlsx"
 ZIP_RESOURCE_URL = "https://th.wikipedia.org/wiki/รายการรหัสไปรษณีย์ไทย"
 RECENTLY_BUILT_INDEX = (
     "https://raw.githubusercontent.com/chonla/thai-address/master/index.ts"
 )
-WORKING_FILE_TUMBON = "_tmp.xlsx"
-WORKING_FILE_ZIP = "_tmp.json"
+ZIP_RESOURCE_CHUNK_SIZE = 65536
+ZIP_TABLE_START = re.compile(r"<table\b", re.IGNORECASE)
+ZIP_TABLE_SKIPPED_TAGS = ("sup", "style", "script")
+EXCEPTIONAL_ZIPS_CACHE_SIZE = 8192
+EXCEPTIONAL_POST_OFFICE = re.compile(r"\(ไปรษณีย์[^\)]+\)")
+EXCEPTIONAL_RULE_SEPARATOR = re.compile(r"[−\-–] ")
+EXCEPTIONAL_RULE = re.compile(r"(.*)ใช้รหัส (\d{5})")
+EXCEPTIONAL_SUBDISTRICT = re.compile(r"(?:^|\s|และ)(?:ตำบล|แขวง)((?:(?!และ)\S)+)")
+EXCEPTIONAL_SUBDISTRICT_NAME = re.compile(r"(?:ตำบล|แขวง)(.+)")
+EXCEPTIONAL_STREET = re.compile(
+    r"(?:^|\s|และ)(?:ตำบล|แขวง)((?:(?!และ)\S)+)\s+เฉพาะ((?:ซอย|ถนน)\S+)"
+    r"\s+(\d+(?:\s*-\s*\d+)?(?:\s*,\s*\d+(?:\s*-\s*\d+)?)*)"
+)
+EXCEPTIONAL_STREET_NUMBERS = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+CACHE_DIR = ".cache/"
+CACHE_INDEX_FILE = "index.json"
+STAGE_CACHE_DIR = "stages/"
+OUTPUT_MANIFEST_FILE = "outputs.json"
+PRECOMPRESSED_SUFFIXES = (".gz", ".br")
+CHECKSUM_SUFFIX = ".sha256"
+EXPORT_BUFFER_SIZE = 65536
+SORT_RUN_SIZE = 65536
+# precompressed files are built once and served many times, so use the
+# slowest, smallest settings
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
 STRUCTURED_RESULT_FILE = "structured_data.json"
 FLATTENED_RESULT_FILE = "flattened_data.json"
+COLUMNAR_RESULT_FILE = "columnar_data.json"
+BINARY_RESULT_FILE = "thai_address.bin"
+SQLITE_RESULT_FILE = "thai_address.sqlite"
+PARQUET_RESULT_FILE = "flattened_data.parquet"
+ARROW_RESULT_FILE = "flattened_data.arrow"
+PARQUET_COMPRESSION = "zstd"
+# records per parquet row group and arrow record batch
+ARROW_BATCH_SIZE = 65536
+# names, zips and parent codes repeat across subdistricts, so they are stored
+# once in a dictionary and read back as pandas categoricals
+ARROW_DICTIONARY_COLUMNS = [
+    "province",
+    "district",
+    "subdistrict",
+    "zip",
+    "districtCode",
+    "provinceCode",
+]
+ARROW_COLUMNS = [
+    "province",
+    "district",
+    "subdistrict",
+    "zip",
+    "subdistrictCode",
+    "districtCode",
+    "provinceCode",
+]
+STREET_ZIPS_RESULT_FILE = "street_zips.json"
+MATCH_INDEX_RESULT_FILE = "match_index.json"
+SHARDS_DIR = "shards/"
+SHARD_MANIFEST_FILE = "manifest.json"
 DIST_DIR = "dist/"
+RELEASES_DIR = "releases/"
 SRC_DIR = "src/"
 INDEX_TS_FILE = "index.ts"
+TEMPLATE_SENTINEL = re.compile(r"(__TEMPLATE_DATA_\d+__)")
+TEMPLATE_EMBED_MODES = ["json", "literal"]
+# compact JSON only needs these escaped inside a single-quoted JS string
+JS_STRING_ESCAPES = str.maketrans(
+    {
+        "\\": "\\\\",
+        "'": "\\'",
+        "\n": "\\n",
+        "\r": "\\r",
+        "\u2028": "\\u2028",
+        "\u2029": "\\u2029",
+    }
+)
+PROFILE_MODES = ["off", "time", "memory"]
+PROFILE_REPORT_FILE = "profile.json"
 REQUEST_HEADERS = {"Cache-Control": "no-cache", "Pragma": "no-cache"}
-
-
-def fetch_tumbon_resource():
-    r = random.random()
-    with requests.get(
-        f"{TUMBON_RESOURCE_URL}?__r={r}", stream=True, headers=REQUEST_HEADERS
+REQUEST_TIMEOUT = (10, 60)
+REQUEST_RETRIES = 3
+REQUEST_BACKOFF_FACTOR = 1
+SESSION = None
+SESSION_LOCK = threading.Lock()
+CACHE_INDEX_LOCK = threading.Lock()
+LOG_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "error": logging.ERROR}
+
+
+def fetch_cached(url: str, offline: bool = False) -> str:
+    with CACHE_INDEX_LOCK:
+        cache_index = load_cache_index()
+    entry = cache_index.get(url)
+    if entry is not None and not pathlib.Path(cached_file(entry)).exists():
+        entry = None
+
+    if offline:
+        if entry is None:
+            raise FileNotFoundError(f"{url} is not available in {CACHE_DIR}")
+        logging.info(f"- Using cached {url}")
+        return cached_file(entry)
+
+    with get_session().get(
+        url, stream=True, headers=conditional_headers(entry), timeout=REQUEST_TIMEOUT
     ) as resp:
+        if resp.status_code == 304 and entry is not None:
+            logging.info(f"- Not modified {url}")
+            return cached_file(entry)
         resp.raise_for_status()
-        with open(WORKING_FILE_TUMBON, "wb") as tmpf:
+        digest = hashlib.sha256()
+        partial_fd, partial_file = tempfile.mkstemp(suffix=".part", dir=CACHE_DIR)
+        with os.fdopen(partial_fd, "wb") as tmpf:
             for chunk in resp.iter_content(chunk_size=8192):
+                digest.update(chunk)
                 tmpf.write(chunk)
+        new_entry = {
+            "sha256": digest.hexdigest(),
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+        }
+    os.replace(partial_file, cached_file(new_entry))
+    logging.info(f"- Downloaded {url} ({new_entry['sha256'][:12]})")
+
+    with CACHE_INDEX_LOCK:
+        cache_index = load_cache_index()
+        cache_index[url] = new_entry
+        if entry is not None:
+            prune_cached_file(cache_index, entry)
+        save_cache_index(cache_index)
+    return cached_file(new_entry)
+
+
+def get_session() -> requests.Session:
+    global SESSION
+    with SESSION_LOCK:
+        if SESSION is None:
+            retry = Retry(
+                total=REQUEST_RETRIES,
+                backoff_factor=REQUEST_BACKOFF_FACTOR,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=["GET"],
+            )
+            SESSION = requests.Session()
+            SESSION.mount("https://", HTTPAdapter(max_retries=retry))
+            SESSION.mount("http://", HTTPAdapter(max_retries=retry))
+        return SESSION
 
 
-def fetch_zip_resource() -> map:
-    # web scraping from wiki
-    r = random.random()
-    with requests.get(
-        f"{ZIP_RESOURCE_URL}?__r={r}", verify=True, headers=REQUEST_HEADERS
-    ) as resp:
-        zip_content = resp.text
-        zip_match = re.findall(
-            r'(<table class="wikitable sortable.*?</table>)', zip_content, re.S + re.U
-        )
-        clean_zip = list(
-            map(
-                lambda z: z.replace("\n", "")
-                .replace("<i>", "")
-                .replace("</i>", "")
-                .replace("<br>", "")
-                .replace("<br />", "")
-                .replace("<td></td>", "<td>-</td>"),
-                zip_match,
+def fetch_resources(options: dict) -> dict:
+    fetchers = {"tumbon": fetch_tumbon_resource}
+    if options["check"]:
+        fetchers["published_version"] = get_recently_published_data_version
+    else:
+        fetchers["zip"] = fetch_zip_resource
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(fetchers)) as pool:
+        futures = {
+            name: pool.submit(timed, name, fetcher, options["offline"])
+            for name, fetcher in fetchers.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def timed(name: str, fn, *args):
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        logging.info(f"- Fetched {name} in {time.perf_counter() - started:.2f}s")
+
+
+class StageProfiler:
+    # Records wall time, CPU time, peak memory and a record count for each
+    # stage of a build. "memory" also traces python allocations, which makes
+    # the build several times slower, so its timings only compare with other
+    # "memory" runs. The cprofile stage is profiled whatever the mode.
+    def __init__(self, mode: str = "off", cprofile_stage: str = ""):
+        self.mode = mode
+        self.cprofile_stage = cprofile_stage
+        self.stages = {}
+        self.started = (time.perf_counter(), time.process_time())
+        if mode == "memory":
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        stats = {"records": None}
+        if self.mode == "off" and name != self.cprofile_stage:
+            yield stats
+            return
+
+        profile = cProfile.Profile() if name == self.cprofile_stage else None
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        started = (time.perf_counter(), time.process_time())
+        if profile:
+            profile.enable()
+        try:
+            yield stats
+        finally:
+            if profile:
+                profile.disable()
+                profile.dump_stats(f"{CACHE_DIR}{name}.prof")
+                logging.info(f"- cProfile output written to {CACHE_DIR}{name}.prof")
+            stats["wall"] = time.perf_counter() - started[0]
+            stats["cpu"] = time.process_time() - started[1]
+            stats["max_rss"] = max_rss()
+            if tracemalloc.is_tracing():
+                stats["peak_traced"] = tracemalloc.get_traced_memory()[1]
+            self.stages[name] = stats
+
+    def write_report(self, report_file: str, options: dict):
+        report = {
+            "options": options,
+            "python": sys.version.split()[0],
+            "wall": time.perf_counter() - self.started[0],
+            "cpu": time.process_time() - self.started[1],
+            "max_rss": max_rss(),
+            "stages": self.stages,
+        }
+        pathlib.Path(report_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(report_file, "w") as tmpf:
+            json.dump(report, tmpf, indent=2)
+        for name, stats in sorted(self.stages.items(), key=lambda s: -s[1]["wall"]):
+            logging.info(
+                f"- {name}: {stats['wall']:.2f}s wall, {stats['cpu']:.2f}s cpu, "
+                f"{stats['records']} records"
             )
+        logging.info(f"Profile report written to {report_file}")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def max_rss() -> Optional[int]:
+    # the high-water mark of the process, in bytes
+    try:
+        import resource
+    except ImportError:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage if sys.platform == "darwin" else usage * 1024
+
+
+def conditional_headers(entry: dict) -> dict:
+    headers = dict(REQUEST_HEADERS)
+    if entry is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def prune_cached_file(cache_index: dict, entry: dict):
+    if all(e["sha256"] != entry["sha256"] for e in cache_index.values()):
+        pathlib.Path(cached_file(entry)).unlink()
+
+
+def cached_file(entry: dict) -> str:
+    return f"{CACHE_DIR}{entry['sha256']}"
+
+
+def load_cache_index() -> dict:
+    pathlib.Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    index_file = pathlib.Path(CACHE_DIR, CACHE_INDEX_FILE)
+    if not index_file.exists():
+        return {}
+    with open(index_file, "r") as tmpf:
+        return json.load(tmpf)
+
+
+def save_cache_index(cache_index: dict):
+    # replaced in one step, so a reader never sees a half written index
+    index_file = pathlib.Path(CACHE_DIR, CACHE_INDEX_FILE)
+    with open(f"{index_file}.part", "w") as tmpf:
+        json.dump(cache_index, tmpf, indent=2)
+    os.replace(f"{index_file}.part", index_file)
+
+
+def run_stage(name: str, inputs: list, fn, *args) -> tuple[object, str]:
+    key = stage_key(name, inputs)
+    stage_dir = pathlib.Path(CACHE_DIR, STAGE_CACHE_DIR)
+    stage_file = stage_dir / f"{name}-{key}.pickle"
+    if stage_file.exists():
+        logging.info(f"- {name}: inputs unchanged, reusing cached result")
+        with open(stage_file, "rb") as tmpf:
+            return (pickle.load(tmpf), key)
+
+    result = fn(*args)
+    stage_dir.mkdir(parents=True, exist_ok=True)
+    for stale_file in stage_dir.glob(f"{name}-*.pickle"):
+        stale_file.unlink()
+    with open(f"{stage_file}.part", "wb") as tmpf:
+        pickle.dump(result, tmpf, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{stage_file}.part", stage_file)
+    return (result, key)
+
+
+def run_stream_stage(name: str, inputs: list, fn, *args) -> tuple[object, str]:
+    # run_stage for a generator: its items are pickled one after another as
+    # they are produced, and the returned function streams them back, so no
+    # pass holds more than one item
+    key = stage_key(name, inputs)
+    stage_dir = pathlib.Path(CACHE_DIR, STAGE_CACHE_DIR)
+    stage_file = stage_dir / f"{name}-{key}.pickle"
+    if stage_file.exists():
+        logging.info(f"- {name}: inputs unchanged, reusing cached result")
+        return (lambda: iter_pickled(stage_file), key)
+
+    stage_dir.mkdir(parents=True, exist_ok=True)
+    for stale_file in stage_dir.glob(f"{name}-*.pickle"):
+        stale_file.unlink()
+    with open(f"{stage_file}.part", "wb") as tmpf:
+        for item in fn(*args):
+            pickle.dump(item, tmpf, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(f"{stage_file}.part", stage_file)
+    return (lambda: iter_pickled(stage_file), key)
+
+
+def iter_pickled(path: pathlib.Path) -> Iterator[object]:
+    with open(path, "rb") as tmpf:
+        yield from iter_unpickled(tmpf)
+
+
+def iter_unpickled(tmpf) -> Iterator[object]:
+    while True:
+        try:
+            yield pickle.load(tmpf)
+        except EOFError:
+            return
+
+
+def iter_sorted(items: Iterator, run_size: int = SORT_RUN_SIZE) -> Iterator:
+    # sorted(items) as an external merge sort: runs of run_size items are
+    # sorted and spilled to temporary files, then merged back, so only one
+    # run is held at a time
+    with contextlib.ExitStack() as stack:
+        runs = []
+        while True:
+            run = sorted(itertools.islice(items, run_size))
+            if not run:
+                break
+            tmpf = stack.enter_context(tempfile.TemporaryFile())
+            for item in run:
+                pickle.dump(item, tmpf, protocol=pickle.HIGHEST_PROTOCOL)
+            tmpf.seek(0)
+            runs.append(iter_unpickled(tmpf))
+        yield from heapq.merge(*runs)
+
+
+def stage_key(name: str, inputs: list) -> str:
+    return hashlib.sha256(
+        json.dumps([name, builder_version(), *inputs]).encode("utf-8")
+    ).hexdigest()
+
+
+@functools.cache
+def builder_version() -> str:
+    # any change to the builder or the shared encoders invalidates every stage
+    digest = hashlib.sha256()
+    sources = [pathlib.Path(__file__)]
+    sources.extend(sorted(pathlib.Path(thai_address.__file__).parent.glob("*.py")))
+    for source in sources:
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as tmpf:
+        for chunk in iter(lambda: tmpf.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_if_changed(output_file: str, key: str, write):
+    manifest_file = pathlib.Path(CACHE_DIR, OUTPUT_MANIFEST_FILE)
+    manifest = {}
+    if manifest_file.exists():
+        with open(manifest_file, "r") as tmpf:
+            manifest = json.load(tmpf)
+
+    entry = manifest.get(output_file)
+    output = pathlib.Path(output_file)
+    if (
+        entry is not None
+        and entry["key"] == key
+        and output.exists()
+        and file_sha256(output_file) == entry["sha256"]
+        and all(
+            pathlib.Path(f"{output_file}{suffix}").exists()
+            for suffix in entry.get("siblings", [])
         )
-        district_zip = list(map(lambda z: extract_descriptive_zip(z), clean_zip))
-    flattened_district_zip = list(itertools.chain(*district_zip))
-    # build map
-    flattened_district_map = {}
-    for zip in flattened_district_zip:
-        flattened_district_map[zip["district_name"]] = {
-            "primary": zip["zips"][0],
-            "exceptional": zip["exceptionals"],
-        }
-    with open(WORKING_FILE_ZIP, "w") as tmpf:
-        json.dump(flattened_district_map, tmpf, indent=4, ensure_ascii=False)
-    return flattened_district_map
+    ):
+        logging.info(f"- {output_file} is up-to-date")
+        return
+
+    partial_file = f"{output_file}.part"
+    write(partial_file)
+    sha256 = file_sha256(partial_file)
+    if output.exists() and file_sha256(output_file) == sha256:
+        os.remove(partial_file)
+        logging.info(f"- {output_file} content unchanged")
+    else:
+        os.replace(partial_file, output_file)
+    siblings = replace_precompressed(partial_file, output_file)
+
+    manifest[output_file] = {"key": key, "sha256": sha256, "siblings": siblings}
+    pathlib.Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    with open(manifest_file, "w") as tmpf:
+        json.dump(manifest, tmpf, indent=2)
+
+
+def replace_precompressed(partial_file: str, output_file: str) -> list:
+    suffixes = [
+        suffix
+        for suffix in PRECOMPRESSED_SUFFIXES
+        if pathlib.Path(f"{partial_file}{suffix}").exists()
+    ]
+    if not suffixes:
+        # copies from an earlier precompressed build no longer match
+        for suffix in PRECOMPRESSED_SUFFIXES + (CHECKSUM_SUFFIX,):
+            pathlib.Path(f"{output_file}{suffix}").unlink(missing_ok=True)
+        return []
+    for suffix in suffixes:
+        os.replace(f"{partial_file}{suffix}", f"{output_file}{suffix}")
+
+    # sha256sum format, so a mirror can verify with `sha256sum -c`
+    with open(f"{output_file}{CHECKSUM_SUFFIX}", "w") as tmpf:
+        for file in [output_file] + [f"{output_file}{s}" for s in suffixes]:
+            tmpf.write(f"{file_sha256(file)}  {pathlib.Path(file).name}\n")
+    return suffixes + [CHECKSUM_SUFFIX]
+
+
+def fetch_tumbon_resource(offline: bool = False) -> str:
+    return fetch_cached(TUMBON_RESOURCE_URL, offline)
 
 
-def extract_descriptive_zip(zip_table: str) -> list:
-    tree = ET.fromstring(zip_table)
-    trs = tree.findall("./tbody/tr")
-    result = list(map(lambda tr: extract_row_zip(tr), trs[1:]))
-    return result
+def fetch_zip_resource(offline: bool = False) -> str:
+    return fetch_cached(ZIP_RESOURCE_URL, offline)
 
 
-def extract_row_zip(zip_row: Element) -> dict:
-    district_name = zip_row[0][0][0].text
-    zips = [zip_row[1].text]
-    alternate_zip = re.findall(r"(\d{5})", zip_row[2].text)
+def parse_zip_resource(resource_file: str) -> map:
+    # web scraping from wiki
+    flattened_district_map = {}
+    with open(resource_file, "r", encoding="utf-8") as tmpf:
+        chunks = iter(lambda: tmpf.read(ZIP_RESOURCE_CHUNK_SIZE), "")
+        for row in iter_zip_rows(chunks):
+            zip = extract_row_zip(row)
+            flattened_district_map[zip["district_name"]] = {
+                "primary": zip["zips"][0],
+                "exceptional": zip["exceptionals"],
+                "streets": zip["streets"],
+            }
+    return flattened_district_map
+
+
+class ZipTableParser(HTMLParser):
+    # Event driven extractor for the rows of "wikitable sortable" tables; it
+    # keeps only the row being parsed, so memory does not grow with the page.
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self._table_depth = 0
+        self._skip_depth = 0
+        self._cells = None
+        self._cell = None
+        self._link = None
+
+    def handle_starttag(self, tag: str, attrs: list):
+        if tag == "table":
+            classes = (dict(attrs).get("class") or "").split()
+            if self._table_depth or {"wikitable", "sortable"} <= set(classes):
+                self._table_depth += 1
+            return
+        if self._table_depth != 1:
+            return
+        if tag in ZIP_TABLE_SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "tr":
+            self._close_row()
+            self._cells = []
+        elif tag in ("td", "th") and self._cells is not None:
+            self._close_cell()
+            self._cell = {"tag": tag, "text": []}
+        elif tag == "a" and self._cell is not None and "link" not in self._cell:
+            self._link = self._cell["link"] = []
+
+    def handle_endtag(self, tag: str):
+        if tag == "table" and self._table_depth:
+            if self._table_depth == 1:
+                self._close_row()
+            self._table_depth -= 1
+        elif self._table_depth != 1:
+            return
+        elif tag in ZIP_TABLE_SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "tr":
+            self._close_row()
+        elif tag in ("td", "th"):
+            self._close_cell()
+        elif tag == "a":
+            self._link = None
+
+    def handle_data(self, data: str):
+        if self._cell is None or self._skip_depth:
+            return
+        data = data.replace("\n", "")
+        self._cell["text"].append(data)
+        if self._link is not None:
+            self._link.append(data)
+
+    def in_table(self) -> bool:
+        # also true while a tag split across chunks is still buffered
+        return bool(self._table_depth or self.rawdata)
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._cells.append(self._cell)
+        self._cell = None
+        self._link = None
+
+    def _close_row(self):
+        self._close_cell()
+        cells = self._cells
+        self._cells = None
+        if not cells or len(cells) < 3 or any(c["tag"] == "th" for c in cells):
+            return
+        (name, zip_code, remarks) = [cell_text(c) for c in cells[0:3]]
+        if "link" in cells[0]:
+            name = "".join(cells[0]["link"]).strip() or name
+        self.rows.append({"district_name": name, "zip": zip_code, "remarks": remarks})
+
+
+def cell_text(cell: dict) -> str:
+    return "".join(cell["text"]).strip() or "-"
+
+
+def iter_zip_rows(chunks) -> Iterator[dict]:
+    parser = ZipTableParser()
+    pending = ""
+    for chunk in chunks:
+        chunk = pending + chunk
+        pending = ""
+        if not parser.in_table():
+            # outside of tables only the next <table> tag matters, so hand the
+            # tokenizer as little of the surrounding page as possible
+            table = ZIP_TABLE_START.search(chunk)
+            if table is None:
+                pending = chunk[-len("<table") :]  # noqa: E203
+                continue
+            chunk = chunk[table.start() :]  # noqa: E203
+        parser.feed(chunk)
+        yield from parser.rows
+        parser.rows.clear()
+    parser.close()
+    yield from parser.rows
+
+
+def extract_row_zip(zip_row: dict) -> dict:
+    district_name = zip_row["district_name"]
+    zips = [zip_row["zip"]]
+    alternate_zip = re.findall(r"(\d{5})", zip_row["remarks"])
     if alternate_zip:
         zips.extend(alternate_zip)
 
     logging.debug(f"extract exceptionals for {district_name}:")
-    logging.debug(f"-> {zip_row[2].text}")
-    exceptional_zips = extract_exceptional_zips(zip_row[2].text)
+    logging.debug(f"-> {zip_row['remarks']}")
+    exceptional_zips = extract_exceptional_zips(zip_row["remarks"])
     logging.debug(exceptional_zips)
     return {
         "district_name": district_name,
         "zips": zips,
         "exceptionals": exceptional_zips,
+        "streets": extract_street_zips(zip_row["remarks"]),
     }
 
 
 def extract_subdistrict_name(data: str) -> str:
-    matches = re.match(r"(ตำบล|แขวง)(.+)", data, re.UNICODE)
+    matches = EXCEPTIONAL_SUBDISTRICT_NAME.match(data)
     if matches:
-        return matches[2]
+        return matches[1]
     return ""
 
 
 def extract_exceptional_zips(data: str) -> dict:
-    logging.debug(f'extracting "{data}"')
+    return dict(parse_exceptional_zips(data))
+
+
+@functools.lru_cache(maxsize=EXCEPTIONAL_ZIPS_CACHE_SIZE)
+def parse_exceptional_zips(data: str) -> tuple:
+    # cached as an immutable tuple since the same remarks are parsed again on
+    # every build. a subdistrict qualified by "เฉพาะซอย..." keeps its own zip,
+    # the qualified numbers are resolved by the street zips
+    exceptionals = {}
+    for names, zip_code in iter_exceptional_rules(data):
+        for name in EXCEPTIONAL_SUBDISTRICT.findall(EXCEPTIONAL_STREET.sub(" ", names)):
+            exceptionals[name] = zip_code
+    return tuple(exceptionals.items())
+
+
+def extract_street_zips(data: str) -> dict:
+    return {name: list(rules) for name, rules in parse_street_zips(data)}
+
+
+@functools.lru_cache(maxsize=EXCEPTIONAL_ZIPS_CACHE_SIZE)
+def parse_street_zips(data: str) -> tuple:
+    # "แขวงนวมินทร์ เฉพาะซอยนวมินทร์ 64-68, 74" limits the exceptional zip of a
+    # subdistrict to the listed numbers of one soi or road
+    streets = {}
+    for names, zip_code in iter_exceptional_rules(data):
+        for name, street, numbers in EXCEPTIONAL_STREET.findall(names):
+            streets.setdefault(name, []).extend(
+                (street, int(first), int(last or first), zip_code)
+                for first, last in EXCEPTIONAL_STREET_NUMBERS.findall(numbers)
+            )
+    return tuple((name, tuple(rules)) for name, rules in streets.items())
 
-    data = re.sub(r"\(ไปรษณีย์[^\)]+\)", "", data, flags=re.UNICODE)
-    data = data.strip()
 
+def iter_exceptional_rules(data: str) -> Iterator[tuple[str, str]]:
+    # grammar: ยกเว้น [- ]<names> ใช้รหัส NNNNN [- <names> ใช้รหัส NNNNN ...]
+    # where names are separated by spaces or และ
+    data = EXCEPTIONAL_POST_OFFICE.sub("", data).strip()
     if not data.startswith("ยกเว้น"):
-        return {}
-
-    data = data[6:].strip()
-
-    if "− " in data or "- " in data or "– " in data:
-        logging.debug("multiline exceptionals detected")
-        exceptional_rows = [
-            f"ยกเว้น{row}"
-            for row in re.split(r"(−|-|–) ", data, flags=re.UNICODE)
-            if row.strip() != ""
-        ]
-        multiline_zips = [extract_exceptional_zips(row) for row in exceptional_rows]
-        exceptionals = reduce(lambda x, a: x | a, multiline_zips, {})
-        return exceptionals
-
-    # single line
-    zip_code = ""
-    zip_matches = re.match(r".*ใช้รหัส (\d{5})$", data, re.UNICODE)
-    if zip_matches:
-        zip_code = zip_matches[1]
-        data = data[0:-13]
-    else:
-        return {}
-
-    provinces = [
-        extract_subdistrict_name(prov)
-        for prov in re.split(r"(\s+|และ)", data, flags=re.UNICODE)
-        if prov.strip() != "" and prov.strip() != "และ"
-    ]
-
-    return {province: zip_code for province in provinces if province != ""}
+        return
+    for rule in EXCEPTIONAL_RULE_SEPARATOR.split(data[6:]):
+        matches = EXCEPTIONAL_RULE.fullmatch(rule.strip())
+        if matches:
+            yield (matches[1], matches[2])
 
 
 def extract_address(addr: str) -> map:
-    province = extract_province(addr)
-    district = extract_district(addr)
-    subdistrict = extract_subdistrict(addr)
-    key = "{}_{}_{}".format(province, district, subdistrict)
-    data = {"zip": extract_zip(addr), "key": key}
-    return data
+    return parse_address(addr)
 
 
 def extract_zip(addr: str) -> str:
-    matches = re.match(r".*(\d{5}).*", addr, re.UNICODE)
-    return matches[1]
+    return address_zip(addr, addr.rsplit(" ", 1)[-1])
 
 
 def extract_province(addr: str) -> map:
-    tokens = addr.split(" ")
-    tokens.reverse()
-    province = tokens[1]
-    if province.startswith("จ."):
-        return province[2:]
-    return province
+    return province_name(addr.split(" ")[-2])
 
 
 def extract_district(addr: str) -> map:
-    tokens = addr.split(" ")
-    tokens.reverse()
-    district = tokens[2]
-    if district.startswith("อ."):
-        return district[2:]
-    if district.startswith("เขต"):
-        return district[3:]
-    if district.startswith("อำเภอ"):
-        return district[5:]
-    return district
+    return district_name(addr.split(" ")[-3])
 
 
 def extract_subdistrict(addr: str) -> map:
     tokens = addr.split(" ")
-    tokens.reverse()
-    subdistrict = ""
-    if len(tokens) > 3:
-        subdistrict = tokens[3]
-    if subdistrict.startswith("ต."):
-        return subdistrict[2:]
-    if subdistrict.startswith("แขวง"):
-        return subdistrict[4:]
-    if subdistrict.startswith("ตำบล"):
-        return subdistrict[4:]
-    pos = subdistrict.find("ต.")
-    if pos != -1:
-        return subdistrict[pos + 2 :]  # noqa: E203
-    pos = subdistrict.find("แขวง")
-    if pos != -1:
-        return subdistrict[pos + 4 :]  # noqa: E203
-    pos = subdistrict.find("ตำบล")
-    if pos != -1:
-        return subdistrict[pos + 4 :]  # noqa: E203
-
-    return subdistrict
-
-
-def parse_tumbon_resource() -> tuple[list, str, bool, str]:
-    xlsx = pandas.ExcelFile(WORKING_FILE_TUMBON)
+    return subdistrict_name(tokens[-4] if len(tokens) > 3 else "")
+
+
+def parse_tumbon_resource(
+    resource_file: str, as_frame: bool = False
+) -> tuple[list, str, bool, str]:
+    xlsx = pandas.ExcelFile(resource_file)
 
     logging.info("- Validating resource ...")
     data_header = pandas.read_excel(xlsx, sheet_name=0, header=None, nrows=5)
-    if data_header.iat[0, 0].strip() != "ทำเนียบท้องที่":
-        return (None, False, "unexpected data layout")
-    if data_header.iat[4, 0].strip() != "รหัสจังหวัด 2 หลัก//อำเภอ 4 หลัก//ตำบล 6 หลัก":
-        return (None, False, "unexpected data layout")
+    if not is_tumbon_header(data_header[0].tolist()):
+        return (None, None, False, "unexpected data layout")
 
     logging.info("- Transform resource ...")
     data_frame = pandas.read_excel(
@@ -228,21 +729,118 @@ def parse_tumbon_resource() -> tuple[list, str, bool, str]:
     )
     valid_data_frame = data_frame[data_frame.Obsolete == 0].drop(["Obsolete"], axis=1)
 
-    version_marker_row_num = len(data_frame) + 5
-    version_marker = pandas.read_excel(
-        xlsx, sheet_name=0, header=None, skiprows=version_marker_row_num - 1, nrows=1
-    )
-    marked_version = version_marker.iat[0, 0].strip()
-    version_matches = regex.findall(r"^\* update (\d+)$", marked_version)
-    data_version = "unknown"
-    if version_matches:
-        data_version = version_matches[0]
+    # the version marker is the last row of the sheet
+    data_version = extract_data_version(data_frame.iat[-1, 0]) or "unknown"
 
     logging.info(f"- Tumbon data version: {data_version}")
 
+    if as_frame:
+        return (valid_data_frame.reset_index(drop=True), data_version, True, None)
     return (valid_data_frame.values.tolist(), data_version, True, None)
 
 
+def read_tumbon_data_version(resource_file: str) -> tuple[str, bool, str]:
+    with open_workbook(resource_file) as workbook:
+        rows = workbook.worksheets[0].iter_rows(max_col=1, values_only=True)
+        if not is_tumbon_header([row[0] for row in itertools.islice(rows, 5)]):
+            return (None, False, "unexpected data layout")
+        for (cell,) in rows:
+            data_version = extract_data_version(cell)
+            if data_version:
+                return (data_version, True, None)
+        return ("unknown", True, None)
+
+
+def tumbon_data_version(resource_file: str, info: dict) -> tuple[str, bool, str]:
+    # the version iter_tumbon_rows saw on the build pass; a cached build skips
+    # that pass, so only then is the workbook scanned for it again
+    if "data_version" in info:
+        return (info["data_version"], True, None)
+    return read_tumbon_data_version(resource_file)
+
+
+@contextlib.contextmanager
+def open_workbook(resource_file: str) -> Iterator[openpyxl.Workbook]:
+    # cached resources are named by their sha256, and openpyxl refuses paths
+    # without an excel extension, but not open files
+    with open(resource_file, "rb") as tmpf:
+        workbook = openpyxl.load_workbook(tmpf, read_only=True)
+        try:
+            yield workbook
+        finally:
+            workbook.close()
+
+
+def iter_tumbon_rows(resource_file: str, info: Optional[dict] = None) -> Iterator[list]:
+    # the [code, name] rows parse_tumbon_resource returns, read one at a time;
+    # the data version found on the way is stored in info once the rows end
+    data_version = None
+    with open_workbook(resource_file) as workbook:
+        rows = workbook.worksheets[0].iter_rows(max_col=4, values_only=True)
+        header = [row[0] if row else None for row in itertools.islice(rows, 5)]
+        if not is_tumbon_header(header):
+            raise ValueError("unexpected data layout")
+        for row in rows:
+            if len(row) == 4 and row[3] == 0:
+                yield [row[0], row[1]]
+            elif row and not data_version:
+                data_version = extract_data_version(row[0])
+    if info is not None:
+        info["data_version"] = data_version or "unknown"
+
+
+def iter_provinces(
+    rows: Iterator[list], zip_data: map, vectorized: bool = False
+) -> Iterator[dict]:
+    # the workbook lists a province's districts and subdistricts right after
+    # it, so a province is complete as soon as the next one starts
+    finished = set()
+    for province_key, province_rows in itertools.groupby(
+        rows, key=lambda d: "{}".format(d[0])[0:2]
+    ):
+        if province_key in finished:
+            raise ValueError(f"rows of province {province_key} are not contiguous")
+        finished.add(province_key)
+        if vectorized:
+            yield from build_province_vectorized(list(province_rows), zip_data)
+        else:
+            yield from build_tumbon_resource(list(province_rows), zip_data)
+
+
+def iter_structured_data(
+    resource_file: str,
+    zip_data: map,
+    vectorized: bool = False,
+    info: Optional[dict] = None,
+) -> Iterator[dict]:
+    return iter_provinces(iter_tumbon_rows(resource_file, info), zip_data, vectorized)
+
+
+def build_province_vectorized(rows: list, zip_data: map) -> list:
+    return build_tumbon_resource_vectorized(
+        pandas.DataFrame(rows, columns=["Code", "Name"]), zip_data
+    )
+
+
+def is_tumbon_header(cells: list) -> bool:
+    return (
+        len(cells) == 5
+        and isinstance(cells[0], str)
+        and cells[0].strip() == "ทำเนียบท้องที่"
+        and isinstance(cells[4], str)
+        and cells[4].strip() == "รหัสจังหวัด 2 หลัก//อำเภอ 4 หลัก//ตำบล 6 หลัก"
+    )
+
+
+def extract_data_version(cell) -> str:
+    if not isinstance(cell, str):
+        return ""
+    version_matches = regex.findall(r"^\* update (\d+)$", cell.strip())
+    if version_matches:
+        return version_matches[0]
+    return ""
+
+
 def get_zip(zip_info: map, subdistrict_name: str) -> str:
     if subdistrict_name in zip_info["exceptional"]:
         return zip_info["exceptional"][subdistrict_name]
@@ -324,6 +922,89 @@ def build_tumbon_resource(data: list, zip_data: map) -> list:
     return provinces
 
 
+def build_tumbon_resource_vectorized(
+    data_frame: pandas.DataFrame, zip_data: map
+) -> list:
+    frame = pandas.DataFrame(
+        {"code": data_frame["Code"].astype(str), "name": data_frame["Name"]}
+    )
+    frame["province_key"] = frame.code.str[0:2]
+    frame["district_key"] = frame.code.str[0:4]
+    is_province = frame.code.str.endswith("000000")
+    is_district = frame.code.str.endswith("0000") & ~is_province
+
+    provinces = frame[is_province]
+    districts = frame[is_district].assign(
+        name=frame.name[is_district].str.replace(r"^เขต", "", regex=True)
+    )
+    subdistricts = frame[~frame.code.str.endswith("0000")]
+
+    districts = districts.assign(
+        primary=districts.name.map({k: z["primary"] for k, z in zip_data.items()})
+    )
+    missing_districts = districts.primary.isna()
+    if missing_districts.any():
+        raise KeyError(districts.name[missing_districts].iloc[0])
+    exceptional_zips = pandas.DataFrame(
+        [
+            (district_name, subdistrict_name, zip_code)
+            for district_name, z in zip_data.items()
+            for subdistrict_name, zip_code in z["exceptional"].items()
+        ],
+        columns=["district_name", "name", "exceptional"],
+    )
+
+    resolved = (
+        subdistricts.reset_index()
+        .merge(
+            districts[["district_key", "name", "primary"]].rename(
+                columns={"name": "district_name"}
+            ),
+            on="district_key",
+        )
+        .merge(exceptional_zips, on=["district_name", "name"], how="left")
+        .sort_values("index", kind="stable")
+    )
+    resolved["zip"] = resolved.exceptional.fillna(resolved.primary)
+
+    # nesting the result into dicts is the only per-row python work left; plain
+    # lists iterate much faster than (arrow backed) pandas columns
+    subdistricts_map = {}
+    for key, name, code, zip_code in zip(
+        resolved.district_key.tolist(),
+        resolved.name.tolist(),
+        resolved.code.tolist(),
+        resolved.zip.tolist(),
+    ):
+        subdistricts_map.setdefault(key, []).append(
+            {"name": name, "code": code, "zip": zip_code}
+        )
+
+    districts_map = {}
+    for province_key, district_key, name, code in zip(
+        districts.province_key.tolist(),
+        districts.district_key.tolist(),
+        districts.name.tolist(),
+        districts.code.tolist(),
+    ):
+        districts_map.setdefault(province_key, []).append(
+            {
+                "name": name,
+                "code": code,
+                "subdistricts": subdistricts_map[district_key],
+            }
+        )
+
+    return [
+        {"name": name, "code": code, "districts": districts_map[province_key]}
+        for name, code, province_key in zip(
+            provinces.name.tolist(),
+            provinces.code.tolist(),
+            provinces.province_key.tolist(),
+        )
+    ]
+
+
 def clean_district_name(name: str) -> str:
     if name.startswith("เขต"):
         return name[3:]
@@ -337,46 +1018,450 @@ def build_map(map_value: map, key: str, value: tuple) -> map:
     return map_value
 
 
-def export(data: list, output_file: str, minify: bool):
-    with open(output_file, "w") as tmpf:
-        content = json.dumps(data, indent=2, ensure_ascii=False)
-        if minify:
-            content = jsmin(content)
-        tmpf.write(content)
+def export(data, output_file: str, minify: bool, precompress: bool = False):
+    # serialize straight into the output, and into its .gz and .br siblings
+    # when precompressing, without building the whole document in memory;
+    # an iterator is written as an array, one item at a time
+    encoder = json.JSONEncoder(
+        ensure_ascii=False,
+        indent=None if minify else 2,
+        separators=(",", ":") if minify else None,
+    )
+    with contextlib.ExitStack() as stack:
+        outputs = [stack.enter_context(open(output_file, "wb"))]
+        if precompress:
+            outputs.append(
+                stack.enter_context(
+                    gzip.GzipFile(
+                        filename="",
+                        mode="wb",
+                        fileobj=stack.enter_context(open(f"{output_file}.gz", "wb")),
+                        compresslevel=GZIP_LEVEL,
+                        mtime=0,
+                    )
+                )
+            )
+            outputs.append(
+                stack.enter_context(
+                    contextlib.closing(
+                        BrotliWriter(
+                            stack.enter_context(open(f"{output_file}.br", "wb"))
+                        )
+                    )
+                )
+            )
+        for chunk in iter_buffered(iter_encoded(data, encoder)):
+            encoded = chunk.encode("utf-8")
+            for output in outputs:
+                output.write(encoded)
+
+
+class ObjectStream:
+    # (key, value) pairs that export and apply_template write as a JSON
+    # object, one pair at a time
+    def __init__(self, items: Iterator[tuple[str, object]]):
+        self.items = items
+
+
+def iter_encoded(data, encoder: json.JSONEncoder) -> Iterator[str]:
+    if isinstance(data, ObjectStream):
+        return iter_json_members(data.items, encoder, "{}")
+    if isinstance(data, Iterator):
+        return iter_json_members(((None, item) for item in data), encoder, "[]")
+    return encoder.iterencode(data)
+
+
+def iter_json_members(
+    members: Iterator[tuple[str, object]], encoder: json.JSONEncoder, brackets: str
+) -> Iterator[str]:
+    # the same text as encoder.iterencode of the whole list or dict; json
+    # escapes newlines in strings, so indenting a member only touches its layout
+    indent = "" if encoder.indent is None else "\n" + " " * encoder.indent
+    empty = True
+    for key, value in members:
+        yield brackets[0] if empty else encoder.item_separator
+        yield indent
+        empty = False
+        if brackets == "{}":
+            yield json.dumps(key, ensure_ascii=encoder.ensure_ascii)
+            yield encoder.key_separator
+        # one member at a time fits in a string, and encode takes the C
+        # encoder where iterencode walks the member in python
+        encoded = encoder.encode(value)
+        yield encoded.replace("\n", indent) if indent else encoded
+    yield brackets if empty else f"{indent[:1]}{brackets[1]}"
+
+
+class BrotliWriter:
+    # write-only file object, so brotli streams like gzip.GzipFile
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._compressor = brotli.Compressor(
+            mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY
+        )
+
+    def write(self, data: bytes):
+        self._fileobj.write(self._compressor.process(data))
+
+    def close(self):
+        self._fileobj.write(self._compressor.finish())
+
+
+def iter_buffered(chunks, size: int = EXPORT_BUFFER_SIZE) -> Iterator[str]:
+    buffer = []
+    length = 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield "".join(buffer)
+            buffer = []
+            length = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+def export_binary(data: Iterable[dict], data_version: str, output_file: str):
+    with open(output_file, "wb") as tmpf:
+        tmpf.write(encode_binary(data, data_version))
+
+
+def export_sqlite(data: Iterable[dict], data_version: str, output_file: str):
+    encode_sqlite(data, output_file, data_version)
+
+
+def flattened_schema(data_version: str) -> pyarrow.Schema:
+    return pyarrow.schema(
+        [
+            (
+                name,
+                (
+                    pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+                    if name in ARROW_DICTIONARY_COLUMNS
+                    else pyarrow.string()
+                ),
+            )
+            for name in ARROW_COLUMNS
+        ],
+        metadata={"data_version": data_version},
+    )
+
+
+def iter_flattened_batches(
+    data: Iterable[dict], schema: pyarrow.Schema
+) -> Iterator[pyarrow.RecordBatch]:
+    # a dictionary only grows from one batch to the next, so an arrow file
+    # stores each batch's new values as a delta of the same dictionary
+    dictionaries = {name: {} for name in ARROW_DICTIONARY_COLUMNS}
+    records = iter(data)
+    for batch in iter(lambda: list(itertools.islice(records, ARROW_BATCH_SIZE)), []):
+        columns = []
+        for name in ARROW_COLUMNS:
+            values = [r[name] for r in batch]
+            if name in dictionaries:
+                dictionary = dictionaries[name]
+                indices = [dictionary.setdefault(v, len(dictionary)) for v in values]
+                columns.append(
+                    pyarrow.DictionaryArray.from_arrays(
+                        pyarrow.array(indices, type=pyarrow.int32()),
+                        pyarrow.array(list(dictionary), type=pyarrow.string()),
+                    )
+                )
+            else:
+                columns.append(pyarrow.array(values, type=pyarrow.string()))
+        yield pyarrow.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def export_parquet(data: Iterable[dict], data_version: str, output_file: str):
+    schema = flattened_schema(data_version)
+    with pyarrow.parquet.ParquetWriter(
+        output_file, schema, compression=PARQUET_COMPRESSION
+    ) as writer:
+        for batch in iter_flattened_batches(data, schema):
+            writer.write_batch(batch)
+
+
+def export_arrow(data: Iterable[dict], data_version: str, output_file: str):
+    # uncompressed, so readers can memory map the columns without copying
+    schema = flattened_schema(data_version)
+    with pyarrow.ipc.new_file(
+        output_file,
+        schema,
+        options=pyarrow.ipc.IpcWriteOptions(emit_dictionary_deltas=True),
+    ) as writer:
+        for batch in iter_flattened_batches(data, schema):
+            writer.write_batch(batch)
+
+
+def export_release_delta(
+    provinces, provinces_key: str, data_version: str, minify: bool
+):
+    # provinces is a province stream that can be read again, once for the
+    # snapshot and once for the delta
+    if not data_version.isdigit():
+        logging.info("- Skipping release snapshot for unknown data version")
+        return
+    pathlib.Path(RELEASES_DIR).mkdir(parents=True, exist_ok=True)
+    export_if_changed(
+        f"{RELEASES_DIR}{data_version}.json",
+        stage_key("release", [provinces_key]),
+        lambda output: export(
+            encode_columnar(iter_flattened(provinces())), output, True
+        ),
+    )
+
+    previous_version = latest_release_before(data_version)
+    if not previous_version:
+        logging.info(
+            f"- No release snapshot before {data_version} in {RELEASES_DIR}, "
+            "so no delta is written"
+        )
+        return
+    previous_release = f"{RELEASES_DIR}{previous_version}.json"
+    export_if_changed(
+        f"{DIST_DIR}delta_{previous_version}_{data_version}.json",
+        stage_key(
+            "delta_output", [provinces_key, file_sha256(previous_release), minify]
+        ),
+        lambda output: export(
+            diff_flattened(
+                load_release(previous_release),
+                iter_flattened(provinces()),
+                previous_version,
+                data_version,
+            ),
+            output,
+            minify,
+        ),
+    )
+
+
+def export_shards(
+    structured_data, structured_key: str, data_version: str, minify: bool
+):
+    # the provinces are read once, so they may be a stream; the manifest
+    # only needs the name, code and zips of each
+    shards_dir = f"{DIST_DIR}{SHARDS_DIR}"
+    pathlib.Path(shards_dir).mkdir(parents=True, exist_ok=True)
+    hashes = {}
+    summaries = []
+    for province in structured_data:
+        shard_output = f"{shards_dir}{shard_file_name(province['code'])}"
+        export_if_changed(
+            shard_output,
+            stage_key("shard_output", [structured_key, province["code"], minify]),
+            lambda output: export(encode_shard(province), output, minify, minify),
+        )
+        hashes[province["code"]] = file_sha256(shard_output)
+        summaries.append(summarize_province_zips(province))
+
+    export_if_changed(
+        f"{shards_dir}{SHARD_MANIFEST_FILE}",
+        stage_key("shard_manifest_output", [structured_key, data_version, minify]),
+        lambda output: export(
+            encode_shard_manifest(summaries, data_version, hashes),
+            output,
+            minify,
+            minify,
+        ),
+    )
+
+
+def summarize_province_zips(province: dict) -> dict:
+    # the province with one subdistrict per zip, all encode_shard_manifest reads
+    zips = sorted({s["zip"] for d in province["districts"] for s in d["subdistricts"]})
+    return {
+        "name": province["name"],
+        "code": province["code"],
+        "districts": [{"subdistricts": [{"zip": zip_code} for zip_code in zips]}],
+    }
+
+
+def latest_release_before(data_version: str) -> str:
+    versions = [
+        release.stem
+        for release in pathlib.Path(RELEASES_DIR).glob("*.json")
+        if release.stem.isdigit() and int(release.stem) < int(data_version)
+    ]
+    return max(versions, key=int, default="")
+
+
+def load_release(release_file: str) -> list:
+    with open(release_file, "r") as tmpf:
+        return decode_columnar(json.load(tmpf))
 
 
 def flat_structured_data(data: list) -> list:
-    out = []
+    return list(iter_flattened(data))
+
+
+def iter_flattened(data) -> Iterator[dict]:
+    return (record for province in data for record in flatten_province(province))
+
+
+def iter_counted(provinces: Iterator[dict], stats: dict) -> Iterator[dict]:
+    # the profile's record count, the subdistricts of the provinces passing by
+    stats["records"] = 0
+    for province in provinces:
+        stats["records"] += sum(len(d["subdistricts"]) for d in province["districts"])
+        yield province
+
+
+def stream_lookup_tables(provinces) -> dict:
+    # the lookup tables of index.ts, over a province stream that can be read
+    # again: every table but the small province list is a lazy stream, written
+    # as it is read. the per-province and per-district tables follow the
+    # provinces, and the tables across provinces go through an external sort
+    return {
+        "zips": (
+            zip_code
+            for zip_code, _ in itertools.groupby(
+                iter_sorted(s["zip"] for _, _, s in iter_subdistricts(provinces()))
+            )
+        ),
+        "provinces": sort_mini_records(
+            [{"name": p["name"], "code": p["code"]} for p in provinces()]
+        ),
+        "districts": ObjectStream(
+            (
+                province["code"],
+                sort_mini_records(
+                    [
+                        {"name": d["name"], "code": d["code"]}
+                        for d in province["districts"]
+                    ]
+                ),
+            )
+            for province in provinces()
+            if province["districts"]
+        ),
+        "subdistricts": ObjectStream(
+            (
+                district["code"],
+                sort_mini_records(
+                    [
+                        {"name": s["name"], "code": s["code"]}
+                        for s in district["subdistricts"]
+                    ]
+                ),
+            )
+            for province in provinces()
+            for district in province["districts"]
+            if district["subdistricts"]
+        ),
+        "zip_provinces": ObjectStream(iter_zip_provinces(provinces())),
+        "suggestions": iter_sorted(iter_suggestions(provinces())),
+    }
+
+
+def iter_subdistricts(provinces) -> Iterator[tuple[dict, dict, dict]]:
+    for province in provinces:
+        for district in province["districts"]:
+            for subdistrict in district["subdistricts"]:
+                yield (province, district, subdistrict)
+
+
+def iter_zip_provinces(provinces) -> Iterator[tuple[str, list]]:
+    rows = iter_sorted(
+        (s["zip"], p["code"], p["name"]) for p, _, s in iter_subdistricts(provinces)
+    )
+    for zip_code, zip_rows in itertools.groupby(rows, key=lambda r: r[0]):
+        yield (
+            zip_code,
+            sort_mini_records(
+                [{"name": name, "code": code} for _, code, name in zip_rows]
+            ),
+        )
+
+
+def iter_suggestions(provinces) -> Iterator[list]:
+    for province in provinces:
+        yield [province["name"], province["code"]]
+        for district in province["districts"]:
+            yield [district["name"], district["code"]]
+            for subdistrict in district["subdistricts"]:
+                yield [subdistrict["name"], subdistrict["code"]]
+
+
+def build_street_zips(data: list, zip_data: map) -> dict:
+    subdistricts = {}
     for province in data:
-        province_name = province["name"]
         for district in province["districts"]:
-            district_name = district["name"]
+            zip_info = zip_data[district["name"]]
+            streets = zip_info.get("streets", {})
             for subdistrict in district["subdistricts"]:
-                out.append(
-                    {
-                        "province": province_name,
-                        "district": district_name,
-                        "subdistrict": subdistrict["name"],
-                        "zip": subdistrict["zip"],
-                        "subdistrictCode": subdistrict["code"],
-                        "districtCode": district["code"],
-                        "provinceCode": province["code"],
-                    }
-                )
-    return out
+                if subdistrict["name"] not in streets:
+                    continue
+                rules = {}
+                for street, first, last, zip_code in streets[subdistrict["name"]]:
+                    rules.setdefault(street, []).append([first, last, zip_code])
+                subdistricts[subdistrict["code"]] = {
+                    "zip": get_zip(zip_info, subdistrict["name"]),
+                    "streets": rules,
+                }
+    return {"version": STREET_ZIPS_FORMAT_VERSION, "subdistricts": subdistricts}
+
+
+def sort_mini_records(records: list) -> list:
+    unique_records = {}
+    for record in records:
+        unique_records.setdefault(record["code"], record)
+    return sorted(
+        unique_records.values(), key=lambda r: (thai_sort_key(r["name"]), r["code"])
+    )
 
 
-def apply_template(input_file: str, output_file: str, data: map, minify: bool):
+def apply_template(
+    input_file: str, output_file: str, data: map, minify: bool, embed: str = "json"
+):
     with open(input_file, "r") as tmpf:
         content = tmpf.read()
-        for key in data:
-            content = content.replace(
-                key, jsmin(json.dumps(data[key], indent=2, ensure_ascii=False))
-            )
-        with open(output_file, "w") as tmpof:
-            if minify:
-                content = jsmin(content)
-            tmpof.write(content)
+    # placeholders are comments, which jsmin would drop, so they become
+    # identifiers first; then only the small template is minified and the
+    # compact data is written between its parts
+    values = {}
+    for i, key in enumerate(data):
+        sentinel = f"__TEMPLATE_DATA_{i}__"
+        content = content.replace(key, sentinel)
+        values[sentinel] = data[key]
+    if minify:
+        content = jsmin(content)
+    with open(output_file, "w") as tmpof:
+        for part in TEMPLATE_SENTINEL.split(content):
+            if part in values:
+                for chunk in iter_buffered(iter_embedded(values[part], embed)):
+                    tmpof.write(chunk)
+            else:
+                tmpof.write(part)
+
+
+def iter_embedded(value, embed: str) -> Iterator[str]:
+    compact = iter_encoded(
+        value, json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    )
+    if embed == "json" and isinstance(value, (list, dict, Iterator, ObjectStream)):
+        # V8 parses a JSON string much faster than the same object literal;
+        # single quotes leave the many JSON double quotes unescaped, and the
+        # escapes are per character, so the chunks are quoted apart
+        yield "JSON.parse('"
+        for chunk in iter_buffered(compact):
+            yield chunk.translate(JS_STRING_ESCAPES)
+        yield "')"
+    else:
+        yield from compact
+
+
+def index_ts_data(flattened_data: list, lookup_tables: dict, data_version: str) -> map:
+    return {
+        "[/* ADDRESSES */]": flattened_data,
+        "/* ADDRESSES_VERSION */": data_version,
+        "[/* ZIPS */]": lookup_tables["zips"],
+        "[/* PROVINCES */]": lookup_tables["provinces"],
+        "{/* DISTRICTS */}": lookup_tables["districts"],
+        "{/* SUBDISTRICTS */}": lookup_tables["subdistricts"],
+        "{/* ZIP_PROVINCES */}": lookup_tables["zip_provinces"],
+        "[/* SUGGESTIONS */]": lookup_tables["suggestions"],
+    }
 
 
 def parse_options(argv: list) -> dict:
@@ -385,11 +1470,25 @@ def parse_options(argv: list) -> dict:
         "check": lambda v: v.lower() == "true",
         "prod": lambda v: v.lower() == "true",
         "log": lambda v: v.lower() if v.lower() in known_log_levels else "info",
+        "offline": lambda v: v.lower() == "true",
+        "vectorized": lambda v: v.lower() == "true",
+        "embed": lambda v: v.lower() if v.lower() in TEMPLATE_EMBED_MODES else "json",
+        "profile": lambda v: (
+            "time"
+            if v.lower() == "true"
+            else v.lower() if v.lower() in PROFILE_MODES else "off"
+        ),
+        "cprofile": lambda v: "" if v.lower() == "true" else v,
     }
     known_options = {
         "check": False,
         "prod": False,
         "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
     }
     for opt in argv:
         if opt.startswith("-"):
@@ -406,29 +1505,37 @@ def parse_options(argv: list) -> dict:
     return known_options
 
 
-def get_recently_published_data_version() -> str:
+def check_data_version(resources: dict):
+    (data_version, ok, err) = read_tumbon_data_version(resources["tumbon"])
+    if not ok:
+        logging.error("Unable to parse resource - {}".format(err))
+        exit(1)
+    if resources["published_version"] != data_version:
+        logging.info("Newer data version detected: {}".format(data_version))
+    else:
+        logging.info(
+            "The recent release has been up-to-date with version: {}".format(
+                data_version
+            )
+        )
+    exit(0)
+
+
+def get_recently_published_data_version(offline: bool = False) -> str:
     # web scraping from github
-    r = random.random()
-    with requests.get(
-        f"{RECENTLY_BUILT_INDEX}?__r={r}", verify=True, headers=REQUEST_HEADERS
-    ) as resp:
-        index_content = resp.text
-        data_match = re.search(r'_dataVersion:string="(\d+)"', index_content)
-        if data_match:
-            return data_match.group(1)  # Get the captured group (the digits)
-        logging.error("No data version found on recently published release.")
-        return ""
+    with open(fetch_cached(RECENTLY_BUILT_INDEX, offline), "r") as tmpf:
+        index_content = tmpf.read()
+    data_match = re.search(r'_dataVersion:string="(\d+)"', index_content)
+    if data_match:
+        return data_match.group(1)  # Get the captured group (the digits)
+    logging.error("No data version found on recently published release.")
+    return ""
 
 
-if __name__ == "__main__":
-    options = parse_options(sys.argv)
+def main(argv: list):
+    options = parse_options(argv)
 
-    if options["log"] == "debug":
-        logging.basicConfig(level=logging.DEBUG)
-    elif options["log"] == "info":
-        logging.basicConfig(level=logging.INFO)
-    elif options["log"] == "error":
-        logging.basicConfig(level=logging.ERROR)
+    logging.basicConfig(level=LOG_LEVELS[options["log"]])
 
     if options["prod"]:
         logging.info("Building production output ...")
@@ -437,44 +1544,220 @@ if __name__ == "__main__":
     indexts_output = f"{DIST_DIR}{INDEX_TS_FILE}"
     structured_output = f"{DIST_DIR}{STRUCTURED_RESULT_FILE}"
     flattened_output = f"{DIST_DIR}{FLATTENED_RESULT_FILE}"
+    columnar_output = f"{DIST_DIR}{COLUMNAR_RESULT_FILE}"
+    binary_output = f"{DIST_DIR}{BINARY_RESULT_FILE}"
+    sqlite_output = f"{DIST_DIR}{SQLITE_RESULT_FILE}"
+    parquet_output = f"{DIST_DIR}{PARQUET_RESULT_FILE}"
+    arrow_output = f"{DIST_DIR}{ARROW_RESULT_FILE}"
+    street_zips_output = f"{DIST_DIR}{STREET_ZIPS_RESULT_FILE}"
+    match_index_output = f"{DIST_DIR}{MATCH_INDEX_RESULT_FILE}"
     if not pathlib.Path(DIST_DIR).exists():
         pathlib.Path(DIST_DIR).mkdir()
+    profiler = StageProfiler(options["profile"], options["cprofile"])
 
     logging.info("Fetch resources ...")
-    fetch_tumbon_resource()
-    zip_data = fetch_zip_resource()
-
-    logging.info("Parsing resources ...")
-    (data, data_version, ok, err) = parse_tumbon_resource()
-    if not ok:
-        logging.error("Unable to parse resource - {}".format(err))
+    try:
+        with profiler.stage("fetch") as stage:
+            resources = fetch_resources(options)
+            stage["records"] = len(resources)
+    except (FileNotFoundError, requests.RequestException) as e:
+        logging.error("Unable to fetch resource - {}".format(e))
         exit(1)
 
     if options["check"]:
-        if get_recently_published_data_version() != data_version:
-            logging.info("Newer data version detected: {}".format(data_version))
-        else:
-            logging.info(
-                "The recent release has been up-to-date with version: {}".format(
-                    data_version
-                )
-            )
-        exit(0)
+        check_data_version(resources)
+
+    logging.info("Parsing resources ...")
+    with profiler.stage("parse_zip") as stage:
+        (zip_data, zip_key) = run_stage(
+            "parse_zip",
+            [file_sha256(resources["zip"])],
+            parse_zip_resource,
+            resources["zip"],
+        )
+        stage["records"] = len(zip_data)
 
+    # workbook rows flow through zip resolution into the stage cache one
+    # province at a time, and every output below reads that cache back as a
+    # stream, so no stage holds the provinces as one list
     logging.info("Rebuild resources ...")
-    structured_data = build_tumbon_resource(data, zip_data)
-    flattened_data = flat_structured_data(structured_data)
+    tumbon_info = {}
+    try:
+        with profiler.stage("build") as stage:
+            (provinces, provinces_key) = run_stream_stage(
+                "build",
+                [file_sha256(resources["tumbon"]), zip_key, options["vectorized"]],
+                lambda: iter_counted(
+                    iter_structured_data(
+                        resources["tumbon"],
+                        zip_data,
+                        options["vectorized"],
+                        tumbon_info,
+                    ),
+                    stage,
+                ),
+            )
+            records = stage["records"]
+    except ValueError as e:
+        logging.error("Unable to parse resource - {}".format(e))
+        exit(1)
+    ((data_version, ok, err), _) = run_stage(
+        "data_version",
+        [file_sha256(resources["tumbon"])],
+        tumbon_data_version,
+        resources["tumbon"],
+        tumbon_info,
+    )
+    if not ok:
+        logging.error("Unable to parse resource - {}".format(err))
+        exit(1)
+    logging.info(f"- Tumbon data version: {data_version}")
 
     logging.info("Writing structured result ...")
-    export(structured_data, structured_output, options["prod"])
+    with profiler.stage("structured_output") as stage:
+        export_if_changed(
+            structured_output,
+            stage_key("structured_output", [provinces_key, options["prod"]]),
+            lambda output: export(
+                provinces(), output, options["prod"], options["prod"]
+            ),
+        )
+        stage["records"] = records
 
     logging.info("Writing flattened result ...")
-    export(flattened_data, flattened_output, options["prod"])
+    with profiler.stage("flattened_output") as stage:
+        export_if_changed(
+            flattened_output,
+            stage_key("flattened_output", [provinces_key, options["prod"]]),
+            lambda output: export(
+                iter_flattened(provinces()), output, options["prod"], options["prod"]
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing columnar result ...")
+    with profiler.stage("columnar_output") as stage:
+        export_if_changed(
+            columnar_output,
+            stage_key("columnar_output", [provinces_key, options["prod"]]),
+            lambda output: export(
+                encode_columnar(iter_flattened(provinces())),
+                output,
+                options["prod"],
+                options["prod"],
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing binary result ...")
+    with profiler.stage("binary_output") as stage:
+        export_if_changed(
+            binary_output,
+            stage_key("binary_output", [provinces_key, data_version]),
+            lambda output: export_binary(
+                iter_flattened(provinces()), data_version, output
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing sqlite result ...")
+    with profiler.stage("sqlite_output") as stage:
+        export_if_changed(
+            sqlite_output,
+            stage_key("sqlite_output", [provinces_key, data_version]),
+            lambda output: export_sqlite(
+                iter_flattened(provinces()), data_version, output
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing parquet and arrow results ...")
+    with profiler.stage("arrow_output") as stage:
+        export_if_changed(
+            parquet_output,
+            stage_key("parquet_output", [provinces_key, data_version]),
+            lambda output: export_parquet(
+                iter_flattened(provinces()), data_version, output
+            ),
+        )
+        export_if_changed(
+            arrow_output,
+            stage_key("arrow_output", [provinces_key, data_version]),
+            lambda output: export_arrow(
+                iter_flattened(provinces()), data_version, output
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing street zips result ...")
+    with profiler.stage("street_zips_output") as stage:
+        export_if_changed(
+            street_zips_output,
+            stage_key("street_zips_output", [provinces_key, zip_key, options["prod"]]),
+            lambda output: export(
+                build_street_zips(provinces(), zip_data),
+                output,
+                options["prod"],
+                options["prod"],
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing match index result ...")
+    with profiler.stage("match_index_output") as stage:
+        export_if_changed(
+            match_index_output,
+            stage_key("match_index_output", [provinces_key, options["prod"]]),
+            lambda output: export(
+                encode_match_index(iter_flattened(provinces())),
+                output,
+                options["prod"],
+                options["prod"],
+            ),
+        )
+        stage["records"] = records
+
+    logging.info("Writing province shards ...")
+    with profiler.stage("shards_output") as stage:
+        export_shards(provinces(), provinces_key, data_version, options["prod"])
+        stage["records"] = records
+
+    logging.info("Writing release snapshot and delta ...")
+    with profiler.stage("release_output") as stage:
+        export_release_delta(provinces, provinces_key, data_version, options["prod"])
+        stage["records"] = records
 
     logging.info("Writing node package ...")
-    apply_template(
-        indexts_input,
-        indexts_output,
-        {"[/* ADDRESSES */]": flattened_data, "/* ADDRESSES_VERSION */": data_version},
-        options["prod"],
-    )
+    with profiler.stage("indexts_output") as stage:
+        export_if_changed(
+            indexts_output,
+            stage_key(
+                "indexts_output",
+                [
+                    provinces_key,
+                    data_version,
+                    file_sha256(indexts_input),
+                    options["prod"],
+                    options["embed"],
+                ],
+            ),
+            lambda output: apply_template(
+                indexts_input,
+                output,
+                index_ts_data(
+                    iter_flattened(provinces()),
+                    stream_lookup_tables(provinces),
+                    data_version,
+                ),
+                options["prod"],
+                options["embed"],
+            ),
+        )
+        stage["records"] = records
+
+    if options["profile"] != "off":
+        profiler.write_report(f"{CACHE_DIR}{PROFILE_REPORT_FILE}", options)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,49 @@
+import json
+import logging
+import sys
+import time
+
+from builder.build import build_tumbon_resource, build_tumbon_resource_vectorized
+from builder_benchmarks.synthetic import (
+    SCALES,
+    synthesize_tumbon_frame,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+)
+
+
+def bench_build_tumbon_resource(scale: str) -> dict:
+    rows = synthesize_tumbon_rows(scale)
+    zip_data = synthesize_zip_data(rows)
+    frame = synthesize_tumbon_frame(rows)
+
+    started = time.perf_counter()
+    expected = build_tumbon_resource(rows, zip_data)
+    python_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = build_tumbon_resource_vectorized(frame, zip_data)
+    vectorized_elapsed = time.perf_counter() - started
+
+    if json.dumps(result) != json.dumps(expected):
+        raise AssertionError(f"vectorized output differs at {scale}")
+    return {
+        "rows": len(rows),
+        "python": python_elapsed,
+        "vectorized": vectorized_elapsed,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for scale in sys.argv[1:] or SCALES:
+        timings = bench_build_tumbon_resource(scale)
+        logging.info(
+            "{} ({} rows): python {:.3f}s, vectorized {:.3f}s ({:.1f}x)".format(
+                scale,
+                timings["rows"],
+                timings["python"],
+                timings["vectorized"],
+                timings["python"] / timings["vectorized"],
+            )
+        )
@@ -0,0 +1,116 @@
+import logging
+import re
+import sys
+import time
+from functools import reduce
+
+from builder.build import extract_exceptional_zips, parse_exceptional_zips
+from builder_benchmarks.synthetic import (
+    SCALES,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+    synthesize_zip_remarks,
+)
+
+PASSES = 20
+
+
+def reference_extract_subdistrict_name(data: str) -> str:
+    matches = re.match(r"(ตำบล|แขวง)(.+)", data, re.UNICODE)
+    if matches:
+        return matches[2]
+    return ""
+
+
+def reference_extract_exceptional_zips(data: str) -> dict:
+    # the parser before the single-pass tokenizer, kept as it was to time the
+    # new one against; it splits the remark again for every rule
+    logging.debug(f'extracting "{data}"')
+
+    data = re.sub(r"\(ไปรษณีย์[^\)]+\)", "", data, flags=re.UNICODE)
+    data = data.strip()
+
+    if not data.startswith("ยกเว้น"):
+        return {}
+
+    data = data[6:].strip()
+
+    if "− " in data or "- " in data or "– " in data:
+        logging.debug("multiline exceptionals detected")
+        exceptional_rows = [
+            f"ยกเว้น{row}"
+            for row in re.split(r"(−|-|–) ", data, flags=re.UNICODE)
+            if row.strip() != ""
+        ]
+        multiline_zips = [
+            reference_extract_exceptional_zips(row) for row in exceptional_rows
+        ]
+        exceptionals = reduce(lambda x, a: x | a, multiline_zips, {})
+        return exceptionals
+
+    # single line
+    zip_code = ""
+    zip_matches = re.match(r".*ใช้รหัส (\d{5})$", data, re.UNICODE)
+    if zip_matches:
+        zip_code = zip_matches[1]
+        data = data[0:-13]
+    else:
+        return {}
+
+    provinces = [
+        reference_extract_subdistrict_name(prov)
+        for prov in re.split(r"(\s+|และ)", data, flags=re.UNICODE)
+        if prov.strip() != "" and prov.strip() != "และ"
+    ]
+
+    return {province: zip_code for province in provinces if province != ""}
+
+
+def bench_extract_exceptional_zips(scale: str) -> dict:
+    remarks = synthesize_zip_remarks(synthesize_zip_data(synthesize_tumbon_rows(scale)))
+    uncached = parse_exceptional_zips.__wrapped__
+
+    started = time.perf_counter()
+    for _ in range(PASSES):
+        reference = [reference_extract_exceptional_zips(remark) for remark in remarks]
+    reference_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(PASSES):
+        expected = [dict(uncached(remark)) for remark in remarks]
+    uncached_elapsed = time.perf_counter() - started
+
+    parse_exceptional_zips.cache_clear()
+    started = time.perf_counter()
+    for _ in range(PASSES):
+        result = [extract_exceptional_zips(remark) for remark in remarks]
+    cached_elapsed = time.perf_counter() - started
+
+    if expected != reference:
+        raise AssertionError(f"tokenizer output differs from the reference at {scale}")
+    if result != expected:
+        raise AssertionError(f"cached output differs at {scale}")
+    return {
+        "remarks": len(remarks),
+        "reference": reference_elapsed / PASSES,
+        "uncached": uncached_elapsed / PASSES,
+        "cached": cached_elapsed / PASSES,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for scale in sys.argv[1:] or SCALES:
+        timings = bench_extract_exceptional_zips(scale)
+        logging.info(
+            "{} ({} remarks): reference {:.2f}ms, uncached {:.2f}ms ({:.1f}x), "
+            "cached {:.2f}ms ({:.1f}x)".format(
+                scale,
+                timings["remarks"],
+                timings["reference"] * 1000,
+                timings["uncached"] * 1000,
+                timings["reference"] / timings["uncached"],
+                timings["cached"] * 1000,
+                timings["reference"] / timings["cached"],
+            )
+        )
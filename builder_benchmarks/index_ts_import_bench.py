@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+
+from builder.build import (
+    CACHE_DIR,
+    INDEX_TS_FILE,
+    SRC_DIR,
+    TEMPLATE_EMBED_MODES,
+    apply_template,
+    build_tumbon_resource,
+    index_ts_data,
+    iter_flattened,
+    stream_lookup_tables,
+)
+from builder_benchmarks.synthetic import (
+    SCALES,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+)
+
+# needs node 22.13+ for type stripping, and lodash resolvable from the
+# repository root (npm install --no-save lodash)
+NODE = os.environ.get("NODE", "node")
+BENCH_DIR = f"{CACHE_DIR}bench/"
+ROUNDS = 10
+
+STRIP_TYPES = """
+const { readFileSync, writeFileSync } = require('node:fs');
+const { stripTypeScriptTypes } = require('node:module');
+writeFileSync(process.argv[2], stripTypeScriptTypes(readFileSync(process.argv[1], 'utf8')));
+"""
+
+IMPORT_TIMING = """
+const started = performance.now();
+const { default: ThaiAddr } = await import(process.argv[1]);
+const imported = performance.now();
+new ThaiAddr().findByZip('10200');
+const called = performance.now();
+console.log(JSON.stringify({ import: imported - started, first_call: called - imported }));
+"""
+
+# the queries of builder_benchmarks.suite.query_lookups; records are reached
+# through their zips since the class has no iterator
+LOOKUP_TIMING = """
+const { default: ThaiAddr } = await import(process.argv[1]);
+const addr = new ThaiAddr();
+const queryLookups = () => {
+    let queries = 0;
+    for (const zipCode of addr.zips()) {
+        addr.provinces(zipCode);
+        queries += 2;
+        for (const record of addr.findByZip(zipCode)) {
+            addr.findBySubdistrictCode(record.subdistrictCode);
+            addr.subdistricts(record.districtCode);
+            queries += 2;
+        }
+    }
+    return queries;
+};
+const queries = queryLookups();
+const elapsed = [];
+for (let i = 0; i < Number(process.argv[2]); i++) {
+    const started = performance.now();
+    queryLookups();
+    elapsed.push(performance.now() - started);
+}
+console.log(JSON.stringify({ queries, elapsed }));
+"""
+
+
+def strip_types(index_ts: pathlib.Path, index_js: pathlib.Path):
+    # stripTypeScriptTypes warns that it is experimental on every run
+    subprocess.run(
+        [NODE, "--no-warnings", "-e", STRIP_TYPES, str(index_ts), str(index_js)],
+        check=True,
+    )
+
+
+def run_module_script(script: str, *args: str) -> dict:
+    return json.loads(
+        subprocess.run(
+            [NODE, "--input-type=module", "-e", script, *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    )
+
+
+def time_node_lookups(index_ts: pathlib.Path, rounds: int) -> float:
+    # median seconds per query on the generated ThaiAddr class, after a
+    # warm-up pass that builds its lazy tables
+    bench_dir = pathlib.Path(BENCH_DIR).resolve()
+    bench_dir.mkdir(parents=True, exist_ok=True)
+    index_js = bench_dir / "lookup-index.mjs"
+    strip_types(index_ts, index_js)
+    result = run_module_script(LOOKUP_TIMING, index_js.as_uri(), str(rounds))
+    return statistics.median(result["elapsed"]) / 1000 / result["queries"]
+
+
+def bench_index_ts_import(scale: str) -> dict:
+    rows = synthesize_tumbon_rows(scale)
+    structured = build_tumbon_resource(rows, synthesize_zip_data(rows))
+
+    bench_dir = pathlib.Path(BENCH_DIR).resolve()
+    bench_dir.mkdir(parents=True, exist_ok=True)
+    timings = {}
+    for mode in TEMPLATE_EMBED_MODES:
+        index_ts = bench_dir / f"index-{scale}-{mode}.ts"
+        index_js = bench_dir / f"index-{scale}-{mode}.mjs"
+        # the tables are streams, written once, so each mode gets its own
+        data = index_ts_data(
+            iter_flattened(structured), stream_lookup_tables(lambda: structured), "1"
+        )
+        apply_template(f"{SRC_DIR}{INDEX_TS_FILE}", index_ts, data, True, mode)
+        strip_types(index_ts, index_js)
+        runs = [
+            run_module_script(IMPORT_TIMING, index_js.as_uri()) for _ in range(ROUNDS)
+        ]
+        timings[mode] = {
+            "size": index_js.stat().st_size,
+            "import": statistics.median(r["import"] for r in runs),
+            "first_call": statistics.median(r["first_call"] for r in runs),
+        }
+    return timings
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for scale in sys.argv[1:] or SCALES:
+        for mode, timings in bench_index_ts_import(scale).items():
+            logging.info(
+                "{} {} ({:.1f} MiB): import {:.1f} ms, first call {:.1f} ms".format(
+                    scale,
+                    mode,
+                    timings["size"] / 1024 / 1024,
+                    timings["import"],
+                    timings["first_call"],
+                )
+            )
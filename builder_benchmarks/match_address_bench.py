@@ -0,0 +1,62 @@
+import logging
+import random
+import sys
+import time
+
+from builder.build import build_tumbon_resource, flat_structured_data
+from builder_benchmarks.synthetic import (
+    SCALES,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+)
+from thai_address.fuzzy import AddressMatcher
+
+SAMPLE_SIZE = 1000
+# each query drops one character of every name, like a careless typist
+TYPO = slice(1, None)
+
+
+def bench_match_address(scale: str) -> dict:
+    rows = synthesize_tumbon_rows(scale)
+    flattened = flat_structured_data(
+        build_tumbon_resource(rows, synthesize_zip_data(rows))
+    )
+    sample = random.Random(0).choices(flattened, k=SAMPLE_SIZE)
+
+    started = time.perf_counter()
+    matcher = AddressMatcher.from_flattened(flattened)
+    index_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    hits = 0
+    for record in sample:
+        matches = matcher.match(
+            record["province"][TYPO],
+            record["district"][TYPO],
+            record["subdistrict"][TYPO],
+            limit=1,
+        )
+        hits += matches[0].subdistrict_code == record["subdistrictCode"]
+    match_elapsed = time.perf_counter() - started
+
+    return {
+        "subdistricts": len(flattened),
+        "index": index_elapsed,
+        "match": match_elapsed / SAMPLE_SIZE,
+        "hit_rate": hits / SAMPLE_SIZE,
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for scale in sys.argv[1:] or SCALES:
+        timings = bench_match_address(scale)
+        logging.info(
+            "{} ({} subdistricts): index {:.2f}s, {:.3f} ms per match, {:.1%} top-1".format(
+                scale,
+                timings["subdistricts"],
+                timings["index"],
+                timings["match"] * 1000,
+                timings["hit_rate"],
+            )
+        )
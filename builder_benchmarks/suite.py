@@ -0,0 +1,256 @@
+import gc
+import json
+import logging
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from builder.build import (
+    INDEX_TS_FILE,
+    SRC_DIR,
+    apply_template,
+    export,
+    flat_structured_data,
+    index_ts_data,
+    iter_flattened,
+    iter_structured_data,
+    parse_exceptional_zips,
+    parse_street_zips,
+    parse_zip_resource,
+    read_tumbon_data_version,
+    stream_lookup_tables,
+)
+from builder_benchmarks.index_ts_import_bench import time_node_lookups
+from builder_benchmarks.synthetic import (
+    SCALES,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+    synthesize_zip_remarks,
+)
+from builder_tests.tumbon_fixture import write_tumbon_workbook
+from builder_tests.zip_fixture import write_zip_page
+from thai_address import ThaiAddr
+
+BENCH_ROUNDS = 5
+# a stage regresses when its median is this much slower than the baseline
+BENCH_TOLERANCE = 0.25
+
+
+def write_resources(scale: str, directory: pathlib.Path) -> tuple[str, str]:
+    # the DOPA workbook and wikipedia page the builder would download,
+    # synthesized from the same rows as the other benchmarks
+    rows = synthesize_tumbon_rows(scale)
+    zip_data = synthesize_zip_data(rows)
+    tumbon_file = str(directory / "tumbon.xlsx")
+    zip_file = str(directory / "zip.html")
+    write_tumbon_workbook(tumbon_file, [[code, name, 0] for code, name in rows])
+    write_zip_page(
+        zip_file,
+        [
+            (name, district["primary"], remarks)
+            for (name, district), remarks in zip(
+                zip_data.items(), synthesize_zip_remarks(zip_data)
+            )
+        ],
+    )
+    return (tumbon_file, zip_file)
+
+
+def parse_zip_resource_uncached(zip_file: str) -> map:
+    parse_exceptional_zips.cache_clear()
+    parse_street_zips.cache_clear()
+    return parse_zip_resource(zip_file)
+
+
+def build_structured_data(tumbon_file: str, zip_data: map) -> list:
+    # the build streams the provinces into its stage cache instead
+    return list(iter_structured_data(tumbon_file, zip_data))
+
+
+def write_index_ts(structured: list, data_version: str, output_file: str):
+    # the lookup tables are streams, computed while the template is written
+    apply_template(
+        f"{SRC_DIR}{INDEX_TS_FILE}",
+        output_file,
+        index_ts_data(
+            iter_flattened(structured),
+            stream_lookup_tables(lambda: structured),
+            data_version,
+        ),
+        True,
+    )
+
+
+def query_lookups(addr: ThaiAddr) -> int:
+    queries = 0
+    for zip_code in addr.zips():
+        addr.find_by_zip(zip_code)
+        addr.provinces(zip_code)
+        queries += 2
+    for record in addr:
+        addr.find_by_subdistrict_code(record.subdistrict_code)
+        addr.subdistricts(record.district_code)
+        queries += 2
+    return queries
+
+
+def timed_median(rounds: int, fn, *args) -> tuple[object, float]:
+    elapsed = []
+    for _ in range(rounds):
+        gc.collect()
+        started = time.perf_counter()
+        result = fn(*args)
+        elapsed.append(time.perf_counter() - started)
+    return (result, statistics.median(elapsed))
+
+
+def run_suite(scale: str, rounds: int = BENCH_ROUNDS) -> dict:
+    timings = {}
+    # the stages log their progress, which would drown the results
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = pathlib.Path(tmp)
+        (tumbon_file, zip_file) = write_resources(scale, directory)
+
+        ((data_version, ok, err), timings["parse_tumbon"]) = timed_median(
+            rounds, read_tumbon_data_version, tumbon_file
+        )
+        if not ok:
+            raise AssertionError(f"unable to parse synthesized resource - {err}")
+        (zip_data, timings["parse_zip"]) = timed_median(
+            rounds, parse_zip_resource_uncached, zip_file
+        )
+        (structured, timings["build"]) = timed_median(
+            rounds, build_structured_data, tumbon_file, zip_data
+        )
+        (flattened, timings["flatten"]) = timed_median(
+            rounds, flat_structured_data, structured
+        )
+        flattened_file = str(directory / "flattened_data.json")
+        (_, timings["export"]) = timed_median(
+            rounds, export, flattened, flattened_file, True
+        )
+        (_, timings["apply_template"]) = timed_median(
+            rounds,
+            write_index_ts,
+            structured,
+            data_version,
+            str(directory / INDEX_TS_FILE),
+        )
+
+        (addr, timings["lookup_load"]) = timed_median(
+            rounds, ThaiAddr.load, flattened_file
+        )
+        queries = query_lookups(addr)
+        (_, elapsed) = timed_median(rounds, query_lookups, addr)
+        timings["lookup_query"] = elapsed / queries
+        try:
+            timings["lookup_query_node"] = time_node_lookups(
+                directory / INDEX_TS_FILE, rounds
+            )
+        except (OSError, subprocess.CalledProcessError) as e:
+            logging.warning(f"Skipping lookups on the generated index.ts - {e}")
+    logging.disable(logging.NOTSET)
+
+    return {
+        "scale": scale,
+        "rounds": rounds,
+        "python": platform.python_version(),
+        "subdistricts": len(flattened),
+        "timings": timings,
+    }
+
+
+def compare_results(results: dict, baseline: dict, tolerance: float) -> list:
+    if results["scale"] != baseline["scale"]:
+        raise ValueError(
+            f"baseline scale {baseline['scale']} differs from {results['scale']}"
+        )
+    regressions = []
+    for stage, elapsed in results["timings"].items():
+        expected = baseline["timings"].get(stage)
+        if expected and elapsed > expected * (1 + tolerance):
+            regressions.append((stage, expected, elapsed))
+    return regressions
+
+
+def parse_options(argv: list) -> dict:
+    options = {
+        "scale": "1x",
+        "rounds": BENCH_ROUNDS,
+        "tolerance": BENCH_TOLERANCE,
+        "compare": None,
+        "save": None,
+    }
+    for opt in argv[1:]:
+        if opt.startswith("-") and "=" in opt:
+            (name, value) = opt[1:].split("=", 1)
+            if name == "rounds":
+                options[name] = int(value)
+            elif name == "tolerance":
+                options[name] = float(value)
+            elif name in options:
+                options[name] = value
+    if options["scale"] not in SCALES:
+        raise ValueError(f"unknown scale: {options['scale']}")
+    return options
+
+
+def log_results(results: dict, baseline: dict = None):
+    logging.info(
+        "{} ({} subdistricts), median of {} rounds on python {}:".format(
+            results["scale"],
+            results["subdistricts"],
+            results["rounds"],
+            results["python"],
+        )
+    )
+    for stage, elapsed in results["timings"].items():
+        line = f"- {stage}: {format_elapsed(elapsed)}"
+        if baseline and baseline["timings"].get(stage):
+            line += f" ({elapsed / baseline['timings'][stage]:.2f}x baseline)"
+        logging.info(line)
+
+
+def format_elapsed(elapsed: float) -> str:
+    if elapsed < 0.001:
+        return f"{elapsed * 1000000:.2f} µs"
+    return f"{elapsed * 1000:.1f} ms"
+
+
+def main(argv: list):
+    logging.basicConfig(level=logging.INFO)
+    options = parse_options(argv)
+    results = run_suite(options["scale"], options["rounds"])
+
+    baseline = None
+    if options["compare"] and pathlib.Path(options["compare"]).exists():
+        with open(options["compare"], "r") as f:
+            baseline = json.load(f)
+    elif options["compare"]:
+        logging.info(f"No baseline at {options['compare']}, nothing to compare")
+    log_results(results, baseline)
+
+    if options["save"]:
+        pathlib.Path(options["save"]).parent.mkdir(parents=True, exist_ok=True)
+        with open(options["save"], "w") as f:
+            json.dump(results, f, indent=2)
+        logging.info(f"Saved baseline to {options['save']}")
+
+    if baseline:
+        regressions = compare_results(results, baseline, options["tolerance"])
+        for stage, expected, elapsed in regressions:
+            logging.error(
+                f"{stage} regressed: {format_elapsed(expected)} -> "
+                f"{format_elapsed(elapsed)}"
+            )
+        if regressions:
+            exit(1)
+
+
+if __name__ == "__main__":
+    main(sys.argv)
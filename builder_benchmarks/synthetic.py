@@ -0,0 +1,56 @@
+import pandas
+
+PROVINCE_COUNT = 77
+# (districts per province, subdistricts per district); about 7,400 subdistricts at 1x
+SCALES = {"1x": (12, 8), "100x": (96, 97)}
+EXCEPTIONAL_EVERY = 5
+
+
+def synthesize_tumbon_rows(scale: str = "1x") -> list:
+    district_count, subdistrict_count = SCALES[scale]
+    rows = []
+    for p in range(PROVINCE_COUNT):
+        province_key = f"{10 + p:02d}"
+        rows.append([int(f"{province_key}000000"), f"จังหวัดที่{province_key}"])
+        for d in range(1, district_count + 1):
+            district_key = f"{province_key}{d:02d}"
+            prefix = "เขต" if province_key == "10" else ""
+            rows.append([int(f"{district_key}0000"), f"{prefix}อำเภอที่{district_key}"])
+            for s in range(1, subdistrict_count + 1):
+                rows.append([int(f"{district_key}{s:02d}00"), f"ตำบลที่{s}"])
+    return rows
+
+
+def synthesize_zip_data(rows: list) -> map:
+    zip_data = {}
+    for code, name in rows:
+        code = str(code)
+        if code.endswith("0000") and not code.endswith("000000"):
+            district_name = name[3:] if name.startswith("เขต") else name
+            zip_data[district_name] = {"primary": f"{code[0:4]}0", "exceptional": {}}
+        elif not code.endswith("0000") and int(code[4:6]) % EXCEPTIONAL_EVERY == 0:
+            zip_data[district_name]["exceptional"][name] = f"{code[0:4]}9"
+    return zip_data
+
+
+def synthesize_tumbon_frame(rows: list) -> pandas.DataFrame:
+    return pandas.DataFrame(rows, columns=["Code", "Name"])
+
+
+def synthesize_zip_remarks(zip_data: map) -> list:
+    # render each district's exceptionals back into a wikipedia remark cell,
+    # with at most two subdistricts per "− ... ใช้รหัส NNNNN" rule
+    remarks = []
+    for district in zip_data.values():
+        names = list(district["exceptional"])
+        rules = []
+        for i in range(0, len(names), 2):
+            zip_code = district["exceptional"][names[i]]
+            rules.append(f"{' และ'.join(names[i:i + 2])} ใช้รหัส {zip_code}")
+        if not rules:
+            remarks.append("-")
+        elif len(rules) == 1:
+            remarks.append(f"ยกเว้น {rules[0]} (ไปรษณีย์{district['primary']})")
+        else:
+            remarks.append("ยกเว้น  " + "  ".join(f"− {rule}" for rule in rules))
+    return remarks
@@ -0,0 +1,81 @@
+import ast
+import json
+import pathlib
+
+from builder import build
+
+TEMPLATE = """// zips
+const version = /* VERSION */;
+const zips = () => [/* ZIPS */];
+"""
+DATA = {"/* VERSION */": "25660901", "[/* ZIPS */]": [{"zip": "10270"}]}
+
+
+def test_apply_template_json(tmp_path):
+    template = tmp_path / "index.ts"
+    template.write_text(TEMPLATE)
+    output = tmp_path / "out.ts"
+
+    build.apply_template(str(template), str(output), DATA, False)
+
+    assert output.read_text() == (
+        "// zips\n"
+        'const version = "25660901";\n'
+        'const zips = () => JSON.parse(\'[{"zip":"10270"}]\');\n'
+    )
+
+
+def test_apply_template_json_escapes_single_quoted_string(tmp_path):
+    template = tmp_path / "index.ts"
+    template.write_text(TEMPLATE)
+    output = tmp_path / "out.ts"
+    zips = [{"zip": 'O\'Neil \\ "1"\n\u2028'}]
+
+    build.apply_template(
+        str(template), str(output), {**DATA, "[/* ZIPS */]": zips}, True
+    )
+
+    # a python string literal unescapes these like a JS one
+    literal = output.read_text().split("JSON.parse(")[1].split(");")[0]
+    assert literal.startswith("'")
+    assert json.loads(ast.literal_eval(literal)) == zips
+
+
+def test_apply_template_literal_minified(tmp_path):
+    template = tmp_path / "index.ts"
+    template.write_text(TEMPLATE)
+    output = tmp_path / "out.ts"
+
+    build.apply_template(str(template), str(output), DATA, True, "literal")
+
+    assert output.read_text() == (
+        'const version="25660901";const zips=()=>[{"zip":"10270"}];'
+    )
+
+
+def test_apply_template_streams_iterators(tmp_path):
+    template = tmp_path / "index.ts"
+    template.write_text(TEMPLATE)
+    for embed in build.TEMPLATE_EMBED_MODES:
+        expected = tmp_path / f"{embed}.ts"
+        build.apply_template(str(template), str(expected), DATA, True, embed)
+        output = tmp_path / f"{embed}-streamed.ts"
+
+        build.apply_template(
+            str(template),
+            str(output),
+            {**DATA, "[/* ZIPS */]": iter(DATA["[/* ZIPS */]"])},
+            True,
+            embed,
+        )
+
+        assert output.read_text() == expected.read_text()
+
+
+def test_apply_template_minified_keeps_index_ts_strings(tmp_path):
+    template = pathlib.Path(build.__file__).parent.parent / build.SRC_DIR / "index.ts"
+    output = tmp_path / "out.ts"
+
+    build.apply_template(str(template), str(output), {}, True)
+
+    assert '"unable to fetch "+url+": "+response.status' in output.read_text()
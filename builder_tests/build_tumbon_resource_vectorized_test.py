@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from builder.build import (
+    build_tumbon_resource,
+    build_tumbon_resource_vectorized,
+    parse_tumbon_resource,
+)
+from builder_benchmarks.synthetic import (
+    synthesize_tumbon_frame,
+    synthesize_tumbon_rows,
+    synthesize_zip_data,
+)
+from builder_tests.tumbon_fixture import write_tumbon_workbook
+
+
+def test_vectorized_build_matches_default_build():
+    rows = synthesize_tumbon_rows()
+    zip_data = synthesize_zip_data(rows)
+
+    result = build_tumbon_resource_vectorized(synthesize_tumbon_frame(rows), zip_data)
+
+    assert json.dumps(result) == json.dumps(build_tumbon_resource(rows, zip_data))
+
+
+def test_vectorized_build_from_parsed_frame(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path)
+    zip_data = {
+        "พระนคร": {"primary": "10200", "exceptional": {}},
+        "เมืองสมุทรปราการ": {"primary": "10270", "exceptional": {"ปากน้ำ": "10280"}},
+    }
+    rows, _, _, _ = parse_tumbon_resource(path)
+    frame, _, _, _ = parse_tumbon_resource(path, as_frame=True)
+
+    result = build_tumbon_resource_vectorized(frame, zip_data)
+
+    assert json.dumps(result) == json.dumps(build_tumbon_resource(rows, zip_data))
+
+
+def test_vectorized_build_with_unknown_district_zip():
+    rows = synthesize_tumbon_rows()
+    zip_data = synthesize_zip_data(rows)
+    zip_data.pop("อำเภอที่1201")
+
+    with pytest.raises(KeyError):
+        build_tumbon_resource_vectorized(synthesize_tumbon_frame(rows), zip_data)
@@ -0,0 +1,66 @@
+import pandas
+import pyarrow.feather
+import pyarrow.parquet
+
+from builder import build
+
+FLATTENED_DATA = [
+    {
+        "province": "สมุทรปราการ",
+        "district": "บางพลี",
+        "subdistrict": "บางพลีใหญ่",
+        "zip": "10540",
+        "subdistrictCode": "11030100",
+        "districtCode": "11030000",
+        "provinceCode": "11000000",
+    },
+    {
+        "province": "สมุทรปราการ",
+        "district": "บางพลี",
+        "subdistrict": "บางแก้ว",
+        "zip": "10540",
+        "subdistrictCode": "11030200",
+        "districtCode": "11030000",
+        "provinceCode": "11000000",
+    },
+]
+
+
+def test_export_parquet(tmp_path):
+    output = tmp_path / "flattened_data.parquet"
+
+    build.export_parquet(FLATTENED_DATA, "25660901", str(output))
+
+    frame = pandas.read_parquet(output)
+    assert frame.to_dict("records") == FLATTENED_DATA
+    assert isinstance(frame["zip"].dtype, pandas.CategoricalDtype)
+    assert list(frame["zip"].cat.categories) == ["10540"]
+    metadata = pyarrow.parquet.read_schema(output).metadata
+    assert metadata[b"data_version"] == b"25660901"
+
+
+def test_export_arrow(tmp_path):
+    output = tmp_path / "flattened_data.arrow"
+
+    build.export_arrow(FLATTENED_DATA, "25660901", str(output))
+
+    table = pyarrow.feather.read_table(str(output), memory_map=True)
+    assert table.to_pylist() == FLATTENED_DATA
+    assert pyarrow.types.is_dictionary(table.schema.field("province").type)
+    assert not pyarrow.types.is_dictionary(table.schema.field("subdistrictCode").type)
+
+
+def test_export_arrow_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "ARROW_BATCH_SIZE", 1)
+    arrow_output = tmp_path / "flattened_data.arrow"
+    parquet_output = tmp_path / "flattened_data.parquet"
+
+    build.export_arrow(iter(FLATTENED_DATA), "25660901", str(arrow_output))
+    build.export_parquet(iter(FLATTENED_DATA), "25660901", str(parquet_output))
+
+    table = pyarrow.feather.read_table(str(arrow_output), memory_map=True)
+    assert table.column("subdistrict").num_chunks == 2
+    assert table.to_pylist() == FLATTENED_DATA
+    frame = pandas.read_parquet(parquet_output)
+    assert frame.to_dict("records") == FLATTENED_DATA
+    assert list(frame["subdistrict"].cat.categories) == ["บางพลีใหญ่", "บางแก้ว"]
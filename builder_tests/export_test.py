@@ -0,0 +1,127 @@
+import gzip
+import json
+import pathlib
+
+import brotli
+
+from builder import build
+
+DATA = [{"province": "สมุทรปราการ", "zips": ["10270", "10280"]}]
+
+
+def test_export_pretty(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(DATA, str(output), False)
+
+    assert output.read_text() == json.dumps(DATA, indent=2, ensure_ascii=False)
+
+
+def test_export_compact(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(DATA, str(output), True)
+
+    assert output.read_text() == '[{"province":"สมุทรปราการ","zips":["10270","10280"]}]'
+
+
+def test_export_iterator_pretty(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(iter(DATA * 2), str(output), False)
+
+    assert output.read_text() == json.dumps(DATA * 2, indent=2, ensure_ascii=False)
+
+
+def test_export_iterator_compact(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(iter(DATA * 2), str(output), True)
+
+    assert output.read_text() == json.dumps(
+        DATA * 2, ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def test_export_empty_iterator(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(iter([]), str(output), False)
+
+    assert output.read_text() == "[]"
+
+
+def test_export_object_stream_pretty(tmp_path):
+    output = tmp_path / "data.json"
+    data = {"10000000": DATA, "11000000": DATA * 2}
+
+    build.export(build.ObjectStream(iter(data.items())), str(output), False)
+
+    assert output.read_text() == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def test_export_object_stream_compact(tmp_path):
+    output = tmp_path / "data.json"
+    data = {"10000000": DATA, "11000000": DATA * 2}
+
+    build.export(build.ObjectStream(iter(data.items())), str(output), True)
+
+    assert output.read_text() == json.dumps(
+        data, ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def test_export_empty_object_stream(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(build.ObjectStream(iter([])), str(output), False)
+
+    assert output.read_text() == "{}"
+
+
+def test_iter_sorted_merges_spilled_runs():
+    items = [[str(i * 7 % 10), i] for i in range(10)]
+
+    result = list(build.iter_sorted(iter(items), run_size=3))
+
+    assert result == sorted(items)
+
+
+def test_export_precompressed(tmp_path):
+    output = tmp_path / "data.json"
+
+    build.export(DATA, str(output), True, True)
+
+    content = output.read_bytes()
+    assert gzip.decompress((tmp_path / "data.json.gz").read_bytes()) == content
+    assert brotli.decompress((tmp_path / "data.json.br").read_bytes()) == content
+
+
+def test_export_if_changed_writes_checksums(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output_file = "data.json"
+
+    build.export_if_changed(
+        output_file, "key", lambda output: build.export(DATA, output, True, True)
+    )
+
+    checksums = pathlib.Path("data.json.sha256").read_text().splitlines()
+    assert checksums == [
+        f"{build.file_sha256(name)}  {name}"
+        for name in ["data.json", "data.json.gz", "data.json.br"]
+    ]
+    assert not list(tmp_path.glob("*.part*"))
+
+
+def test_export_if_changed_restores_missing_siblings(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    output_file = "data.json"
+
+    def write(output):
+        build.export(DATA, output, True, True)
+
+    build.export_if_changed(output_file, "key", write)
+    pathlib.Path("data.json.br").unlink()
+    build.export_if_changed(output_file, "key", write)
+
+    assert pathlib.Path("data.json.br").exists()
@@ -1,4 +1,4 @@
-from builder.build import extract_exceptional_zips
+from builder.build import extract_exceptional_zips, parse_exceptional_zips
 
 
 def test_extract_empty_exceptionals():
@@ -86,7 +86,7 @@ def test_extract_complex_exceptional_zips():
 
     result = extract_exceptional_zips(data)
 
-    assert result == {"นวลจันทร์": "10230", "นวมินทร์": "10230", "คลองกุ่ม": "10230"}
+    assert result == {"นวลจันทร์": "10230"}
 
 
 def test_extract_nondistrict_exceptional_zips():
@@ -121,3 +121,15 @@ def test_extract_complex_exceptional_zips_case_3():
         "โคกตูม": "18250",
         "โพนทอง": "18250",
     }
+
+
+def test_extract_cached_exceptional_zips_returns_fresh_dicts():
+    data = "ยกเว้น ตำบลลลล ใช้รหัส 12345"
+    parse_exceptional_zips.cache_clear()
+
+    first = extract_exceptional_zips(data)
+    first["กกก"] = "99999"
+    result = extract_exceptional_zips(data)
+
+    assert result == {"ลลล": "12345"}
+    assert parse_exceptional_zips.cache_info().hits == 1
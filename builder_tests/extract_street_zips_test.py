@@ -0,0 +1,108 @@
+from builder.build import (
+    build_street_zips,
+    extract_exceptional_zips,
+    extract_street_zips,
+    extract_row_zip,
+)
+
+
+def test_extract_street_zips():
+    data = "(ไปรษณีย์คลองจั่น) ยกเว้น แขวงนวลจันทร์ แขวงนวมินทร์ เฉพาะซอยนวมินทร์ 103-111 และแขวงคลองกุ่ม เฉพาะซอยนวมินทร์ 64-68, 74 ใช้รหัส 10230 (ไปรษณีย์จรเข้บัว)"  # noqa: E501
+
+    result = extract_street_zips(data)
+
+    assert result == {
+        "นวมินทร์": [("ซอยนวมินทร์", 103, 111, "10230")],
+        "คลองกุ่ม": [
+            ("ซอยนวมินทร์", 64, 68, "10230"),
+            ("ซอยนวมินทร์", 74, 74, "10230"),
+        ],
+    }
+
+
+def test_extract_street_zips_without_qualifiers():
+    data = "ยกเว้น ตำบลอออ ตำบลขขข และตำบลกกก ใช้รหัส 12345"
+
+    result = extract_street_zips(data)
+
+    assert result == {}
+
+
+def test_build_street_zips():
+    data = [
+        {
+            "name": "กรุงเทพมหานคร",
+            "code": "10000000",
+            "districts": [
+                {
+                    "name": "บึงกุ่ม",
+                    "code": "10270000",
+                    "subdistricts": [
+                        {"name": "คลองกุ่ม", "code": "10270100", "zip": "10230"},
+                        {"name": "นวลจันทร์", "code": "10270200", "zip": "10230"},
+                    ],
+                }
+            ],
+        }
+    ]
+    zip_data = {
+        "บึงกุ่ม": {
+            "primary": "10240",
+            "exceptional": {"นวลจันทร์": "10230"},
+            "streets": {
+                "คลองกุ่ม": [
+                    ("ซอยนวมินทร์", 64, 68, "10230"),
+                    ("ซอยนวมินทร์", 74, 74, "10230"),
+                ]
+            },
+        }
+    }
+
+    result = build_street_zips(data, zip_data)
+
+    assert result == {
+        "version": 1,
+        "subdistricts": {
+            "10270100": {
+                "zip": "10240",
+                "streets": {"ซอยนวมินทร์": [[64, 68, "10230"], [74, 74, "10230"]]},
+            }
+        },
+    }
+
+
+def test_build_street_zips_falls_back_to_subdistrict_zip():
+    remarks = "ยกเว้น - แขวงคลองกุ่ม ใช้รหัส 10230 - แขวงคลองกุ่ม เฉพาะซอยนวมินทร์ 64-68 ใช้รหัส 10220"  # noqa: E501
+    row = extract_row_zip(
+        {"district_name": "บึงกุ่ม", "zip": "10240", "remarks": remarks}
+    )
+    data = [
+        {
+            "name": "กรุงเทพมหานคร",
+            "code": "10000000",
+            "districts": [
+                {
+                    "name": "บึงกุ่ม",
+                    "code": "10270000",
+                    "subdistricts": [
+                        {"name": "คลองกุ่ม", "code": "10270100", "zip": "10230"}
+                    ],
+                }
+            ],
+        }
+    ]
+    zip_data = {
+        "บึงกุ่ม": {
+            "primary": "10240",
+            "exceptional": row["exceptionals"],
+            "streets": row["streets"],
+        }
+    }
+
+    result = build_street_zips(data, zip_data)
+
+    assert extract_exceptional_zips(remarks) == {"คลองกุ่ม": "10230"}
+    assert result["subdistricts"]["10270100"] == {
+        "zip": "10230",
+        "streets": {"ซอยนวมินทร์": [[64, 68, "10220"]]},
+    }
@@ -0,0 +1,32 @@
+import pytest
+
+from builder.build import extract_zip
+
+
+def test_extract_zip():
+    data = "99/1 ม.2 ต.บางแก้ว อ.บางพลี จ.สมุทรปราการ 10540"
+
+    result = extract_zip(data)
+
+    assert result == "10540"
+
+
+def test_extract_zip_without_names():
+    data = "บางพลี 10540"
+
+    result = extract_zip(data)
+
+    assert result == "10540"
+
+
+def test_extract_zip_before_trailing_text():
+    data = "บางพลี 10540 (ที่ทำงาน)"
+
+    result = extract_zip(data)
+
+    assert result == "10540"
+
+
+def test_extract_missing_zip():
+    with pytest.raises(ValueError):
+        extract_zip("ไม่มีรหัสไปรษณีย์")
@@ -0,0 +1,100 @@
+import http.server
+import threading
+
+import pytest
+
+from builder import build
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    content = b"resource v1"
+    etag = '"v1"'
+    requests_seen = []
+
+    def do_GET(self):
+        StandInHandler.requests_seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == StandInHandler.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", StandInHandler.etag)
+        self.send_header("Content-Length", str(len(StandInHandler.content)))
+        self.end_headers()
+        self.wfile.write(StandInHandler.content)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(build, "CACHE_DIR", f"{tmp_path}/cache/")
+    StandInHandler.content = b"resource v1"
+    StandInHandler.etag = '"v1"'
+    StandInHandler.requests_seen = []
+    server = http.server.HTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/resource"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_cached_downloads_into_content_addressed_file(stand_in_url):
+    result = build.fetch_cached(stand_in_url)
+
+    assert result.endswith(
+        "20c670db99a2a25470b5daaa3a132d07222a354dafb3b2d14c2f832df02c7fd1"
+    )
+    assert open(result, "rb").read() == b"resource v1"
+
+
+def test_fetch_cached_sends_conditional_request(stand_in_url):
+    first = build.fetch_cached(stand_in_url)
+
+    second = build.fetch_cached(stand_in_url)
+
+    assert first == second
+    assert StandInHandler.requests_seen[1]["If-None-Match"] == '"v1"'
+
+
+def test_fetch_cached_replaces_changed_content(stand_in_url):
+    first = build.fetch_cached(stand_in_url)
+    StandInHandler.content = b"resource v2"
+    StandInHandler.etag = '"v2"'
+
+    second = build.fetch_cached(stand_in_url)
+
+    assert first != second
+    assert open(second, "rb").read() == b"resource v2"
+    assert not build.pathlib.Path(first).exists()
+
+
+def test_fetch_cached_offline_uses_cached_copy(stand_in_url):
+    first = build.fetch_cached(stand_in_url)
+
+    second = build.fetch_cached(stand_in_url, offline=True)
+
+    assert first == second
+    assert len(StandInHandler.requests_seen) == 1
+
+
+def test_fetch_cached_offline_without_cached_copy(stand_in_url):
+    with pytest.raises(FileNotFoundError):
+        build.fetch_cached(stand_in_url, offline=True)
+
+
+def test_save_cache_index_keeps_previous_index_on_failure(stand_in_url, monkeypatch):
+    build.fetch_cached(stand_in_url)
+    before = build.load_cache_index()
+
+    def interrupted_dump(data, f, **kwargs):
+        f.write('{"partial')
+        raise OSError("disk full")
+
+    with monkeypatch.context() as m, pytest.raises(OSError):
+        m.setattr(build.json, "dump", interrupted_dump)
+        build.save_cache_index({})
+
+    assert build.load_cache_index() == before
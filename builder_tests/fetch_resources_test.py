@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from builder import build
+
+
+def test_fetch_resources_for_check_runs_concurrently_without_zip(monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetcher(result):
+        def fetch(offline):
+            barrier.wait()
+            return result
+
+        return fetch
+
+    monkeypatch.setattr(build, "fetch_tumbon_resource", fetcher("tumbon.xlsx"))
+    monkeypatch.setattr(
+        build, "fetch_zip_resource", lambda offline: pytest.fail("zip fetched")
+    )
+    monkeypatch.setattr(
+        build, "get_recently_published_data_version", fetcher("25660901")
+    )
+
+    result = build.fetch_resources({"check": True, "offline": False})
+
+    assert result == {"tumbon": "tumbon.xlsx", "published_version": "25660901"}
+
+
+def test_fetch_resources_without_check_skips_published_version(monkeypatch):
+    monkeypatch.setattr(build, "fetch_tumbon_resource", lambda offline: "t.xlsx")
+    monkeypatch.setattr(build, "fetch_zip_resource", lambda offline: {})
+
+    result = build.fetch_resources({"check": False, "offline": True})
+
+    assert result == {"tumbon": "t.xlsx", "zip": {}}
@@ -0,0 +1,178 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from builder import build
+from thai_address import ShardedThaiAddr, ThaiAddr
+from builder_tests.tumbon_fixture import write_tumbon_workbook
+from builder_tests.zip_fixture import write_zip_page
+
+DIST_FILES = [
+    build.STRUCTURED_RESULT_FILE,
+    build.FLATTENED_RESULT_FILE,
+    build.COLUMNAR_RESULT_FILE,
+    build.BINARY_RESULT_FILE,
+    build.SQLITE_RESULT_FILE,
+    build.PARQUET_RESULT_FILE,
+    build.ARROW_RESULT_FILE,
+    build.INDEX_TS_FILE,
+    f"{build.SHARDS_DIR}{build.SHARD_MANIFEST_FILE}",
+]
+
+
+@pytest.fixture
+def offline_workspace(tmp_path, monkeypatch):
+    src = pathlib.Path(build.__file__).parent.parent / build.SRC_DIR
+    monkeypatch.chdir(tmp_path)
+    shutil.copytree(src, build.SRC_DIR)
+    pathlib.Path(build.CACHE_DIR).mkdir()
+    write_tumbon_workbook("tumbon.xlsx")
+    write_zip_page("zip.html")
+    cache_index = {}
+    for url, resource in [
+        (build.TUMBON_RESOURCE_URL, "tumbon.xlsx"),
+        (build.ZIP_RESOURCE_URL, "zip.html"),
+    ]:
+        sha256 = build.file_sha256(resource)
+        shutil.move(resource, f"{build.CACHE_DIR}{sha256}")
+        cache_index[url] = {"sha256": sha256, "etag": None, "last_modified": None}
+    build.save_cache_index(cache_index)
+    return tmp_path
+
+
+def dist_state() -> dict:
+    return {
+        name: pathlib.Path(build.DIST_DIR, name).stat().st_mtime_ns
+        for name in DIST_FILES
+    }
+
+
+def test_offline_build_writes_all_outputs(offline_workspace):
+    build.main(["build.py", "-offline"])
+
+    with open(f"{build.DIST_DIR}{build.FLATTENED_RESULT_FILE}") as f:
+        flattened = json.load(f)
+    assert [(r["subdistrict"], r["zip"]) for r in flattened] == [
+        ("พระบรมมหาราชวัง", "10200"),
+        ("วังบูรพาภิรมย์", "10200"),
+        ("ปากน้ำ", "10280"),
+    ]
+
+
+def test_noop_rebuild_reuses_stages_and_keeps_outputs(offline_workspace, caplog):
+    build.main(["build.py", "-offline"])
+    before = dist_state()
+    caplog.set_level("INFO")
+
+    build.main(["build.py", "-offline"])
+
+    assert dist_state() == before
+    assert "build: inputs unchanged, reusing cached result" in caplog.text
+    assert f"{build.DIST_DIR}{build.INDEX_TS_FILE} is up-to-date" in caplog.text
+
+
+def test_rebuild_rewrites_deleted_output(offline_workspace):
+    build.main(["build.py", "-offline"])
+    pathlib.Path(build.DIST_DIR, build.COLUMNAR_RESULT_FILE).unlink()
+
+    build.main(["build.py", "-offline"])
+
+    assert pathlib.Path(build.DIST_DIR, build.COLUMNAR_RESULT_FILE).exists()
+
+
+def test_first_release_writes_no_delta(offline_workspace, caplog):
+    caplog.set_level("INFO")
+
+    build.main(["build.py", "-offline"])
+
+    assert "No release snapshot before 25660901" in caplog.text
+    assert not list(pathlib.Path(build.DIST_DIR).glob("delta_*.json"))
+
+
+def test_new_data_version_emits_delta_against_previous_release(offline_workspace):
+    build.main(["build.py", "-offline"])
+    write_tumbon_workbook("tumbon.xlsx", version="25670101")
+    sha256 = build.file_sha256("tumbon.xlsx")
+    shutil.move("tumbon.xlsx", f"{build.CACHE_DIR}{sha256}")
+    cache_index = build.load_cache_index()
+    cache_index[build.TUMBON_RESOURCE_URL]["sha256"] = sha256
+    build.save_cache_index(cache_index)
+
+    build.main(["build.py", "-offline"])
+
+    assert sorted(p.name for p in pathlib.Path(build.RELEASES_DIR).iterdir()) == [
+        "25660901.json",
+        "25670101.json",
+    ]
+    with open(f"{build.DIST_DIR}delta_25660901_25670101.json") as f:
+        delta = json.load(f)
+    assert (delta["from"], delta["to"]) == ("25660901", "25670101")
+    assert delta["subdistricts"]["added"] == {}
+
+
+def test_vectorized_build_writes_identical_outputs(offline_workspace):
+    build.main(["build.py", "-offline"])
+    expected = {
+        name: pathlib.Path(build.DIST_DIR, name).read_bytes() for name in DIST_FILES
+    }
+
+    build.main(["build.py", "-offline", "-vectorized"])
+
+    assert {
+        name: pathlib.Path(build.DIST_DIR, name).read_bytes() for name in DIST_FILES
+    } == expected
+
+
+def test_prod_build_writes_precompressed_outputs(offline_workspace):
+    build.main(["build.py", "-offline", "-prod"])
+
+    assert sorted(
+        p.name
+        for p in pathlib.Path(build.DIST_DIR).glob(f"{build.FLATTENED_RESULT_FILE}*")
+    ) == [
+        "flattened_data.json",
+        "flattened_data.json.br",
+        "flattened_data.json.gz",
+        "flattened_data.json.sha256",
+    ]
+
+
+def test_dev_build_removes_precompressed_outputs(offline_workspace):
+    build.main(["build.py", "-offline", "-prod"])
+
+    build.main(["build.py", "-offline"])
+
+    assert [
+        p.name
+        for p in pathlib.Path(build.DIST_DIR).glob(f"{build.FLATTENED_RESULT_FILE}*")
+    ] == ["flattened_data.json"]
+
+
+def test_build_writes_province_shards(offline_workspace):
+    build.main(["build.py", "-offline"])
+
+    sharded = ShardedThaiAddr.load(
+        f"{build.DIST_DIR}{build.SHARDS_DIR}{build.SHARD_MANIFEST_FILE}"
+    )
+    addr = ThaiAddr.load(f"{build.DIST_DIR}{build.FLATTENED_RESULT_FILE}")
+    assert sharded.find_by_zip("10280") == addr.find_by_zip("10280")
+    assert sharded.provinces() == addr.provinces()
+    assert len(sharded.loaded_provinces()) == 1
+
+
+def test_profiled_build_writes_report(offline_workspace):
+    build.main(["build.py", "-offline", "-profile=memory", "-cprofile=build"])
+
+    with open(f"{build.CACHE_DIR}{build.PROFILE_REPORT_FILE}") as f:
+        report = json.load(f)
+    assert report["stages"]["build"]["records"] == 3
+    assert sorted(report["stages"]["build"]) == [
+        "cpu",
+        "max_rss",
+        "peak_traced",
+        "records",
+        "wall",
+    ]
+    assert pathlib.Path(f"{build.CACHE_DIR}build.prof").exists()
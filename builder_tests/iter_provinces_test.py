@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from builder.build import (
+    build_tumbon_resource,
+    iter_provinces,
+    iter_structured_data,
+    iter_tumbon_rows,
+    parse_tumbon_resource,
+)
+from builder_benchmarks.synthetic import synthesize_tumbon_rows, synthesize_zip_data
+from builder_tests.tumbon_fixture import write_tumbon_workbook
+
+ZIP_DATA = {
+    "พระนคร": {"primary": "10200", "exceptional": {}},
+    "เมืองสมุทรปราการ": {"primary": "10270", "exceptional": {"ปากน้ำ": "10280"}},
+}
+
+
+def test_iter_tumbon_rows_matches_parsed_rows(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path)
+    rows, _, _, _ = parse_tumbon_resource(path)
+
+    result = list(iter_tumbon_rows(path))
+
+    assert result == rows
+
+
+def test_iter_tumbon_rows_stores_data_version(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, version="25670101")
+    info = {}
+
+    list(iter_tumbon_rows(path, info))
+
+    assert info == {"data_version": "25670101"}
+
+
+def test_iter_tumbon_rows_with_unexpected_layout(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, title="something else")
+
+    with pytest.raises(ValueError):
+        list(iter_tumbon_rows(path))
+
+
+def test_iter_structured_data_matches_default_build(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path)
+    rows, _, _, _ = parse_tumbon_resource(path)
+
+    result = list(iter_structured_data(path, ZIP_DATA))
+
+    assert json.dumps(result) == json.dumps(build_tumbon_resource(rows, ZIP_DATA))
+
+
+def test_iter_provinces_matches_default_build():
+    rows = synthesize_tumbon_rows()
+    zip_data = synthesize_zip_data(rows)
+
+    result = iter_provinces(iter(rows), zip_data)
+
+    assert json.dumps(list(result)) == json.dumps(build_tumbon_resource(rows, zip_data))
+
+
+def test_iter_provinces_with_scattered_province():
+    rows = [
+        [10000000, "กรุงเทพมหานคร"],
+        [10010000, "เขตพระนคร"],
+        [10010100, "พระบรมมหาราชวัง"],
+        [11000000, "สมุทรปราการ"],
+        [11010000, "เมืองสมุทรปราการ"],
+        [11010100, "ปากน้ำ"],
+        [10010200, "วังบูรพาภิรมย์"],
+    ]
+
+    with pytest.raises(ValueError):
+        list(iter_provinces(iter(rows), ZIP_DATA))
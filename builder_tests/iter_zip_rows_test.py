@@ -0,0 +1,93 @@
+from builder.build import iter_zip_rows, parse_zip_resource
+from builder_tests.zip_fixture import render_zip_page, write_zip_page
+
+
+def test_iter_zip_rows():
+    data = [render_zip_page()]
+
+    result = list(iter_zip_rows(data))
+
+    assert result == [
+        {"district_name": "พระนคร", "zip": "10200", "remarks": "-"},
+        {
+            "district_name": "เมืองสมุทรปราการ",
+            "zip": "10270",
+            "remarks": "ยกเว้น ตำบลปากน้ำ ใช้รหัส 10280",
+        },
+    ]
+
+
+def test_iter_zip_rows_from_small_chunks():
+    page = render_zip_page()
+    data = (page[i : i + 5] for i in range(0, len(page), 5))  # noqa: E203
+
+    result = list(iter_zip_rows(data))
+
+    assert result == list(iter_zip_rows([page]))
+
+
+def test_iter_zip_rows_strips_inline_markup_and_references():
+    data = [
+        '<table class="wikitable sortable"><tr><th>a</th><th>b</th><th>c</th></tr>'
+        '<tr><td><b><a href="x">บางเขน</a></b><sup class="reference">[1]</sup></td>'
+        "<td>10220</td><td>ยกเว้น <i>แขวงอนุสาวรีย์</i>\n ใช้รหัส 10221<br /></td>"
+        "</tr></table>"
+    ]
+
+    result = list(iter_zip_rows(data))
+
+    assert result == [
+        {
+            "district_name": "บางเขน",
+            "zip": "10220",
+            "remarks": "ยกเว้น แขวงอนุสาวรีย์ ใช้รหัส 10221",
+        }
+    ]
+
+
+def test_iter_zip_rows_tolerates_unclosed_cells():
+    data = [
+        '<table class="sortable wikitable"><tr><th>a<th>b<th>c'
+        "<tr><td><a href=x>ปทุมวัน</a><td>10330<td></table>"
+    ]
+
+    result = list(iter_zip_rows(data))
+
+    assert result == [{"district_name": "ปทุมวัน", "zip": "10330", "remarks": "-"}]
+
+
+def test_iter_zip_rows_ignores_other_tables():
+    data = [
+        '<table class="wikitable"><tr><td>ก</td><td>1</td><td>-</td></tr></table>'
+        '<table class="navbox"><tr><td>ข</td><td>2</td><td>-</td></tr></table>'
+    ]
+
+    result = list(iter_zip_rows(data))
+
+    assert result == []
+
+
+def test_parse_zip_resource(tmp_path):
+    path = str(tmp_path / "zip.html")
+    write_zip_page(path)
+
+    result = parse_zip_resource(path)
+
+    assert result == {
+        "พระนคร": {"primary": "10200", "exceptional": {}, "streets": {}},
+        "เมืองสมุทรปราการ": {
+            "primary": "10270",
+            "exceptional": {"ปากน้ำ": "10280"},
+            "streets": {},
+        },
+    }
+
+
+def test_iter_zip_rows_finds_table_tag_split_across_chunks():
+    page = "<p>" + "x" * 100 + "</p>" + render_zip_page()
+    split = page.index("<table") + 3
+    data = ["<div>", page[:split], page[split:]]
+
+    result = list(iter_zip_rows(data))
+
+    assert result == list(iter_zip_rows([render_zip_page()]))
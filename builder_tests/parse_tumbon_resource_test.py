@@ -0,0 +1,63 @@
+from builder.build import parse_tumbon_resource, read_tumbon_data_version
+from builder_tests.tumbon_fixture import TUMBON_ROWS, write_tumbon_workbook
+
+
+def test_parse_tumbon_resource(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path)
+
+    data, data_version, ok, err = parse_tumbon_resource(path)
+
+    assert ok
+    assert err is None
+    assert data_version == "25660901"
+    assert data == [
+        [code, name] for code, name, obsolete in TUMBON_ROWS if not obsolete
+    ]
+
+
+def test_parse_tumbon_resource_with_unexpected_layout(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, title="something else")
+
+    data, data_version, ok, err = parse_tumbon_resource(path)
+
+    assert not ok
+    assert err == "unexpected data layout"
+
+
+def test_read_tumbon_data_version(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, version="25670101")
+
+    result = read_tumbon_data_version(path)
+
+    assert result == ("25670101", True, None)
+
+
+def test_read_tumbon_data_version_with_unexpected_layout(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, title="something else")
+
+    result = read_tumbon_data_version(path)
+
+    assert result == (None, False, "unexpected data layout")
+
+
+def test_read_tumbon_data_version_without_marker(tmp_path):
+    path = str(tmp_path / "tumbon.xlsx")
+    write_tumbon_workbook(path, version="soon")
+
+    result = read_tumbon_data_version(path)
+
+    assert result == ("unknown", True, None)
+
+
+def test_read_tumbon_data_version_from_cached_file(tmp_path):
+    # cached resources are stored under their sha256, without an extension
+    path = str(tmp_path / "3f2a9c")
+    write_tumbon_workbook(path, version="25670101")
+
+    result = read_tumbon_data_version(path)
+
+    assert result == ("25670101", True, None)
@@ -6,7 +6,16 @@ def test_default_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": False, "log": "info"}
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_prod_options():
@@ -14,7 +23,16 @@ def test_prod_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": True, "log": "info"}
+    assert result == {
+        "check": False,
+        "prod": True,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_check_options():
@@ -22,7 +40,16 @@ def test_check_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": False, "log": "info"}
+    assert result == {
+        "check": True,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_info_options():
@@ -30,7 +57,16 @@ def test_info_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": False, "log": "info"}
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_debug_options():
@@ -38,7 +74,16 @@ def test_debug_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": False, "log": "debug"}
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_error_options():
@@ -46,7 +91,16 @@ def test_error_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": False, "log": "error"}
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "error",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_prod_debug_options():
@@ -54,7 +108,16 @@ def test_prod_debug_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": True, "log": "debug"}
+    assert result == {
+        "check": False,
+        "prod": True,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_debug_prod_options():
@@ -62,7 +125,16 @@ def test_debug_prod_options():
 
     result = parse_options(options)
 
-    assert result == {"check": False, "prod": True, "log": "debug"}
+    assert result == {
+        "check": False,
+        "prod": True,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_check_debug_options():
@@ -70,7 +142,16 @@ def test_check_debug_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": False, "log": "debug"}
+    assert result == {
+        "check": True,
+        "prod": False,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_debug_check_options():
@@ -78,7 +159,16 @@ def test_debug_check_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": False, "log": "debug"}
+    assert result == {
+        "check": True,
+        "prod": False,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_prod_check_options():
@@ -86,7 +176,16 @@ def test_prod_check_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": True, "log": "info"}
+    assert result == {
+        "check": True,
+        "prod": True,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_check_prod_options():
@@ -94,7 +193,16 @@ def test_check_prod_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": True, "log": "info"}
+    assert result == {
+        "check": True,
+        "prod": True,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
 
 
 def test_check_prod_debug_options():
@@ -102,4 +210,89 @@ def test_check_prod_debug_options():
 
     result = parse_options(options)
 
-    assert result == {"check": True, "prod": True, "log": "debug"}
+    assert result == {
+        "check": True,
+        "prod": True,
+        "log": "debug",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
+
+
+def test_offline_options():
+    options = ["-offline"]
+
+    result = parse_options(options)
+
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": True,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
+
+
+def test_vectorized_options():
+    options = ["-vectorized"]
+
+    result = parse_options(options)
+
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": True,
+        "embed": "json",
+        "profile": "off",
+        "cprofile": "",
+    }
+
+
+def test_embed_options():
+    options = ["-embed=literal"]
+
+    result = parse_options(options)
+
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "literal",
+        "profile": "off",
+        "cprofile": "",
+    }
+
+
+def test_profile_options():
+    options = ["-profile", "-cprofile=build"]
+
+    result = parse_options(options)
+
+    assert result == {
+        "check": False,
+        "prod": False,
+        "log": "info",
+        "offline": False,
+        "vectorized": False,
+        "embed": "json",
+        "profile": "time",
+        "cprofile": "build",
+    }
+
+
+def test_profile_memory_options():
+    options = ["-profile=memory"]
+
+    result = parse_options(options)
+
+    assert result["profile"] == "memory"
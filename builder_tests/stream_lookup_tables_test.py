@@ -0,0 +1,73 @@
+import json
+
+from builder.build import iter_encoded, stream_lookup_tables
+
+DATA = [
+    {
+        "name": "สมุทรปราการ",
+        "code": "11000000",
+        "districts": [
+            {
+                "name": "บางพลี",
+                "code": "11030000",
+                "subdistricts": [
+                    {"name": "บางพลีใหญ่", "code": "11030100", "zip": "10540"},
+                    {"name": "บางแก้ว", "code": "11030200", "zip": "10540"},
+                ],
+            },
+        ],
+    },
+    {
+        "name": "เชียงใหม่",
+        "code": "50000000",
+        "districts": [
+            {
+                "name": "เมืองเชียงใหม่",
+                "code": "50010000",
+                "subdistricts": [
+                    {"name": "ศรีภูมิ", "code": "50010100", "zip": "50200"},
+                ],
+            },
+        ],
+    },
+]
+
+
+def test_stream_lookup_tables():
+    encoder = json.JSONEncoder(ensure_ascii=False)
+
+    result = stream_lookup_tables(lambda: iter(DATA))
+
+    assert {
+        k: json.loads("".join(iter_encoded(v, encoder))) for k, v in result.items()
+    } == {
+        "zips": ["10540", "50200"],
+        "provinces": [
+            {"name": "เชียงใหม่", "code": "50000000"},
+            {"name": "สมุทรปราการ", "code": "11000000"},
+        ],
+        "districts": {
+            "11000000": [{"name": "บางพลี", "code": "11030000"}],
+            "50000000": [{"name": "เมืองเชียงใหม่", "code": "50010000"}],
+        },
+        "subdistricts": {
+            "11030000": [
+                {"name": "บางแก้ว", "code": "11030200"},
+                {"name": "บางพลีใหญ่", "code": "11030100"},
+            ],
+            "50010000": [{"name": "ศรีภูมิ", "code": "50010100"}],
+        },
+        "zip_provinces": {
+            "10540": [{"name": "สมุทรปราการ", "code": "11000000"}],
+            "50200": [{"name": "เชียงใหม่", "code": "50000000"}],
+        },
+        "suggestions": [
+            ["บางพลี", "11030000"],
+            ["บางพลีใหญ่", "11030100"],
+            ["บางแก้ว", "11030200"],
+            ["ศรีภูมิ", "50010100"],
+            ["สมุทรปราการ", "11000000"],
+            ["เชียงใหม่", "50000000"],
+            ["เมืองเชียงใหม่", "50010000"],
+        ],
+    }
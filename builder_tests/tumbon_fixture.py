@@ -0,0 +1,31 @@
+import openpyxl
+
+TUMBON_ROWS = [
+    [10000000, "กรุงเทพมหานคร", 0],
+    [10010000, "เขตพระนคร", 0],
+    [10010100, "พระบรมมหาราชวัง", 0],
+    [10010200, "วังบูรพาภิรมย์", 0],
+    [10019900, "ตำบลที่ยุบแล้ว", 1],
+    [11000000, "สมุทรปราการ", 0],
+    [11010000, "เมืองสมุทรปราการ", 0],
+    [11010100, "ปากน้ำ", 0],
+]
+
+
+def write_tumbon_workbook(
+    path: str,
+    rows: list = TUMBON_ROWS,
+    version: str = "25660901",
+    title: str = "ทำเนียบท้องที่",
+):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append([title])
+    sheet.append(["กรมการปกครอง"])
+    sheet.append([None])
+    sheet.append([None])
+    sheet.append(["รหัสจังหวัด 2 หลัก//อำเภอ 4 หลัก//ตำบล 6 หลัก"])
+    for code, name, obsolete in rows:
+        sheet.append([code, name, None, obsolete])
+    sheet.append([f"* update {version}"])
+    workbook.save(path)
@@ -0,0 +1,25 @@
+ZIP_ROWS = [
+    ("พระนคร", "10200", "-"),
+    ("เมืองสมุทรปราการ", "10270", "ยกเว้น ตำบลปากน้ำ ใช้รหัส 10280"),
+]
+
+
+def render_zip_page(rows: list = ZIP_ROWS) -> str:
+    table_rows = "\n".join(
+        f'<tr><td><b><a href="/wiki/{name}">{name}</a></b></td>'
+        f"<td>{zip_code}</td><td>{remarks}</td></tr>"
+        for name, zip_code, remarks in rows
+    )
+    return (
+        "<html><body>\n"
+        '<table class="wikitable sortable">\n<tbody>\n'
+        "<tr><th>อำเภอ/เขต</th><th>รหัสไปรษณีย์</th><th>หมายเหตุ</th></tr>\n"
+        f"{table_rows}\n"
+        "</tbody></table>\n"
+        "</body></html>\n"
+    )
+
+
+def write_zip_page(path: str, rows: list = ZIP_ROWS):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(render_zip_page(rows))
@@ -1,6 +1,21 @@
 import _ from 'lodash';
 
-const addresses: ThaiAddrRecord[] = [/* ADDRESSES */];
+const lazy = <T>(build: () => T): (() => T) => {
+    let value: T | undefined;
+    return (): T => value ??= build();
+};
+
+// tables are embedded by the builder (JSON.parse('...') by default, object literals with -embed=literal)
+// and only evaluated on first use, so importing stays cheap
+const addresses = lazy((): ThaiAddrRecord[] => [/* ADDRESSES */]);
+
+const sortedZips = lazy((): string[] => [/* ZIPS */]);
+const sortedProvinces = lazy((): ThaiAddrMiniRecord[] => [/* PROVINCES */]);
+const sortedDistricts = lazy((): Record<string, ThaiAddrMiniRecord[]> => ({/* DISTRICTS */}));
+const sortedSubdistricts = lazy((): Record<string, ThaiAddrMiniRecord[]> => ({/* SUBDISTRICTS */}));
+const sortedZipProvinces = lazy((): Record<string, ThaiAddrMiniRecord[]> => ({/* ZIP_PROVINCES */}));
+// [name, code] pairs of every province, district and subdistrict in code point order of names
+const suggestionIndex = lazy((): [string, string][] => [/* SUGGESTIONS */]);
 
 export interface ThaiAddrRecord {
     province: string;
@@ -17,48 +32,232 @@ export interface ThaiAddrMiniRecord {
     code: string;
 }
 
+export type ThaiAddrLevel = 'province' | 'district' | 'subdistrict';
+
+export interface ThaiAddrSuggestion {
+    name: string;
+    code: string;
+    level: ThaiAddrLevel;
+}
+
+export interface ThaiAddrSuggestScope {
+    level?: ThaiAddrLevel;
+    parentCode?: string;
+    zip?: string;
+}
+
+export interface ThaiAddrColumnarData {
+    version: number;
+    provinces: { name: string[]; code: string[] };
+    districts: { name: string[]; code: string[]; province: number[] };
+    subdistricts: { name: string[]; code: string[]; zip: string[]; district: number[] };
+}
+
+export const COLUMNAR_FORMAT_VERSION = 1;
+
+export const decodeColumnar = (data: ThaiAddrColumnarData): ThaiAddrRecord[] => {
+    if (data.version !== COLUMNAR_FORMAT_VERSION) {
+        throw new Error("unsupported columnar format version: " + data.version);
+    }
+    const { provinces, districts, subdistricts } = data;
+    return _.map(subdistricts.code, (code: string, i: number): ThaiAddrRecord => {
+        const district = subdistricts.district[i];
+        const province = districts.province[district];
+        return {
+            province: provinces.name[province],
+            district: districts.name[district],
+            subdistrict: subdistricts.name[i],
+            zip: subdistricts.zip[i],
+            subdistrictCode: code,
+            districtCode: districts.code[district],
+            provinceCode: provinces.code[province],
+        };
+    });
+};
+
+interface ThaiAddrLevelChanges<T> {
+    added: Record<string, T>;
+    removed: string[];
+    renamed: Record<string, string>;
+}
+
+export interface ThaiAddrDelta {
+    version: number;
+    from: string;
+    to: string;
+    provinces: ThaiAddrLevelChanges<{ name: string }>;
+    districts: ThaiAddrLevelChanges<{ name: string; provinceCode: string }>;
+    subdistricts: ThaiAddrLevelChanges<{ name: string; districtCode: string; zip: string }> & { zip: Record<string, string> };
+}
+
+export const DELTA_FORMAT_VERSION = 1;
+
+const applyLevelChanges = <T extends { name: string }>(entries: Map<string, T>, changes: ThaiAddrLevelChanges<T>, zips?: Record<string, string>): void => {
+    _.forEach(changes.removed, (code: string): void => { entries.delete(code); });
+    _.forEach(_.toPairs(changes.renamed), ([code, name]: [string, string]): void => { entries.set(code, { ...entries.get(code)!, name }); });
+    _.forEach(_.toPairs(zips ?? {}), ([code, zip]: [string, string]): void => { entries.set(code, { ...entries.get(code)!, zip }); });
+    _.forEach(_.toPairs(changes.added), ([code, entry]: [string, T]): void => { entries.set(code, entry); });
+};
+
+export const applyDelta = (records: readonly ThaiAddrRecord[], delta: ThaiAddrDelta): ThaiAddrRecord[] => {
+    if (delta.version !== DELTA_FORMAT_VERSION) {
+        throw new Error("unsupported delta format version: " + delta.version);
+    }
+    const provinces = new Map<string, { name: string }>();
+    const districts = new Map<string, { name: string; provinceCode: string }>();
+    const subdistricts = new Map<string, { name: string; districtCode: string; zip: string }>();
+    _.forEach(records, (addr: ThaiAddrRecord): void => {
+        provinces.set(addr.provinceCode, { name: addr.province });
+        districts.set(addr.districtCode, { name: addr.district, provinceCode: addr.provinceCode });
+        subdistricts.set(addr.subdistrictCode, { name: addr.subdistrict, districtCode: addr.districtCode, zip: addr.zip });
+    });
+    applyLevelChanges(provinces, delta.provinces);
+    applyLevelChanges(districts, delta.districts);
+    applyLevelChanges(subdistricts, delta.subdistricts, delta.subdistricts.zip);
+    return _.map(_.sortBy([...subdistricts.keys()]), (code: string): ThaiAddrRecord => {
+        const subdistrict = subdistricts.get(code)!;
+        const district = districts.get(subdistrict.districtCode)!;
+        return {
+            province: provinces.get(district.provinceCode)!.name,
+            district: district.name,
+            subdistrict: subdistrict.name,
+            zip: subdistrict.zip,
+            subdistrictCode: code,
+            districtCode: subdistrict.districtCode,
+            provinceCode: district.provinceCode,
+        };
+    });
+};
+
+export interface ThaiAddrProvinceShard {
+    name: string;
+    code: string;
+    districts: { name: string; code: string; subdistricts: { name: string; code: string; zip: string }[] }[];
+}
+
+export interface ThaiAddrShardEntry {
+    name: string;
+    code: string;
+    file: string;
+    sha256: string;
+}
+
+export interface ThaiAddrShardManifest {
+    version: number;
+    dataVersion: string;
+    provinces: ThaiAddrShardEntry[];
+    zips: Record<string, string[]>;
+}
+
+export const SHARD_FORMAT_VERSION = 1;
+
+const EMPTY: readonly never[] = Object.freeze([]);
+
+const indexes: {
+    byZip?: Map<string, readonly ThaiAddrRecord[]>;
+    bySubdistrictCode?: Map<string, ThaiAddrRecord>;
+} = {};
+
+const zipIndex = (): Map<string, readonly ThaiAddrRecord[]> =>
+    indexes.byZip ??= new Map(_.map(_.groupBy(addresses(), 'zip'), (group: ThaiAddrRecord[], zipCode: string): [string, readonly ThaiAddrRecord[]] => [zipCode, Object.freeze(group)]));
+
+const subdistrictCodeIndex = (): Map<string, ThaiAddrRecord> =>
+    indexes.bySubdistrictCode ??= new Map(_.map(_.uniqBy(addresses(), 'subdistrictCode'), (addr: ThaiAddrRecord): [string, ThaiAddrRecord] => [addr.subdistrictCode, addr]));
+
+const frozenSlice = <T>(slice: T[]): readonly T[] => {
+    if (!Object.isFrozen(slice)) {
+        _.forEach(slice, (item: T): void => { Object.freeze(item); });
+        Object.freeze(slice);
+    }
+    return slice;
+};
+
+const precomputedSlice = (table: Record<string, ThaiAddrMiniRecord[]>, key: string): readonly ThaiAddrMiniRecord[] =>
+    Object.prototype.hasOwnProperty.call(table, key) ? frozenSlice(table[key]) : EMPTY;
+
+const levelOf = (code: string): ThaiAddrLevel =>
+    code.endsWith('000000') ? 'province' : code.endsWith('0000') ? 'district' : 'subdistrict';
+
+const isWithin = (code: string, parentCode: string): boolean => {
+    const width = levelOf(parentCode) === 'province' ? 2 : 4;
+    return code !== parentCode && code.slice(0, width) === parentCode.slice(0, width);
+};
+
+const zipScopeCodes = (zipCode: string): Set<string> => {
+    const codes = new Set<string>();
+    _.forEach(zipIndex().get(zipCode) ?? EMPTY, (addr: ThaiAddrRecord): void => {
+        codes.add(addr.provinceCode).add(addr.districtCode).add(addr.subdistrictCode);
+    });
+    return codes;
+};
+
+const firstSuggestion = (prefix: string): number => {
+    let low = 0;
+    const index = suggestionIndex();
+    let high = index.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (index[mid][0] < prefix) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+};
+
+const inScope = (code: string, level: ThaiAddrLevel, scope: ThaiAddrSuggestScope, zipCodes?: Set<string>): boolean =>
+    (!scope.level || scope.level === level)
+    && (!scope.parentCode || isWithin(code, scope.parentCode))
+    && (!zipCodes || zipCodes.has(code));
+
 class ThaiAddr {
     _dataVersion: string = /* ADDRESSES_VERSION */;
 
     constructor() { }
 
-    findByZip(zipCode: string): ThaiAddrRecord[] {
-        return _.filter(addresses, (addr: ThaiAddrRecord): boolean => addr.zip === zipCode);
+    findByZip(zipCode: string): readonly ThaiAddrRecord[] {
+        return zipIndex().get(zipCode) ?? EMPTY;
     }
 
     findBySubdistrictCode(code: string): ThaiAddrRecord | undefined {
-        return _.head(_.filter(addresses, (addr: ThaiAddrRecord): boolean => addr.subdistrictCode === code));
+        return subdistrictCodeIndex().get(code);
     }
 
-    zips(): string[] {
-        return _.sortBy(_.uniq(_.map(addresses, (addr: ThaiAddrRecord): string => addr.zip)));
+    zips(): readonly string[] {
+        return frozenSlice(sortedZips());
     }
 
-    provinces(zipCode?: string): ThaiAddrMiniRecord[] {
+    provinces(zipCode?: string): readonly ThaiAddrMiniRecord[] {
         if (!!zipCode) {
-            return _.sortBy(_.uniqBy(_.map(_.filter(addresses, (addr: ThaiAddrRecord): boolean => addr.zip === zipCode), (addr: ThaiAddrRecord): ThaiAddrMiniRecord => ({
-                name: addr.province,
-                code: addr.provinceCode
-            })), 'code'), 'name');
+            return precomputedSlice(sortedZipProvinces(), zipCode);
         }
-        return _.sortBy(_.uniqBy(_.map(addresses, (addr: ThaiAddrRecord): ThaiAddrMiniRecord => ({
-            name: addr.province,
-            code: addr.provinceCode
-        })), 'code'), 'name');
+        return frozenSlice(sortedProvinces());
+    }
+
+    districts(code: string): readonly ThaiAddrMiniRecord[] {
+        return precomputedSlice(sortedDistricts(), code);
     }
 
-    districts(code: string): ThaiAddrMiniRecord[] {
-        return _.map(_.sortBy(_.uniqBy(_.filter(addresses, (addr: ThaiAddrRecord): boolean => addr.provinceCode === code), 'districtCode'), 'district'), (addr: ThaiAddrRecord): ThaiAddrMiniRecord => ({
-            name: addr.district,
-            code: addr.districtCode
-        }));
+    subdistricts(code: string): readonly ThaiAddrMiniRecord[] {
+        return precomputedSlice(sortedSubdistricts(), code);
     }
 
-    subdistricts(code: string): ThaiAddrMiniRecord[] {
-        return _.map(_.sortBy(_.uniqBy(_.filter(addresses, (addr: ThaiAddrRecord): boolean => addr.districtCode === code), 'subdistrictCode'), 'subdistrict'), (addr: ThaiAddrRecord): ThaiAddrMiniRecord => ({
-            name: addr.subdistrict,
-            code: addr.subdistrictCode
-        }));
+    suggest(prefix: string, limit: number = 10, scope: ThaiAddrSuggestScope = {}): readonly ThaiAddrSuggestion[] {
+        const zipCodes = scope.zip ? zipScopeCodes(scope.zip) : undefined;
+        const suggestions: ThaiAddrSuggestion[] = [];
+        const index = suggestionIndex();
+        for (let i = firstSuggestion(prefix); i < index.length && suggestions.length < limit; i++) {
+            const [name, code] = index[i];
+            if (!name.startsWith(prefix)) {
+                break;
+            }
+            const level = levelOf(code);
+            if (inScope(code, level, scope, zipCodes)) {
+                suggestions.push(Object.freeze({ name, code, level }));
+            }
+        }
+        return Object.freeze(suggestions);
     }
 
     dataVersion(): string {
@@ -66,4 +265,123 @@ class ThaiAddr {
     }
 };
 
+interface ThaiAddrShardIndex {
+    byZip: Map<string, readonly ThaiAddrRecord[]>;
+    bySubdistrictCode: Map<string, ThaiAddrRecord>;
+    districts: Map<string, readonly ThaiAddrMiniRecord[]>;
+    subdistricts: Map<string, readonly ThaiAddrMiniRecord[]>;
+}
+
+const miniRecord = ({ name, code }: ThaiAddrMiniRecord): ThaiAddrMiniRecord => Object.freeze({ name, code });
+
+// shards list their children in display order already
+const indexShard = (shard: ThaiAddrProvinceShard): ThaiAddrShardIndex => {
+    const records = _.flatMap(shard.districts, (district): ThaiAddrRecord[] => _.map(district.subdistricts, (subdistrict): ThaiAddrRecord => Object.freeze({
+        province: shard.name,
+        district: district.name,
+        subdistrict: subdistrict.name,
+        zip: subdistrict.zip,
+        subdistrictCode: subdistrict.code,
+        districtCode: district.code,
+        provinceCode: shard.code,
+    })));
+    return {
+        byZip: new Map(_.map(_.groupBy(_.sortBy(records, 'subdistrictCode'), 'zip'), (group: ThaiAddrRecord[], zipCode: string): [string, readonly ThaiAddrRecord[]] => [zipCode, group])),
+        bySubdistrictCode: new Map(_.map(records, (addr: ThaiAddrRecord): [string, ThaiAddrRecord] => [addr.subdistrictCode, addr])),
+        districts: new Map([[shard.code, Object.freeze(_.map(shard.districts, miniRecord))]]),
+        subdistricts: new Map(_.map(shard.districts, (district): [string, readonly ThaiAddrMiniRecord[]] => [district.code, Object.freeze(_.map(district.subdistricts, miniRecord))])),
+    };
+};
+
+const fetchJson = async <T>(url: string | URL): Promise<T> => {
+    const response = await fetch(url);
+    if (!response.ok) {
+        throw new Error("unable to fetch " + url + ": " + response.status);
+    }
+    return response.json() as Promise<T>;
+};
+
+// Answers the same queries as ThaiAddr from dist/shards/manifest.json, loading a province shard the first time a query
+// reaches it. Province lists and zip routing come from the manifest, so they stay synchronous.
+export class ShardedThaiAddr {
+    private readonly manifest: ThaiAddrShardManifest;
+    private readonly loadShard: (entry: ThaiAddrShardEntry) => Promise<ThaiAddrProvinceShard>;
+    private readonly entries: Map<string, ThaiAddrShardEntry>;
+    private readonly provinceRecords: Map<string, ThaiAddrMiniRecord>;
+    private readonly sortedZips: readonly string[];
+    private readonly shards = new Map<string, Promise<ThaiAddrShardIndex>>();
+
+    constructor(manifest: ThaiAddrShardManifest, loadShard: (entry: ThaiAddrShardEntry) => Promise<ThaiAddrProvinceShard>) {
+        if (manifest.version !== SHARD_FORMAT_VERSION) {
+            throw new Error("unsupported shard format version: " + manifest.version);
+        }
+        this.manifest = manifest;
+        this.loadShard = loadShard;
+        this.entries = new Map(_.map(manifest.provinces, (entry: ThaiAddrShardEntry): [string, ThaiAddrShardEntry] => [entry.code.slice(0, 2), entry]));
+        this.provinceRecords = new Map(_.map(manifest.provinces, (entry: ThaiAddrShardEntry): [string, ThaiAddrMiniRecord] => [entry.code, miniRecord(entry)]));
+        this.sortedZips = Object.freeze(_.sortBy(_.keys(manifest.zips)));
+    }
+
+    static async fetch(manifestUrl: string): Promise<ShardedThaiAddr> {
+        const manifest = await fetchJson<ThaiAddrShardManifest>(manifestUrl);
+        // the hash in the query string bypasses stale HTTP caches when a shard changes
+        return new ShardedThaiAddr(manifest, (entry: ThaiAddrShardEntry): Promise<ThaiAddrProvinceShard> =>
+            fetchJson(new URL(entry.file + "?" + entry.sha256, manifestUrl)));
+    }
+
+    private shard(code: string): Promise<ThaiAddrShardIndex | undefined> {
+        const entry = this.entries.get(code.slice(0, 2));
+        if (!entry) {
+            return Promise.resolve(undefined);
+        }
+        let shard = this.shards.get(entry.code);
+        if (!shard) {
+            shard = this.loadShard(entry).then(indexShard);
+            // a failed load is retried by the next query
+            shard.catch((): void => { this.shards.delete(entry.code); });
+            this.shards.set(entry.code, shard);
+        }
+        return shard;
+    }
+
+    private routedProvinceCodes(zipCode: string): readonly string[] {
+        return Object.prototype.hasOwnProperty.call(this.manifest.zips, zipCode) ? this.manifest.zips[zipCode] : EMPTY;
+    }
+
+    loadedProvinces(): readonly string[] {
+        return [...this.shards.keys()];
+    }
+
+    async findByZip(zipCode: string): Promise<readonly ThaiAddrRecord[]> {
+        const shards = await Promise.all(_.map(this.routedProvinceCodes(zipCode), (code: string) => this.shard(code)));
+        const records = _.flatMap(shards, (shard?: ThaiAddrShardIndex): readonly ThaiAddrRecord[] => shard?.byZip.get(zipCode) ?? EMPTY);
+        return Object.freeze(_.sortBy(records, 'subdistrictCode'));
+    }
+
+    async findBySubdistrictCode(code: string): Promise<ThaiAddrRecord | undefined> {
+        return (await this.shard(code))?.bySubdistrictCode.get(code);
+    }
+
+    zips(): readonly string[] {
+        return this.sortedZips;
+    }
+
+    provinces(zipCode?: string): readonly ThaiAddrMiniRecord[] {
+        const codes = !!zipCode ? this.routedProvinceCodes(zipCode) : _.map(this.manifest.provinces, 'code');
+        return Object.freeze(_.map(codes, (code: string): ThaiAddrMiniRecord => this.provinceRecords.get(code)!));
+    }
+
+    async districts(code: string): Promise<readonly ThaiAddrMiniRecord[]> {
+        return (await this.shard(code))?.districts.get(code) ?? EMPTY;
+    }
+
+    async subdistricts(code: string): Promise<readonly ThaiAddrMiniRecord[]> {
+        return (await this.shard(code))?.subdistricts.get(code) ?? EMPTY;
+    }
+
+    dataVersion(): string {
+        return this.manifest.dataVersion;
+    }
+};
+
 export default ThaiAddr;
@@ -0,0 +1,26 @@
+from thai_address.binary import BinaryThaiAddr, encode_binary
+from thai_address.collation import thai_sort_key
+from thai_address.columnar import decode_columnar, encode_columnar
+from thai_address.delta import apply_delta, diff_flattened
+from thai_address.fuzzy import AddressMatcher
+from thai_address.lookup import ThaiAddr, ThaiAddrMiniRecord, ThaiAddrRecord
+from thai_address.shards import ShardedThaiAddr
+from thai_address.sqlite import SqliteThaiAddr
+from thai_address.streets import StreetZipIndex
+
+__all__ = [
+    "AddressMatcher",
+    "BinaryThaiAddr",
+    "ShardedThaiAddr",
+    "SqliteThaiAddr",
+    "StreetZipIndex",
+    "ThaiAddr",
+    "ThaiAddrMiniRecord",
+    "ThaiAddrRecord",
+    "apply_delta",
+    "decode_columnar",
+    "diff_flattened",
+    "encode_binary",
+    "encode_columnar",
+    "thai_sort_key",
+]
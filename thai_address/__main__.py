@@ -0,0 +1,47 @@
+import logging
+import random
+import sys
+import time
+import timeit
+
+from thai_address.lookup import FLATTENED_DATA_FILE, ThaiAddr
+
+LOOKUP_ROUNDS = 100000
+LOOKUP_SAMPLE_SIZE = 1000
+
+
+def measure_lookups(addr: ThaiAddr, rounds: int = LOOKUP_ROUNDS) -> dict:
+    if len(addr) == 0:
+        return {}
+    sample = random.Random(0).choices(list(addr), k=LOOKUP_SAMPLE_SIZE)
+    queries = {
+        "find_by_zip": lambda r: addr.find_by_zip(r.zip),
+        "find_by_subdistrict_code": lambda r: addr.find_by_subdistrict_code(
+            r.subdistrict_code
+        ),
+        "provinces": lambda r: addr.provinces(r.zip),
+        "districts": lambda r: addr.districts(r.province_code),
+        "subdistricts": lambda r: addr.subdistricts(r.district_code),
+    }
+    number = max(1, rounds // LOOKUP_SAMPLE_SIZE)
+    latencies = {}
+    for name, query in queries.items():
+        elapsed = timeit.timeit(lambda: [query(r) for r in sample], number=number)
+        latencies[name] = elapsed / (number * LOOKUP_SAMPLE_SIZE)
+    return latencies
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    path = sys.argv[1] if len(sys.argv) > 1 else FLATTENED_DATA_FILE
+
+    started = time.perf_counter()
+    addr = ThaiAddr.load(path)
+    logging.info(
+        "Loaded {} records in {:.1f} ms".format(
+            len(addr), (time.perf_counter() - started) * 1000
+        )
+    )
+    logging.info("Memory usage: {:.1f} KiB".format(addr.memory_usage() / 1024))
+    for name, latency in measure_lookups(addr).items():
+        logging.info("{}: {:.3f} us per lookup".format(name, latency * 1000000))
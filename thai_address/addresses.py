@@ -0,0 +1,116 @@
+import collections
+import concurrent.futures
+import itertools
+import os
+import re
+from typing import Iterable, Iterator, Optional
+
+ADDRESS_CHUNK_SIZE = 10000
+ADDRESS_ZIP = re.compile(r".*(\d{5})")
+UNPARSABLE_ADDRESS = "unparsable address"
+UNKNOWN_KEY = "unknown key"
+KNOWN_KEYS = None
+
+
+def parse_address(addr: str) -> dict:
+    # "... ต.<subdistrict> อ.<district> จ.<province> <zip>", split only once
+    tokens = addr.split(" ")
+    if len(tokens) < 3:
+        raise ValueError(f"{UNPARSABLE_ADDRESS}: {addr}")
+    zip_code = address_zip(addr, tokens[-1])
+    (province, district, subdistrict) = address_names(tokens)
+    return {"zip": zip_code, "key": f"{province}_{district}_{subdistrict}"}
+
+
+def address_zip(addr: str, last_token: str) -> str:
+    if len(last_token) == 5 and last_token.isdecimal() and "\n" not in addr:
+        return last_token
+    # the zip is not the last token, fall back to the last five digits
+    matches = ADDRESS_ZIP.match(addr)
+    if not matches:
+        raise ValueError(f"{UNPARSABLE_ADDRESS}: {addr}")
+    return matches[1]
+
+
+def address_names(tokens: list) -> tuple[str, str, str]:
+    return (
+        province_name(tokens[-2]),
+        district_name(tokens[-3]),
+        subdistrict_name(tokens[-4]) if len(tokens) > 3 else "",
+    )
+
+
+def province_name(token: str) -> str:
+    if token.startswith("จ."):
+        return token[2:]
+    return token
+
+
+def district_name(token: str) -> str:
+    for prefix in ("อ.", "เขต", "อำเภอ"):
+        if token.startswith(prefix):
+            return token[len(prefix) :]  # noqa: E203
+    return token
+
+
+def subdistrict_name(token: str) -> str:
+    for prefix in ("ต.", "แขวง", "ตำบล"):
+        if token.startswith(prefix):
+            return token[len(prefix) :]  # noqa: E203
+    for prefix in ("ต.", "แขวง", "ตำบล"):
+        pos = token.find(prefix)
+        if pos != -1:
+            return token[pos + len(prefix) :]  # noqa: E203
+    return token
+
+
+def address_keys(flattened: list) -> frozenset:
+    return frozenset(
+        f"{r['province']}_{r['district']}_{r['subdistrict']}" for r in flattened
+    )
+
+
+def parse_addresses(
+    addresses: Iterable[str], keys: Optional[frozenset] = None
+) -> Iterator[dict]:
+    for addr in addresses:
+        try:
+            result = parse_address(addr)
+        except ValueError:
+            result = {"zip": None, "key": None, "error": UNPARSABLE_ADDRESS}
+        else:
+            known = keys is None or result["key"] in keys
+            result["error"] = None if known else UNKNOWN_KEY
+        yield {"address": addr} | result
+
+
+def parse_addresses_parallel(
+    addresses: Iterable[str],
+    keys: Optional[frozenset] = None,
+    workers: int = None,
+    chunk_size: int = ADDRESS_CHUNK_SIZE,
+) -> Iterator[dict]:
+    # results keep the input order; at most two chunks per worker are in
+    # flight, so arbitrarily long inputs stream through in bounded memory
+    workers = workers or os.cpu_count() or 1
+    addresses = iter(addresses)
+    chunks = iter(lambda: list(itertools.islice(addresses, chunk_size)), [])
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=set_known_keys, initargs=(keys,)
+    ) as pool:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(pool.submit(parse_address_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def set_known_keys(keys: Optional[frozenset]):
+    global KNOWN_KEYS
+    KNOWN_KEYS = keys
+
+
+def parse_address_chunk(chunk: list) -> list:
+    return list(parse_addresses(chunk, KNOWN_KEYS))
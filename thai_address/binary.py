@@ -0,0 +1,248 @@
+import bisect
+import mmap
+import struct
+from typing import Iterable, Optional
+
+from thai_address.lookup import ThaiAddrMiniRecord, ThaiAddrRecord, sort_mini_records
+
+BINARY_DATA_FILE = "dist/thai_address.bin"
+BINARY_MAGIC = b"THADDR\0\0"
+BINARY_FORMAT_VERSION = 1
+
+# magic, format version, reserved, data version, record count,
+# string pool offset, record table offset, zip index offset
+HEADER = struct.Struct("<8sHHIIIII")
+# subdistrict code, district code, province code, zip,
+# subdistrict name, district name, province name (string pool offsets)
+RECORD = struct.Struct("<7I")
+# zip, record index
+ZIP_ENTRY = struct.Struct("<2I")
+STRING_LENGTH = struct.Struct("<H")
+CODE_WIDTH = 8
+ZIP_WIDTH = 5
+
+SUBDISTRICT_CODE, DISTRICT_CODE, PROVINCE_CODE = range(3)
+
+
+def encode_binary(flattened: Iterable[dict], data_version: str = "") -> bytes:
+    # the records are packed as they are read and only these rows are sorted,
+    # so a stream of records is never held as dicts
+    records = sorted(
+        (
+            parse_numeric_code(record["subdistrictCode"]),
+            parse_numeric_code(record["districtCode"]),
+            parse_numeric_code(record["provinceCode"]),
+            parse_numeric_code(record["zip"], ZIP_WIDTH),
+            record["subdistrict"],
+            record["district"],
+            record["province"],
+        )
+        for record in flattened
+    )
+
+    pool = bytearray()
+    pool_offsets = {}
+
+    def intern(value: str) -> int:
+        if value not in pool_offsets:
+            encoded = value.encode("utf-8")
+            pool_offsets[value] = len(pool)
+            pool.extend(STRING_LENGTH.pack(len(encoded)))
+            pool.extend(encoded)
+        return pool_offsets[value]
+
+    record_table = bytearray()
+    for *codes, subdistrict, district, province in records:
+        record_table.extend(
+            RECORD.pack(*codes, intern(subdistrict), intern(district), intern(province))
+        )
+
+    zip_index = bytearray()
+    for zip_code, i in sorted((r[3], i) for i, r in enumerate(records)):
+        zip_index.extend(ZIP_ENTRY.pack(zip_code, i))
+
+    pool_offset = HEADER.size
+    records_offset = pool_offset + len(pool)
+    zip_index_offset = records_offset + len(record_table)
+    header = HEADER.pack(
+        BINARY_MAGIC,
+        BINARY_FORMAT_VERSION,
+        0,
+        int(data_version) if data_version.isdigit() else 0,
+        len(records),
+        pool_offset,
+        records_offset,
+        zip_index_offset,
+    )
+    return bytes(header + pool + record_table + zip_index)
+
+
+def parse_numeric_code(code: str, width: int = CODE_WIDTH) -> int:
+    if len(code) != width or not code.isdigit():
+        raise ValueError(f"code cannot be encoded as {width} digits: {code}")
+    return int(code)
+
+
+class Column:
+    # Read-only sequence over one field of a fixed-width table, so bisect can
+    # search the mapped file without materializing it.
+    __slots__ = ("_buffer", "_offset", "_record", "_field", "_length")
+
+    def __init__(
+        self, buffer, offset: int, record: struct.Struct, field: int, length: int
+    ):
+        self._buffer = buffer
+        self._offset = offset
+        self._record = record
+        self._field = field
+        self._length = length
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, i: int) -> int:
+        return self._record.unpack_from(
+            self._buffer, self._offset + i * self._record.size
+        )[self._field]
+
+
+class BinaryThaiAddr:
+    def __init__(self, path: str = BINARY_DATA_FILE):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            magic,
+            version,
+            _,
+            self._data_version,
+            self._count,
+            self._pool_offset,
+            self._records_offset,
+            self._zip_index_offset,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != BINARY_MAGIC:
+            self.close()
+            raise ValueError(f"not a thai address binary file: {path}")
+        if version != BINARY_FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"unsupported binary format version: {version}")
+        self._codes = [
+            Column(self._mmap, self._records_offset, RECORD, field, self._count)
+            for field in (SUBDISTRICT_CODE, DISTRICT_CODE, PROVINCE_CODE)
+        ]
+        self._zips = Column(
+            self._mmap, self._zip_index_offset, ZIP_ENTRY, 0, self._count
+        )
+
+    def __enter__(self) -> "BinaryThaiAddr":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self):
+        self._mmap.close()
+
+    def find_by_zip(self, zip_code: str) -> tuple[ThaiAddrRecord, ...]:
+        if not zip_code.isdigit():
+            return ()
+        first, last = self._range(self._zips, int(zip_code))
+        return tuple(
+            self._record(
+                ZIP_ENTRY.unpack_from(
+                    self._mmap, self._zip_index_offset + i * ZIP_ENTRY.size
+                )[1]
+            )
+            for i in range(first, last)
+        )
+
+    def find_by_subdistrict_code(self, code: str) -> Optional[ThaiAddrRecord]:
+        if not code.isdigit():
+            return None
+        first, last = self._range(self._codes[SUBDISTRICT_CODE], int(code))
+        return self._record(first) if first < last else None
+
+    def zips(self) -> tuple[str, ...]:
+        return tuple(
+            f"{zip_code:0{ZIP_WIDTH}d}" for zip_code, _ in self._distinct(self._zips)
+        )
+
+    def provinces(self, zip_code: str = None) -> tuple[ThaiAddrMiniRecord, ...]:
+        if zip_code:
+            return sort_mini_records(
+                ThaiAddrMiniRecord(r.province, r.province_code)
+                for r in self.find_by_zip(zip_code)
+            )
+        return sort_mini_records(
+            ThaiAddrMiniRecord(r.province, r.province_code)
+            for r in (
+                self._record(i) for _, i in self._distinct(self._codes[PROVINCE_CODE])
+            )
+        )
+
+    def districts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        if not code.isdigit():
+            return ()
+        first, last = self._range(self._codes[PROVINCE_CODE], int(code))
+        return sort_mini_records(
+            ThaiAddrMiniRecord(r.district, r.district_code)
+            for r in (
+                self._record(i)
+                for _, i in self._distinct(self._codes[DISTRICT_CODE], first, last)
+            )
+        )
+
+    def subdistricts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        if not code.isdigit():
+            return ()
+        first, last = self._range(self._codes[DISTRICT_CODE], int(code))
+        return sort_mini_records(
+            ThaiAddrMiniRecord(r.subdistrict, r.subdistrict_code)
+            for r in (self._record(i) for i in range(first, last))
+        )
+
+    def data_version(self) -> str:
+        return str(self._data_version) if self._data_version else ""
+
+    def _range(
+        self, column: Column, value: int, first: int = 0, last: int = None
+    ) -> tuple[int, int]:
+        last = len(column) if last is None else last
+        first = bisect.bisect_left(column, value, first, last)
+        return (first, bisect.bisect_right(column, value, first, last))
+
+    def _distinct(self, column: Column, first: int = 0, last: int = None):
+        last = len(column) if last is None else last
+        while first < last:
+            value = column[first]
+            yield (value, first)
+            first = bisect.bisect_right(column, value, first, last)
+
+    def _record(self, i: int) -> ThaiAddrRecord:
+        (
+            subdistrict_code,
+            district_code,
+            province_code,
+            zip_code,
+            subdistrict,
+            district,
+            province,
+        ) = RECORD.unpack_from(self._mmap, self._records_offset + i * RECORD.size)
+        return ThaiAddrRecord(
+            self._string(province),
+            self._string(district),
+            self._string(subdistrict),
+            f"{zip_code:0{ZIP_WIDTH}d}",
+            f"{subdistrict_code:0{CODE_WIDTH}d}",
+            f"{district_code:0{CODE_WIDTH}d}",
+            f"{province_code:0{CODE_WIDTH}d}",
+        )
+
+    def _string(self, offset: int) -> str:
+        start = self._pool_offset + offset
+        (length,) = STRING_LENGTH.unpack_from(self._mmap, start)
+        start += STRING_LENGTH.size
+        return self._mmap[start : start + length].decode("utf-8")  # noqa: E203
@@ -0,0 +1,11 @@
+import re
+
+THAI_LEADING_VOWEL_PATTERN = re.compile(r"([เ-ไ])([ก-ฮ])")
+THAI_TONE_MARK_PATTERN = re.compile(r"[็-๎]")
+
+
+def thai_sort_key(name: str) -> tuple[str, str]:
+    # Thai collation orders by consonant first, so leading vowels are moved behind
+    # the consonant they precede and tone marks only break ties.
+    swapped = THAI_LEADING_VOWEL_PATTERN.sub(r"\2\1", name)
+    return (THAI_TONE_MARK_PATTERN.sub("", swapped), swapped)
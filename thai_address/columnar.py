@@ -0,0 +1,59 @@
+from typing import Iterable
+
+COLUMNAR_FORMAT_VERSION = 1
+
+
+def encode_columnar(flattened: Iterable[dict]) -> dict:
+    provinces = {"name": [], "code": []}
+    districts = {"name": [], "code": [], "province": []}
+    subdistricts = {"name": [], "code": [], "zip": [], "district": []}
+    province_index = {}
+    district_index = {}
+    for record in flattened:
+        if record["provinceCode"] not in province_index:
+            province_index[record["provinceCode"]] = len(provinces["code"])
+            provinces["name"].append(record["province"])
+            provinces["code"].append(record["provinceCode"])
+        if record["districtCode"] not in district_index:
+            district_index[record["districtCode"]] = len(districts["code"])
+            districts["name"].append(record["district"])
+            districts["code"].append(record["districtCode"])
+            districts["province"].append(province_index[record["provinceCode"]])
+        subdistricts["name"].append(record["subdistrict"])
+        subdistricts["code"].append(record["subdistrictCode"])
+        subdistricts["zip"].append(record["zip"])
+        subdistricts["district"].append(district_index[record["districtCode"]])
+    return {
+        "version": COLUMNAR_FORMAT_VERSION,
+        "provinces": provinces,
+        "districts": districts,
+        "subdistricts": subdistricts,
+    }
+
+
+def decode_columnar(data: dict) -> list:
+    if data.get("version") != COLUMNAR_FORMAT_VERSION:
+        raise ValueError(f"unsupported columnar format version: {data.get('version')}")
+    provinces = data["provinces"]
+    districts = data["districts"]
+    subdistricts = data["subdistricts"]
+    out = []
+    for name, code, zip_code, district in zip(
+        subdistricts["name"],
+        subdistricts["code"],
+        subdistricts["zip"],
+        subdistricts["district"],
+    ):
+        province = districts["province"][district]
+        out.append(
+            {
+                "province": provinces["name"][province],
+                "district": districts["name"][district],
+                "subdistrict": name,
+                "zip": zip_code,
+                "subdistrictCode": code,
+                "districtCode": districts["code"][district],
+                "provinceCode": provinces["code"][province],
+            }
+        )
+    return out
@@ -0,0 +1,95 @@
+from typing import Iterable
+
+DELTA_FORMAT_VERSION = 1
+
+
+def diff_flattened(
+    old: Iterable[dict], new: Iterable[dict], from_version: str, to_version: str
+) -> dict:
+    old_levels = split_levels(old)
+    new_levels = split_levels(new)
+    delta = {"version": DELTA_FORMAT_VERSION, "from": from_version, "to": to_version}
+    for level in ("provinces", "districts", "subdistricts"):
+        old_entries = old_levels[level]
+        new_entries = new_levels[level]
+        changes = {
+            "added": {
+                code: entry
+                for code, entry in new_entries.items()
+                if code not in old_entries
+            },
+            "removed": sorted(code for code in old_entries if code not in new_entries),
+            "renamed": {
+                code: entry["name"]
+                for code, entry in new_entries.items()
+                if code in old_entries and old_entries[code]["name"] != entry["name"]
+            },
+        }
+        if level == "subdistricts":
+            changes["zip"] = {
+                code: entry["zip"]
+                for code, entry in new_entries.items()
+                if code in old_entries and old_entries[code]["zip"] != entry["zip"]
+            }
+        delta[level] = changes
+    return delta
+
+
+def apply_delta(flattened: list, delta: dict) -> list:
+    if delta.get("version") != DELTA_FORMAT_VERSION:
+        raise ValueError(f"unsupported delta format version: {delta.get('version')}")
+    levels = split_levels(flattened)
+    for level in ("provinces", "districts", "subdistricts"):
+        entries = levels[level]
+        changes = delta[level]
+        for code in changes["removed"]:
+            entries.pop(code, None)
+        for code, name in changes["renamed"].items():
+            entries[code] = entries[code] | {"name": name}
+        for code, zip_code in changes.get("zip", {}).items():
+            entries[code] = entries[code] | {"zip": zip_code}
+        entries.update(changes["added"])
+    return join_levels(levels)
+
+
+def split_levels(flattened: Iterable[dict]) -> dict:
+    provinces = {}
+    districts = {}
+    subdistricts = {}
+    for record in flattened:
+        provinces[record["provinceCode"]] = {"name": record["province"]}
+        districts[record["districtCode"]] = {
+            "name": record["district"],
+            "provinceCode": record["provinceCode"],
+        }
+        subdistricts[record["subdistrictCode"]] = {
+            "name": record["subdistrict"],
+            "districtCode": record["districtCode"],
+            "zip": record["zip"],
+        }
+    return {
+        "provinces": provinces,
+        "districts": districts,
+        "subdistricts": subdistricts,
+    }
+
+
+def join_levels(levels: dict) -> list:
+    provinces = levels["provinces"]
+    districts = levels["districts"]
+    out = []
+    for code in sorted(levels["subdistricts"]):
+        subdistrict = levels["subdistricts"][code]
+        district = districts[subdistrict["districtCode"]]
+        out.append(
+            {
+                "province": provinces[district["provinceCode"]]["name"],
+                "district": district["name"],
+                "subdistrict": subdistrict["name"],
+                "zip": subdistrict["zip"],
+                "subdistrictCode": code,
+                "districtCode": subdistrict["districtCode"],
+                "provinceCode": district["provinceCode"],
+            }
+        )
+    return out
@@ -0,0 +1,126 @@
+import json
+import re
+import unicodedata
+from typing import Iterable, NamedTuple
+
+from thai_address.addresses import address_names
+
+MATCH_INDEX_DATA_FILE = "dist/match_index.json"
+MATCH_INDEX_FORMAT_VERSION = 1
+MATCH_BEAM_WIDTH = 3
+
+NAME_PREFIXES = re.compile(r"^(?:จังหวัด|อำเภอ|ตำบล|แขวง|เขต|จ\.|อ\.|ต\.)+")
+# tone marks and the silent-letter mark are the characters most often
+# dropped or mistyped, so they take no part in matching
+NAME_NOISE = re.compile(r"[\u0e48-\u0e4c\s.]")
+
+
+class AddressMatch(NamedTuple):
+    subdistrict_code: str
+    score: float
+
+
+def normalize_name(name: str) -> str:
+    name = unicodedata.normalize("NFC", name).strip().replace("\u0e4d\u0e32", "\u0e33")
+    return NAME_NOISE.sub("", NAME_PREFIXES.sub("", name))
+
+
+def name_grams(normalized: str) -> frozenset:
+    padded = f"^{normalized}$"
+    return frozenset(padded[i : i + 2] for i in range(len(padded) - 1))  # noqa: E203
+
+
+def similarity(query: frozenset, grams: frozenset) -> float:
+    if not query or not grams:
+        return 0.0
+    return 2 * len(query & grams) / (len(query) + len(grams))
+
+
+def encode_match_index(flattened: Iterable[dict]) -> dict:
+    provinces = {}
+    districts = {}
+    subdistricts = {}
+    for record in flattened:
+        provinces.setdefault(
+            record["provinceCode"], [record["provinceCode"], record["province"]]
+        )
+        districts.setdefault(
+            record["districtCode"],
+            [record["districtCode"], record["provinceCode"], record["district"]],
+        )
+        subdistricts.setdefault(
+            record["subdistrictCode"],
+            [record["subdistrictCode"], record["districtCode"], record["subdistrict"]],
+        )
+    return {
+        "version": MATCH_INDEX_FORMAT_VERSION,
+        "provinces": [[c, normalize_name(n)] for c, n in provinces.values()],
+        "districts": [[c, p, normalize_name(n)] for c, p, n in districts.values()],
+        "subdistricts": [
+            [c, d, normalize_name(n)] for c, d, n in subdistricts.values()
+        ],
+    }
+
+
+class AddressMatcher:
+    # Ranks subdistricts by character bigram similarity, one level at a time:
+    # only the best few provinces are searched for districts, and only their
+    # best few districts for subdistricts, so a query scores about a hundred
+    # names instead of every subdistrict in the country.
+    __slots__ = ("_provinces", "_districts", "_subdistricts")
+
+    def __init__(self, data: dict):
+        if data.get("version") != MATCH_INDEX_FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported match index format version: {data.get('version')}"
+            )
+        self._provinces = [(c, name_grams(n)) for c, n in data["provinces"]]
+        self._districts = group_by_parent(data["districts"])
+        self._subdistricts = group_by_parent(data["subdistricts"])
+
+    @classmethod
+    def from_flattened(cls, data: list) -> "AddressMatcher":
+        return cls(encode_match_index(data))
+
+    @classmethod
+    def load(cls, path: str = MATCH_INDEX_DATA_FILE) -> "AddressMatcher":
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def match(
+        self, province: str, district: str, subdistrict: str, limit: int = 5
+    ) -> tuple[AddressMatch, ...]:
+        district_query = name_grams(normalize_name(district))
+        subdistrict_query = name_grams(normalize_name(subdistrict))
+        matches = []
+        for province_code, province_score in best_matches(
+            name_grams(normalize_name(province)), self._provinces
+        ):
+            for district_code, district_score in best_matches(
+                district_query, self._districts.get(province_code, ())
+            ):
+                for code, grams in self._subdistricts.get(district_code, ()):
+                    score = province_score + district_score
+                    score += similarity(subdistrict_query, grams)
+                    matches.append(AddressMatch(code, round(score / 3, 6)))
+        matches.sort(key=lambda m: (-m.score, m.subdistrict_code))
+        return tuple(matches[:limit])
+
+    def match_address(self, addr: str, limit: int = 5) -> tuple[AddressMatch, ...]:
+        tokens = addr.split(" ")
+        if len(tokens) < 3:
+            return ()
+        return self.match(*address_names(tokens), limit)
+
+
+def group_by_parent(entries: list) -> dict:
+    groups = {}
+    for code, parent, normalized in entries:
+        groups.setdefault(parent, []).append((code, name_grams(normalized)))
+    return groups
+
+
+def best_matches(query: frozenset, candidates) -> list:
+    scored = [(code, similarity(query, grams)) for code, grams in candidates]
+    scored.sort(key=lambda s: (-s[1], s[0]))
+    return scored[:MATCH_BEAM_WIDTH]
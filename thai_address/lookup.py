@@ -0,0 +1,190 @@
+import json
+import sys
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from thai_address.collation import thai_sort_key
+from thai_address.columnar import decode_columnar
+from thai_address.delta import apply_delta
+
+FLATTENED_DATA_FILE = "dist/flattened_data.json"
+COLUMNAR_DATA_FILE = "dist/columnar_data.json"
+
+
+class ThaiAddrRecord(NamedTuple):
+    province: str
+    district: str
+    subdistrict: str
+    zip: str
+    subdistrict_code: str
+    district_code: str
+    province_code: str
+
+    @classmethod
+    def from_flattened(cls, data: dict) -> "ThaiAddrRecord":
+        return cls(
+            sys.intern(data["province"]),
+            sys.intern(data["district"]),
+            sys.intern(data["subdistrict"]),
+            sys.intern(data["zip"]),
+            sys.intern(data["subdistrictCode"]),
+            sys.intern(data["districtCode"]),
+            sys.intern(data["provinceCode"]),
+        )
+
+    def to_flattened(self) -> dict:
+        return {
+            "province": self.province,
+            "district": self.district,
+            "subdistrict": self.subdistrict,
+            "zip": self.zip,
+            "subdistrictCode": self.subdistrict_code,
+            "districtCode": self.district_code,
+            "provinceCode": self.province_code,
+        }
+
+
+class ThaiAddrMiniRecord(NamedTuple):
+    name: str
+    code: str
+
+
+class ThaiAddr:
+    __slots__ = (
+        "_records",
+        "_data_version",
+        "_by_zip",
+        "_by_subdistrict_code",
+        "_zips",
+        "_provinces",
+        "_provinces_by_zip",
+        "_districts_by_province_code",
+        "_subdistricts_by_district_code",
+    )
+
+    def __init__(self, records: Iterable[ThaiAddrRecord], data_version: str = ""):
+        self._records = tuple(records)
+        self._data_version = data_version
+
+        by_zip = {}
+        by_subdistrict_code = {}
+        provinces = {}
+        provinces_by_zip = {}
+        districts_by_province_code = {}
+        subdistricts_by_district_code = {}
+        for record in self._records:
+            by_zip.setdefault(record.zip, []).append(record)
+            by_subdistrict_code.setdefault(record.subdistrict_code, record)
+            province = ThaiAddrMiniRecord(record.province, record.province_code)
+            provinces.setdefault(record.province_code, province)
+            provinces_by_zip.setdefault(record.zip, {}).setdefault(
+                record.province_code, province
+            )
+            districts_by_province_code.setdefault(record.province_code, {}).setdefault(
+                record.district_code,
+                ThaiAddrMiniRecord(record.district, record.district_code),
+            )
+            subdistricts_by_district_code.setdefault(
+                record.district_code, {}
+            ).setdefault(
+                record.subdistrict_code,
+                ThaiAddrMiniRecord(record.subdistrict, record.subdistrict_code),
+            )
+
+        self._by_zip = {k: tuple(v) for k, v in by_zip.items()}
+        self._by_subdistrict_code = by_subdistrict_code
+        self._zips = tuple(sorted(by_zip))
+        self._provinces = sort_mini_records(provinces.values())
+        self._provinces_by_zip = {
+            k: sort_mini_records(v.values()) for k, v in provinces_by_zip.items()
+        }
+        self._districts_by_province_code = {
+            k: sort_mini_records(v.values())
+            for k, v in districts_by_province_code.items()
+        }
+        self._subdistricts_by_district_code = {
+            k: sort_mini_records(v.values())
+            for k, v in subdistricts_by_district_code.items()
+        }
+
+    @classmethod
+    def from_flattened(cls, data: list, data_version: str = "") -> "ThaiAddr":
+        return cls(map(ThaiAddrRecord.from_flattened, data), data_version)
+
+    @classmethod
+    def load(
+        cls, path: str = FLATTENED_DATA_FILE, data_version: str = ""
+    ) -> "ThaiAddr":
+        with open(path, "r") as f:
+            return cls.from_flattened(json.load(f), data_version)
+
+    @classmethod
+    def load_columnar(
+        cls, path: str = COLUMNAR_DATA_FILE, data_version: str = ""
+    ) -> "ThaiAddr":
+        with open(path, "r") as f:
+            return cls.from_flattened(decode_columnar(json.load(f)), data_version)
+
+    def with_delta(self, delta: dict) -> "ThaiAddr":
+        flattened = [record.to_flattened() for record in self._records]
+        return ThaiAddr.from_flattened(apply_delta(flattened, delta), delta["to"])
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[ThaiAddrRecord]:
+        return iter(self._records)
+
+    def find_by_zip(self, zip_code: str) -> tuple[ThaiAddrRecord, ...]:
+        return self._by_zip.get(zip_code, ())
+
+    def find_by_subdistrict_code(self, code: str) -> Optional[ThaiAddrRecord]:
+        return self._by_subdistrict_code.get(code)
+
+    def zips(self) -> tuple[str, ...]:
+        return self._zips
+
+    def provinces(self, zip_code: str = None) -> tuple[ThaiAddrMiniRecord, ...]:
+        if zip_code:
+            return self._provinces_by_zip.get(zip_code, ())
+        return self._provinces
+
+    def districts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        return self._districts_by_province_code.get(code, ())
+
+    def subdistricts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        return self._subdistricts_by_district_code.get(code, ())
+
+    def data_version(self) -> str:
+        return self._data_version
+
+    def memory_usage(self) -> int:
+        return deep_sizeof(*[getattr(self, slot) for slot in self.__slots__])
+
+
+def sort_mini_records(
+    records: Iterable[ThaiAddrMiniRecord],
+) -> tuple[ThaiAddrMiniRecord, ...]:
+    unique_records = {}
+    for record in records:
+        unique_records.setdefault(record.code, record)
+    return tuple(
+        sorted(unique_records.values(), key=lambda r: (thai_sort_key(r.name), r.code))
+    )
+
+
+def deep_sizeof(*values: object) -> int:
+    seen = set()
+    pending = list(values)
+    size = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            pending.extend(item.keys())
+            pending.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            pending.extend(item)
+    return size
@@ -0,0 +1,118 @@
+import collections
+import csv
+import json
+import logging
+import os
+import sys
+import time
+from typing import Iterable, Iterator
+
+from thai_address.addresses import (
+    ADDRESS_CHUNK_SIZE,
+    UNKNOWN_KEY,
+    UNPARSABLE_ADDRESS,
+    address_keys,
+    parse_addresses_parallel,
+)
+from thai_address.lookup import FLATTENED_DATA_FILE
+
+ADDRESS_COLUMN = "address"
+ADDRESS_FIELDS = ["address", "zip", "key", "error"]
+
+
+def read_addresses(path: str, column: str = ADDRESS_COLUMN) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row[column]
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)[column]
+
+
+def write_results(path: str, results: Iterable[dict]) -> collections.Counter:
+    counts = collections.Counter()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(f, fieldnames=ADDRESS_FIELDS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+
+            def write(result: dict):
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+        for result in results:
+            write(result)
+            counts[result["error"]] += 1
+    return counts
+
+
+def parse_options(argv: list) -> dict:
+    options = {
+        "data": FLATTENED_DATA_FILE,
+        "column": ADDRESS_COLUMN,
+        "workers": os.cpu_count() or 1,
+        "chunk": ADDRESS_CHUNK_SIZE,
+        "files": [],
+    }
+    for opt in argv[1:]:
+        if opt.startswith("-") and "=" in opt:
+            (name, value) = opt[1:].split("=", 1)
+            if name in ("workers", "chunk"):
+                options[name] = int(value)
+            elif name in options:
+                options[name] = value
+        else:
+            options["files"].append(opt)
+    return options
+
+
+def main(argv: list):
+    # the command line of thai_address.addresses, kept apart so that running
+    # it does not load a second copy of the module the workers unpickle from
+    logging.basicConfig(level=logging.INFO)
+    options = parse_options(argv)
+    if len(options["files"]) != 2:
+        logging.error(
+            "usage: python -m thai_address.normalize [-data=...] [-column=...] "
+            "[-workers=N] [-chunk=N] <input.csv|jsonl> <output.csv|jsonl>"
+        )
+        exit(1)
+    (input_file, output_file) = options["files"]
+
+    with open(options["data"], "r") as f:
+        keys = address_keys(json.load(f))
+
+    started = time.perf_counter()
+    counts = write_results(
+        output_file,
+        parse_addresses_parallel(
+            read_addresses(input_file, options["column"]),
+            keys,
+            options["workers"],
+            options["chunk"],
+        ),
+    )
+    elapsed = time.perf_counter() - started
+
+    total = sum(counts.values())
+    logging.info(
+        "Parsed {} addresses in {:.1f}s ({:.0f} addresses/s)".format(
+            total, elapsed, total / elapsed if elapsed else 0
+        )
+    )
+    logging.info(
+        "Rejected {}: {} {}, {} {}".format(
+            total - counts[None],
+            counts[UNPARSABLE_ADDRESS],
+            UNPARSABLE_ADDRESS,
+            counts[UNKNOWN_KEY],
+            UNKNOWN_KEY,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import pathlib
+import urllib.request
+from typing import Callable, Optional
+
+from thai_address.collation import thai_sort_key
+from thai_address.lookup import (
+    ThaiAddr,
+    ThaiAddrMiniRecord,
+    ThaiAddrRecord,
+    deep_sizeof,
+)
+
+SHARD_MANIFEST_DATA_FILE = "dist/shards/manifest.json"
+SHARD_FORMAT_VERSION = 1
+
+
+def shard_file_name(province_code: str) -> str:
+    return f"{province_code}.json"
+
+
+def flatten_province(province: dict) -> list:
+    out = []
+    for district in province["districts"]:
+        for subdistrict in district["subdistricts"]:
+            out.append(
+                {
+                    "province": province["name"],
+                    "district": district["name"],
+                    "subdistrict": subdistrict["name"],
+                    "zip": subdistrict["zip"],
+                    "subdistrictCode": subdistrict["code"],
+                    "districtCode": district["code"],
+                    "provinceCode": province["code"],
+                }
+            )
+    return out
+
+
+def encode_shard(province: dict) -> dict:
+    # the structured province tree, with children in display order so a
+    # loader can list them without collating Thai names itself
+    return {
+        "name": province["name"],
+        "code": province["code"],
+        "districts": [
+            {
+                "name": district["name"],
+                "code": district["code"],
+                "subdistricts": sort_by_name(district["subdistricts"]),
+            }
+            for district in sort_by_name(province["districts"])
+        ],
+    }
+
+
+def encode_shard_manifest(data: list, data_version: str, hashes: dict) -> dict:
+    provinces = sort_by_name(data)
+    order = {province["code"]: i for i, province in enumerate(provinces)}
+    zips = {}
+    for province in data:
+        for district in province["districts"]:
+            for subdistrict in district["subdistricts"]:
+                zips.setdefault(subdistrict["zip"], set()).add(province["code"])
+    return {
+        "version": SHARD_FORMAT_VERSION,
+        "dataVersion": data_version,
+        "provinces": [
+            {
+                "name": province["name"],
+                "code": province["code"],
+                "file": shard_file_name(province["code"]),
+                "sha256": hashes[province["code"]],
+            }
+            for province in provinces
+        ],
+        "zips": {
+            zip_code: sorted(codes, key=order.get)
+            for zip_code, codes in sorted(zips.items())
+        },
+    }
+
+
+def sort_by_name(entries: list) -> list:
+    return sorted(entries, key=lambda e: (thai_sort_key(e["name"]), e["code"]))
+
+
+class ShardedThaiAddr:
+    # Answers the same queries as ThaiAddr from a manifest and per-province
+    # shards. Province lists and zip routing come from the manifest; a shard
+    # is read, verified and indexed the first time a query reaches it.
+    __slots__ = (
+        "_read_shard",
+        "_data_version",
+        "_entries",
+        "_province_codes",
+        "_provinces",
+        "_provinces_by_code",
+        "_zips",
+        "_province_codes_by_zip",
+        "_shards",
+    )
+
+    def __init__(self, manifest: dict, read_shard: Callable[[str], bytes]):
+        if manifest.get("version") != SHARD_FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported shard format version: {manifest.get('version')}"
+            )
+        self._read_shard = read_shard
+        self._data_version = manifest["dataVersion"]
+        self._entries = {p["code"]: p for p in manifest["provinces"]}
+        self._province_codes = {code[:2]: code for code in self._entries}
+        self._provinces = tuple(
+            ThaiAddrMiniRecord(p["name"], p["code"]) for p in manifest["provinces"]
+        )
+        self._provinces_by_code = {p.code: p for p in self._provinces}
+        self._zips = tuple(manifest["zips"])
+        self._province_codes_by_zip = {
+            zip_code: tuple(codes) for zip_code, codes in manifest["zips"].items()
+        }
+        self._shards = {}
+
+    @classmethod
+    def load(cls, path: str = SHARD_MANIFEST_DATA_FILE) -> "ShardedThaiAddr":
+        shard_dir = pathlib.Path(path).parent
+        with open(path, "r") as f:
+            return cls(json.load(f), lambda file: (shard_dir / file).read_bytes())
+
+    @classmethod
+    def fetch(cls, url: str) -> "ShardedThaiAddr":
+        base_url = url.rsplit("/", 1)[0]
+
+        def read_url(location: str) -> bytes:
+            with urllib.request.urlopen(location) as response:
+                return response.read()
+
+        return cls(
+            json.loads(read_url(url)), lambda file: read_url(f"{base_url}/{file}")
+        )
+
+    def shard(self, province_code: str) -> Optional[ThaiAddr]:
+        if province_code in self._shards:
+            return self._shards[province_code]
+        entry = self._entries.get(province_code)
+        if entry is None:
+            return None
+        data = self._read_shard(entry["file"])
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise ValueError(f"shard checksum mismatch: {entry['file']}")
+        shard = ThaiAddr.from_flattened(
+            flatten_province(json.loads(data)), self._data_version
+        )
+        self._shards[province_code] = shard
+        return shard
+
+    def shard_of(self, code: str) -> Optional[ThaiAddr]:
+        province_code = self._province_codes.get(code[:2])
+        return self.shard(province_code) if province_code else None
+
+    def loaded_provinces(self) -> tuple[str, ...]:
+        return tuple(self._shards)
+
+    def find_by_zip(self, zip_code: str) -> tuple[ThaiAddrRecord, ...]:
+        # shards list subdistricts in display order, the flattened data in
+        # code order
+        records = [
+            record
+            for code in self._province_codes_by_zip.get(zip_code, ())
+            for record in self.shard(code).find_by_zip(zip_code)
+        ]
+        return tuple(sorted(records, key=lambda r: r.subdistrict_code))
+
+    def find_by_subdistrict_code(self, code: str) -> Optional[ThaiAddrRecord]:
+        shard = self.shard_of(code)
+        return shard.find_by_subdistrict_code(code) if shard else None
+
+    def zips(self) -> tuple[str, ...]:
+        return self._zips
+
+    def provinces(self, zip_code: str = None) -> tuple[ThaiAddrMiniRecord, ...]:
+        if zip_code:
+            return tuple(
+                self._provinces_by_code[code]
+                for code in self._province_codes_by_zip.get(zip_code, ())
+            )
+        return self._provinces
+
+    def districts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        shard = self.shard(code)
+        return shard.districts(code) if shard else ()
+
+    def subdistricts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        shard = self.shard_of(code)
+        return shard.subdistricts(code) if shard else ()
+
+    def data_version(self) -> str:
+        return self._data_version
+
+    def memory_usage(self) -> int:
+        manifest = deep_sizeof(
+            self._entries,
+            self._province_codes,
+            self._provinces_by_code,
+            self._zips,
+            self._province_codes_by_zip,
+        )
+        return manifest + sum(shard.memory_usage() for shard in self._shards.values())
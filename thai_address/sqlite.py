@@ -0,0 +1,224 @@
+import contextlib
+import os
+import queue
+import sqlite3
+import threading
+from typing import Iterable, Iterator, Optional
+
+from thai_address.lookup import ThaiAddrMiniRecord, ThaiAddrRecord, sort_mini_records
+
+SQLITE_DATA_FILE = "dist/thai_address.sqlite"
+SQLITE_SCHEMA_VERSION = 1
+SQLITE_POOL_SIZE = 4
+
+SCHEMA = """
+CREATE TABLE metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE provinces (code TEXT PRIMARY KEY, name TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE districts (
+    code TEXT PRIMARY KEY,
+    province_code TEXT NOT NULL REFERENCES provinces (code),
+    name TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE subdistricts (
+    code TEXT PRIMARY KEY,
+    district_code TEXT NOT NULL REFERENCES districts (code),
+    name TEXT NOT NULL,
+    zip TEXT NOT NULL
+) WITHOUT ROWID;
+-- thai names are not separated into words, so they are indexed by trigrams
+-- to match any part of a name
+CREATE VIRTUAL TABLE names USING fts5 (
+    name, code UNINDEXED, level UNINDEXED, tokenize = 'trigram'
+);
+"""
+INSERT_NAMES = """
+INSERT INTO names SELECT name, code, 'province' FROM provinces;
+INSERT INTO names SELECT name, code, 'district' FROM districts;
+INSERT INTO names SELECT name, code, 'subdistrict' FROM subdistricts;
+"""
+# created after the bulk insert, which is faster than maintaining them
+INDEXES = """
+CREATE INDEX districts_province_code ON districts (province_code);
+CREATE INDEX subdistricts_district_code ON subdistricts (district_code);
+CREATE INDEX subdistricts_zip ON subdistricts (zip, code);
+"""
+
+# sqlite3 keeps prepared statements per connection, keyed by their text, so
+# every query is a constant
+SELECT_RECORDS = """
+SELECT p.name, d.name, s.name, s.zip, s.code, d.code, p.code
+FROM subdistricts s
+JOIN districts d ON d.code = s.district_code
+JOIN provinces p ON p.code = d.province_code
+"""
+FIND_BY_ZIP = f"{SELECT_RECORDS} WHERE s.zip = ? ORDER BY s.code"
+FIND_BY_SUBDISTRICT_CODE = f"{SELECT_RECORDS} WHERE s.code = ?"
+SELECT_ZIPS = "SELECT DISTINCT zip FROM subdistricts ORDER BY zip"
+SELECT_PROVINCES = "SELECT name, code FROM provinces"
+SELECT_ZIP_PROVINCES = """
+SELECT DISTINCT p.name, p.code
+FROM subdistricts s
+JOIN districts d ON d.code = s.district_code
+JOIN provinces p ON p.code = d.province_code
+WHERE s.zip = ?
+"""
+SELECT_DISTRICTS = "SELECT name, code FROM districts WHERE province_code = ?"
+SELECT_SUBDISTRICTS = "SELECT name, code FROM subdistricts WHERE district_code = ?"
+SELECT_DATA_VERSION = "SELECT value FROM metadata WHERE key = 'data_version'"
+# the trigram index serves LIKE patterns of three characters or more
+SEARCH_NAMES = """
+SELECT name, code, level FROM names
+WHERE name LIKE '%' || ? || '%'
+ORDER BY length(name), name, code
+LIMIT ?
+"""
+LIKE_WILDCARDS = str.maketrans("", "", "%_")
+
+
+def encode_sqlite(flattened: Iterable[dict], path: str, data_version: str = ""):
+    # the subdistricts are inserted as the records are read, so only the
+    # provinces and districts are held
+    provinces = {}
+    districts = {}
+
+    def iter_subdistricts() -> Iterator[tuple]:
+        for record in flattened:
+            provinces.setdefault(record["provinceCode"], (record["province"],))
+            districts.setdefault(
+                record["districtCode"], (record["provinceCode"], record["district"])
+            )
+            yield (
+                record["subdistrictCode"],
+                record["districtCode"],
+                record["subdistrict"],
+                record["zip"],
+            )
+
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path, isolation_level=None)
+    try:
+        # a half written file is discarded anyway, so skip the journal
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.execute(f"PRAGMA user_version = {SQLITE_SCHEMA_VERSION}")
+        connection.execute("BEGIN")
+        for statement in SCHEMA.split(";")[:-1]:
+            connection.execute(statement)
+        connection.execute(
+            "INSERT INTO metadata VALUES ('data_version', ?)", (data_version,)
+        )
+        connection.executemany(
+            "INSERT OR IGNORE INTO subdistricts VALUES (?, ?, ?, ?)",
+            iter_subdistricts(),
+        )
+        connection.executemany(
+            "INSERT INTO provinces VALUES (?, ?)",
+            sorted((code, *values) for code, values in provinces.items()),
+        )
+        connection.executemany(
+            "INSERT INTO districts VALUES (?, ?, ?)",
+            sorted((code, *values) for code, values in districts.items()),
+        )
+        for statement in INSERT_NAMES.split(";")[:-1]:
+            connection.execute(statement)
+        for statement in INDEXES.split(";")[:-1]:
+            connection.execute(statement)
+        connection.execute("COMMIT")
+        connection.execute("INSERT INTO names (names) VALUES ('optimize')")
+    finally:
+        connection.close()
+
+
+class SqliteThaiAddr:
+    # Read-only queries over dist/thai_address.sqlite. Connections are opened
+    # on demand, up to pool_size, and reused by the threads that ask for them.
+    def __init__(self, path: str = SQLITE_DATA_FILE, pool_size: int = SQLITE_POOL_SIZE):
+        self._path = path
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._opened = 0
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            (version,) = connection.execute("PRAGMA user_version").fetchone()
+        if version != SQLITE_SCHEMA_VERSION:
+            self.close()
+            raise ValueError(f"unsupported sqlite schema version: {version}")
+
+    def __enter__(self) -> "SqliteThaiAddr":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextlib.contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            connection = self._open() or self._pool.get()
+        try:
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    def _open(self) -> Optional[sqlite3.Connection]:
+        # None once pool_size connections are open, to wait for a free one
+        with self._lock:
+            if self._opened >= self._pool_size:
+                return None
+            connection = sqlite3.connect(
+                f"file:{self._path}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                isolation_level=None,
+            )
+            self._opened += 1
+            return connection
+
+    def _query(self, sql: str, *params) -> list:
+        with self._connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def find_by_zip(self, zip_code: str) -> tuple[ThaiAddrRecord, ...]:
+        return tuple(ThaiAddrRecord(*row) for row in self._query(FIND_BY_ZIP, zip_code))
+
+    def find_by_subdistrict_code(self, code: str) -> Optional[ThaiAddrRecord]:
+        rows = self._query(FIND_BY_SUBDISTRICT_CODE, code)
+        return ThaiAddrRecord(*rows[0]) if rows else None
+
+    def zips(self) -> tuple[str, ...]:
+        return tuple(zip_code for (zip_code,) in self._query(SELECT_ZIPS))
+
+    def provinces(self, zip_code: str = None) -> tuple[ThaiAddrMiniRecord, ...]:
+        if zip_code:
+            return mini_records(self._query(SELECT_ZIP_PROVINCES, zip_code))
+        return mini_records(self._query(SELECT_PROVINCES))
+
+    def districts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        return mini_records(self._query(SELECT_DISTRICTS, code))
+
+    def subdistricts(self, code: str) -> tuple[ThaiAddrMiniRecord, ...]:
+        return mini_records(self._query(SELECT_SUBDISTRICTS, code))
+
+    def search(self, name: str, limit: int = 10) -> tuple[tuple[str, str, str], ...]:
+        # (name, code, level) of names containing the query, shortest first
+        pattern = name.strip().translate(LIKE_WILDCARDS)
+        if not pattern:
+            return ()
+        return tuple(self._query(SEARCH_NAMES, pattern, limit))
+
+    def data_version(self) -> str:
+        rows = self._query(SELECT_DATA_VERSION)
+        return rows[0][0] if rows else ""
+
+
+def mini_records(rows: list) -> tuple[ThaiAddrMiniRecord, ...]:
+    return sort_mini_records(ThaiAddrMiniRecord(*row) for row in rows)
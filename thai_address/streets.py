@@ -0,0 +1,73 @@
+import bisect
+import json
+import re
+from typing import Optional
+
+STREET_ZIPS_DATA_FILE = "dist/street_zips.json"
+STREET_ZIPS_FORMAT_VERSION = 1
+
+STREET_PREFIXES = ((re.compile(r"^ซ\.\s*"), "ซอย"), (re.compile(r"^ถ\.\s*"), "ถนน"))
+
+
+class StreetZipIndex:
+    # Interval index over the "เฉพาะซอย..." qualifiers of the exceptional zip
+    # rules: per subdistrict and street, the number ranges are kept sorted by
+    # their first number so a lookup is one bisect.
+    __slots__ = ("_subdistricts",)
+
+    def __init__(self, data: dict):
+        if data.get("version") != STREET_ZIPS_FORMAT_VERSION:
+            raise ValueError(
+                f"unsupported street zips format version: {data.get('version')}"
+            )
+        self._subdistricts = {
+            code: (subdistrict["zip"], build_intervals(subdistrict["streets"]))
+            for code, subdistrict in data["subdistricts"].items()
+        }
+
+    @classmethod
+    def load(cls, path: str = STREET_ZIPS_DATA_FILE) -> "StreetZipIndex":
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self._subdistricts)
+
+    def __contains__(self, subdistrict_code: str) -> bool:
+        return subdistrict_code in self._subdistricts
+
+    def resolve_zip(
+        self, subdistrict_code: str, street: str, number: int
+    ) -> Optional[str]:
+        # None when the subdistrict has no street qualifiers, so its own zip
+        # applies; otherwise the zip of the matching range, or the
+        # subdistrict's own zip for every other street and number
+        if subdistrict_code not in self._subdistricts:
+            return None
+        (zip_code, streets) = self._subdistricts[subdistrict_code]
+        intervals = streets.get(normalize_street(street))
+        if intervals is None:
+            return zip_code
+        (firsts, lasts, zips) = intervals
+        i = bisect.bisect_right(firsts, number) - 1
+        if i >= 0 and number <= lasts[i]:
+            return zips[i]
+        return zip_code
+
+
+def build_intervals(streets: dict) -> dict:
+    intervals = {}
+    for street, ranges in streets.items():
+        ranges = sorted(ranges)
+        for previous, current in zip(ranges, ranges[1:]):
+            if current[0] <= previous[1]:
+                raise ValueError(f"overlapping number ranges for {street}: {ranges}")
+        intervals[normalize_street(street)] = tuple(map(tuple, zip(*ranges)))
+    return intervals
+
+
+def normalize_street(street: str) -> str:
+    street = street.strip()
+    for pattern, prefix in STREET_PREFIXES:
+        street = pattern.sub(prefix, street)
+    return re.sub(r"\s+", "", street)
@@ -0,0 +1,58 @@
+import pytest
+
+from thai_address.addresses import (
+    address_keys,
+    parse_address,
+    parse_addresses,
+    parse_addresses_parallel,
+)
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+ADDRESS = "99/1 ม.2 ต.บางแก้ว อ.บางพลี จ.สมุทรปราการ 10540"
+
+
+def test_parse_address():
+    data = ADDRESS
+
+    result = parse_address(data)
+
+    assert result == {"zip": "10540", "key": "สมุทรปราการ_บางพลี_บางแก้ว"}
+
+
+def test_parse_address_with_long_prefixes():
+    data = "1 แขวงพระบรมมหาราชวัง เขตพระนคร กรุงเทพมหานคร 10200"
+
+    result = parse_address(data)
+
+    assert result == {"zip": "10200", "key": "กรุงเทพมหานคร_พระนคร_พระบรมมหาราชวัง"}
+
+
+def test_parse_address_with_zip_before_trailing_text():
+    data = "ต.บางแก้ว อ.บางพลี จ.สมุทรปราการ 10540 (ที่ทำงาน)"
+
+    result = parse_address(data)
+
+    assert result["zip"] == "10540"
+
+
+def test_parse_unparsable_address():
+    with pytest.raises(ValueError):
+        parse_address("ไม่มีรหัสไปรษณีย์")
+
+
+def test_parse_addresses_checks_keys():
+    keys = address_keys(FLATTENED_DATA)
+    data = [ADDRESS, "ต.ไม่มี อ.บางพลี จ.สมุทรปราการ 10540", "ไม่มีรหัส"]
+
+    result = [r["error"] for r in parse_addresses(data, keys)]
+
+    assert result == [None, "unknown key", "unparsable address"]
+
+
+def test_parse_addresses_parallel_keeps_input_order():
+    keys = address_keys(FLATTENED_DATA)
+    data = [ADDRESS.replace("99/1", f"99/{i}") for i in range(50)] + ["ไม่มีรหัส"]
+
+    result = list(parse_addresses_parallel(data, keys, workers=2, chunk_size=7))
+
+    assert result == list(parse_addresses(data, keys))
@@ -0,0 +1,54 @@
+import pytest
+
+from thai_address.binary import BinaryThaiAddr, encode_binary
+from thai_address.lookup import ThaiAddr
+from thai_address_tests.lookup_parity import assert_same_lookups
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+
+@pytest.fixture
+def binary_addr(tmp_path):
+    path = tmp_path / "thai_address.bin"
+    path.write_bytes(encode_binary(FLATTENED_DATA, "25660901"))
+    with BinaryThaiAddr(str(path)) as addr:
+        yield addr
+
+
+def test_binary_lookups_match_in_memory_lookups(binary_addr):
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    assert len(binary_addr) == len(addr)
+    assert_same_lookups(binary_addr, addr)
+
+
+def test_binary_unknown_keys(binary_addr):
+    assert binary_addr.find_by_zip("99999") == ()
+    assert binary_addr.find_by_zip("abc") == ()
+    assert binary_addr.find_by_subdistrict_code("11030300") is None
+    assert binary_addr.districts("12000000") == ()
+    assert binary_addr.subdistricts("") == ()
+
+
+def test_binary_data_version(binary_addr):
+    assert binary_addr.data_version() == "25660901"
+
+
+def test_encode_binary_sorts_a_stream_of_records():
+    result = encode_binary(reversed(FLATTENED_DATA), "25660901")
+
+    assert result == encode_binary(FLATTENED_DATA, "25660901")
+
+
+def test_encode_binary_rejects_non_numeric_code():
+    data = [FLATTENED_DATA[0] | {"zip": "1054"}]
+
+    with pytest.raises(ValueError):
+        encode_binary(data)
+
+
+def test_binary_rejects_unknown_file(tmp_path):
+    path = tmp_path / "thai_address.bin"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        BinaryThaiAddr(str(path))
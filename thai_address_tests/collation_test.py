@@ -0,0 +1,17 @@
+from thai_address.collation import thai_sort_key
+
+
+def test_thai_sort_key_orders_leading_vowel_by_consonant():
+    data = ["สมุทรปราการ", "เชียงใหม่", "กรุงเทพมหานคร"]
+
+    result = sorted(data, key=thai_sort_key)
+
+    assert result == ["กรุงเทพมหานคร", "เชียงใหม่", "สมุทรปราการ"]
+
+
+def test_thai_sort_key_ignores_tone_marks_before_tie_break():
+    data = ["ก้า", "กาก", "กา"]
+
+    result = sorted(data, key=thai_sort_key)
+
+    assert result == ["กา", "ก้า", "กาก"]
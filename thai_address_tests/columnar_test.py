@@ -0,0 +1,42 @@
+import pytest
+
+from thai_address.columnar import decode_columnar, encode_columnar
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+
+def test_encode_columnar():
+    result = encode_columnar(FLATTENED_DATA)
+
+    assert result == {
+        "version": 1,
+        "provinces": {
+            "name": ["สมุทรปราการ", "เชียงใหม่"],
+            "code": ["11000000", "50000000"],
+        },
+        "districts": {
+            "name": ["บางพลี", "เมืองเชียงใหม่"],
+            "code": ["11030000", "50010000"],
+            "province": [0, 1],
+        },
+        "subdistricts": {
+            "name": ["บางพลีใหญ่", "บางแก้ว", "ศรีภูมิ"],
+            "code": ["11030100", "11030200", "50010100"],
+            "zip": ["10540", "10540", "50200"],
+            "district": [0, 0, 1],
+        },
+    }
+
+
+def test_decode_columnar_restores_flattened_data():
+    data = encode_columnar(FLATTENED_DATA)
+
+    result = decode_columnar(data)
+
+    assert result == FLATTENED_DATA
+
+
+def test_decode_columnar_rejects_unknown_version():
+    data = encode_columnar(FLATTENED_DATA) | {"version": 99}
+
+    with pytest.raises(ValueError):
+        decode_columnar(data)
@@ -0,0 +1,82 @@
+import pytest
+
+from thai_address.delta import apply_delta, diff_flattened
+from thai_address.lookup import ThaiAddr
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+NEW_FLATTENED_DATA = [
+    FLATTENED_DATA[0] | {"zip": "10541"},
+    FLATTENED_DATA[1] | {"subdistrict": "บางแก้วใหม่"},
+    FLATTENED_DATA[2] | {"province": "จังหวัดเชียงใหม่"},
+    {
+        "province": "จังหวัดเชียงใหม่",
+        "district": "เมืองเชียงใหม่",
+        "subdistrict": "พระสิงห์",
+        "zip": "50200",
+        "subdistrictCode": "50010200",
+        "districtCode": "50010000",
+        "provinceCode": "50000000",
+    },
+]
+
+
+def test_diff_flattened():
+    result = diff_flattened(FLATTENED_DATA, NEW_FLATTENED_DATA, "1", "2")
+
+    assert result == {
+        "version": 1,
+        "from": "1",
+        "to": "2",
+        "provinces": {
+            "added": {},
+            "removed": [],
+            "renamed": {"50000000": "จังหวัดเชียงใหม่"},
+        },
+        "districts": {"added": {}, "removed": [], "renamed": {}},
+        "subdistricts": {
+            "added": {
+                "50010200": {
+                    "name": "พระสิงห์",
+                    "districtCode": "50010000",
+                    "zip": "50200",
+                }
+            },
+            "removed": [],
+            "renamed": {"11030200": "บางแก้วใหม่"},
+            "zip": {"11030100": "10541"},
+        },
+    }
+
+
+def test_apply_delta_restores_new_data():
+    delta = diff_flattened(FLATTENED_DATA, NEW_FLATTENED_DATA, "1", "2")
+
+    result = apply_delta(FLATTENED_DATA, delta)
+
+    assert result == NEW_FLATTENED_DATA
+
+
+def test_apply_delta_removes_subdistricts():
+    delta = diff_flattened(FLATTENED_DATA, FLATTENED_DATA[:1], "1", "2")
+
+    result = apply_delta(FLATTENED_DATA, delta)
+
+    assert result == FLATTENED_DATA[:1]
+    assert delta["provinces"]["removed"] == ["50000000"]
+
+
+def test_apply_delta_rejects_unknown_version():
+    delta = diff_flattened(FLATTENED_DATA, NEW_FLATTENED_DATA, "1", "2")
+
+    with pytest.raises(ValueError):
+        apply_delta(FLATTENED_DATA, delta | {"version": 99})
+
+
+def test_thai_addr_with_delta():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA, "1")
+    delta = diff_flattened(FLATTENED_DATA, NEW_FLATTENED_DATA, "1", "2")
+
+    result = addr.with_delta(delta)
+
+    assert result.data_version() == "2"
+    assert result.find_by_zip("10541")[0].subdistrict_code == "11030100"
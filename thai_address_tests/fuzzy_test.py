@@ -0,0 +1,78 @@
+import pytest
+
+from thai_address.fuzzy import AddressMatcher, encode_match_index, normalize_name
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+
+def test_normalize_name():
+    data = ["จ.สมุทรปราการ", "อำเภอ บางพลี", "ต.บางแก้ว", "ศรีภูมิ", "ศรีภู่มิ"]
+
+    result = [normalize_name(name) for name in data]
+
+    assert result == ["สมุทรปราการ", "บางพลี", "บางแกว", "ศรีภูมิ", "ศรีภูมิ"]
+
+
+def test_normalize_decomposed_sara_am():
+    data = "นํา"
+
+    result = normalize_name(data)
+
+    assert result == "นำ"
+
+
+def test_encode_match_index():
+    result = encode_match_index(FLATTENED_DATA)
+
+    assert result == {
+        "version": 1,
+        "provinces": [["11000000", "สมุทรปราการ"], ["50000000", "เชียงใหม"]],
+        "districts": [
+            ["11030000", "11000000", "บางพลี"],
+            ["50010000", "50000000", "เมืองเชียงใหม"],
+        ],
+        "subdistricts": [
+            ["11030100", "11030000", "บางพลีใหญ"],
+            ["11030200", "11030000", "บางแกว"],
+            ["50010100", "50010000", "ศรีภูมิ"],
+        ],
+    }
+
+
+def test_match_exact_names():
+    matcher = AddressMatcher.from_flattened(FLATTENED_DATA)
+
+    result = matcher.match("สมุทรปราการ", "บางพลี", "บางแก้ว", limit=2)
+
+    assert [m.subdistrict_code for m in result] == ["11030200", "11030100"]
+    assert result[0].score == 1.0
+
+
+def test_match_misspelled_names():
+    matcher = AddressMatcher.from_flattened(FLATTENED_DATA)
+
+    result = matcher.match("จ.สมุทปราการ", "อ.บางพลี", "ต.บางพลีไหญ่", limit=1)
+
+    assert [m.subdistrict_code for m in result] == ["11030100"]
+
+
+def test_match_address():
+    matcher = AddressMatcher.from_flattened(FLATTENED_DATA)
+
+    result = matcher.match_address(
+        "1 ต.ศรีภุมิ อ.เมืองเชียงใหม จ.เชียงใหม่ 50200", limit=1
+    )
+
+    assert [m.subdistrict_code for m in result] == ["50010100"]
+
+
+def test_match_unparsable_address():
+    matcher = AddressMatcher.from_flattened(FLATTENED_DATA)
+
+    result = matcher.match_address("เชียงใหม่")
+
+    assert result == ()
+
+
+def test_reject_unsupported_version():
+    with pytest.raises(ValueError):
+        AddressMatcher({"version": 2})
@@ -0,0 +1,20 @@
+from thai_address.lookup import ThaiAddr
+
+
+def assert_same_lookups(actual, expected: ThaiAddr):
+    # every query of expected's zips, provinces, districts and subdistricts
+    assert actual.zips() == expected.zips()
+    assert actual.provinces() == expected.provinces()
+    for zip_code in expected.zips():
+        assert actual.find_by_zip(zip_code) == expected.find_by_zip(zip_code)
+        assert actual.provinces(zip_code) == expected.provinces(zip_code)
+    for province in expected.provinces():
+        assert actual.districts(province.code) == expected.districts(province.code)
+        for district in expected.districts(province.code):
+            assert actual.subdistricts(district.code) == expected.subdistricts(
+                district.code
+            )
+            for subdistrict in expected.subdistricts(district.code):
+                assert actual.find_by_subdistrict_code(
+                    subdistrict.code
+                ) == expected.find_by_subdistrict_code(subdistrict.code)
@@ -0,0 +1,109 @@
+from thai_address.lookup import ThaiAddr, ThaiAddrMiniRecord
+
+FLATTENED_DATA = [
+    {
+        "province": "สมุทรปราการ",
+        "district": "บางพลี",
+        "subdistrict": "บางพลีใหญ่",
+        "zip": "10540",
+        "subdistrictCode": "11030100",
+        "districtCode": "11030000",
+        "provinceCode": "11000000",
+    },
+    {
+        "province": "สมุทรปราการ",
+        "district": "บางพลี",
+        "subdistrict": "บางแก้ว",
+        "zip": "10540",
+        "subdistrictCode": "11030200",
+        "districtCode": "11030000",
+        "provinceCode": "11000000",
+    },
+    {
+        "province": "เชียงใหม่",
+        "district": "เมืองเชียงใหม่",
+        "subdistrict": "ศรีภูมิ",
+        "zip": "50200",
+        "subdistrictCode": "50010100",
+        "districtCode": "50010000",
+        "provinceCode": "50000000",
+    },
+]
+
+
+def test_find_by_zip():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.find_by_zip("10540")
+
+    assert [r.subdistrict_code for r in result] == ["11030100", "11030200"]
+
+
+def test_find_by_unknown_zip():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.find_by_zip("99999")
+
+    assert result == ()
+
+
+def test_find_by_subdistrict_code():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.find_by_subdistrict_code("50010100")
+
+    assert result.to_flattened() == FLATTENED_DATA[2]
+
+
+def test_zips():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.zips()
+
+    assert result == ("10540", "50200")
+
+
+def test_provinces():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.provinces()
+
+    assert result == (
+        ThaiAddrMiniRecord("เชียงใหม่", "50000000"),
+        ThaiAddrMiniRecord("สมุทรปราการ", "11000000"),
+    )
+
+
+def test_provinces_by_zip():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.provinces("50200")
+
+    assert result == (ThaiAddrMiniRecord("เชียงใหม่", "50000000"),)
+
+
+def test_districts():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.districts("11000000")
+
+    assert result == (ThaiAddrMiniRecord("บางพลี", "11030000"),)
+
+
+def test_subdistricts():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    result = addr.subdistricts("11030000")
+
+    assert result == (
+        ThaiAddrMiniRecord("บางแก้ว", "11030200"),
+        ThaiAddrMiniRecord("บางพลีใหญ่", "11030100"),
+    )
+
+
+def test_records_share_interned_names():
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    first, second = addr.find_by_zip("10540")
+
+    assert first.province is second.province
@@ -0,0 +1,72 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+from thai_address.normalize import main
+from thai_address_tests.addresses_test import ADDRESS
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+
+def test_main_streams_csv_to_jsonl(tmp_path):
+    data_file = tmp_path / "flattened_data.json"
+    data_file.write_text(json.dumps(FLATTENED_DATA, ensure_ascii=False))
+    input_file = tmp_path / "addresses.csv"
+    input_file.write_text(f"id,address\n1,{ADDRESS}\n2,ไม่มีรหัส\n", encoding="utf-8")
+    output_file = tmp_path / "addresses.jsonl"
+
+    main(
+        [
+            "addresses",
+            f"-data={data_file}",
+            "-workers=1",
+            f"{input_file}",
+            f"{output_file}",
+        ]
+    )
+
+    with open(output_file, encoding="utf-8") as f:
+        result = [json.loads(line) for line in f]
+    assert result == [
+        {
+            "address": ADDRESS,
+            "zip": "10540",
+            "key": "สมุทรปราการ_บางพลี_บางแก้ว",
+            "error": None,
+        },
+        {
+            "address": "ไม่มีรหัส",
+            "zip": None,
+            "key": None,
+            "error": "unparsable address",
+        },
+    ]
+
+
+def test_module_runs_without_reimport_warning(tmp_path):
+    data_file = tmp_path / "flattened_data.json"
+    data_file.write_text(json.dumps(FLATTENED_DATA, ensure_ascii=False))
+    input_file = tmp_path / "addresses.jsonl"
+    input_file.write_text(
+        json.dumps({"address": ADDRESS}, ensure_ascii=False) + "\n", encoding="utf-8"
+    )
+    output_file = tmp_path / "addresses.csv"
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "thai_address.normalize",
+            f"-data={data_file}",
+            "-workers=2",
+            f"{input_file}",
+            f"{output_file}",
+        ],
+        cwd=pathlib.Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert "RuntimeWarning" not in result.stderr
+    assert "Parsed 1 addresses" in result.stderr
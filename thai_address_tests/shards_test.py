@@ -0,0 +1,122 @@
+import hashlib
+import json
+
+import pytest
+
+from thai_address.lookup import ThaiAddr, ThaiAddrMiniRecord
+from thai_address.shards import (
+    ShardedThaiAddr,
+    encode_shard,
+    encode_shard_manifest,
+    flatten_province,
+)
+
+STRUCTURED_DATA = [
+    {
+        "name": "สมุทรปราการ",
+        "code": "11000000",
+        "districts": [
+            {
+                "name": "บางพลี",
+                "code": "11030000",
+                "subdistricts": [
+                    {"name": "บางพลีใหญ่", "code": "11030100", "zip": "10540"},
+                    {"name": "บางแก้ว", "code": "11030200", "zip": "10540"},
+                ],
+            }
+        ],
+    },
+    {
+        "name": "เชียงใหม่",
+        "code": "50000000",
+        "districts": [
+            {
+                "name": "เมืองเชียงใหม่",
+                "code": "50010000",
+                "subdistricts": [
+                    {"name": "ศรีภูมิ", "code": "50010100", "zip": "50200"},
+                ],
+            }
+        ],
+    },
+]
+
+
+def write_shards(shard_dir) -> str:
+    hashes = {}
+    for province in STRUCTURED_DATA:
+        shard = json.dumps(encode_shard(province), ensure_ascii=False).encode()
+        (shard_dir / f"{province['code']}.json").write_bytes(shard)
+        hashes[province["code"]] = hashlib.sha256(shard).hexdigest()
+    manifest = shard_dir / "manifest.json"
+    manifest.write_text(
+        json.dumps(encode_shard_manifest(STRUCTURED_DATA, "25660901", hashes))
+    )
+    return str(manifest)
+
+
+def test_encode_shard_sorts_children_by_name():
+    result = encode_shard(STRUCTURED_DATA[0])
+
+    assert [s["name"] for s in result["districts"][0]["subdistricts"]] == [
+        "บางแก้ว",
+        "บางพลีใหญ่",
+    ]
+
+
+def test_encode_shard_manifest_routes_zips():
+    result = encode_shard_manifest(
+        STRUCTURED_DATA, "25660901", {"11000000": "a", "50000000": "b"}
+    )
+
+    assert result["zips"] == {"10540": ["11000000"], "50200": ["50000000"]}
+    assert [(p["code"], p["file"]) for p in result["provinces"]] == [
+        ("50000000", "50000000.json"),
+        ("11000000", "11000000.json"),
+    ]
+
+
+def test_sharded_matches_full_data(tmp_path):
+    full = ThaiAddr.from_flattened(
+        [r for province in STRUCTURED_DATA for r in flatten_province(province)]
+    )
+
+    sharded = ShardedThaiAddr.load(write_shards(tmp_path))
+
+    assert sharded.find_by_zip("10540") == full.find_by_zip("10540")
+    assert sharded.find_by_subdistrict_code("50010100") == (
+        full.find_by_subdistrict_code("50010100")
+    )
+    assert sharded.zips() == full.zips()
+    assert sharded.provinces() == full.provinces()
+    assert sharded.districts("11000000") == full.districts("11000000")
+    assert sharded.subdistricts("11030000") == full.subdistricts("11030000")
+    assert sharded.data_version() == "25660901"
+
+
+def test_sharded_reads_only_queried_provinces(tmp_path):
+    sharded = ShardedThaiAddr.load(write_shards(tmp_path))
+
+    provinces = sharded.provinces("50200")
+    records = sharded.find_by_zip("50200")
+
+    assert provinces == (ThaiAddrMiniRecord("เชียงใหม่", "50000000"),)
+    assert [r.subdistrict for r in records] == ["ศรีภูมิ"]
+    assert sharded.loaded_provinces() == ("50000000",)
+
+
+def test_sharded_unknown_codes(tmp_path):
+    sharded = ShardedThaiAddr.load(write_shards(tmp_path))
+
+    assert sharded.find_by_zip("99999") == ()
+    assert sharded.find_by_subdistrict_code("99010100") is None
+    assert sharded.districts("99000000") == ()
+    assert sharded.loaded_provinces() == ()
+
+
+def test_sharded_rejects_modified_shard(tmp_path):
+    sharded = ShardedThaiAddr.load(write_shards(tmp_path))
+    (tmp_path / "11000000.json").write_text("{}")
+
+    with pytest.raises(ValueError):
+        sharded.find_by_zip("10540")
@@ -0,0 +1,66 @@
+import concurrent.futures
+import sqlite3
+
+import pytest
+
+from thai_address.lookup import ThaiAddr
+from thai_address.sqlite import SqliteThaiAddr, encode_sqlite
+from thai_address_tests.lookup_parity import assert_same_lookups
+from thai_address_tests.lookup_test import FLATTENED_DATA
+
+
+@pytest.fixture
+def sqlite_addr(tmp_path):
+    path = tmp_path / "thai_address.sqlite"
+    encode_sqlite(FLATTENED_DATA, str(path), "25660901")
+    with SqliteThaiAddr(str(path)) as addr:
+        yield addr
+
+
+def test_sqlite_lookups_match_in_memory_lookups(sqlite_addr):
+    addr = ThaiAddr.from_flattened(FLATTENED_DATA)
+
+    assert_same_lookups(sqlite_addr, addr)
+
+
+def test_sqlite_unknown_keys(sqlite_addr):
+    assert sqlite_addr.find_by_zip("99999") == ()
+    assert sqlite_addr.find_by_subdistrict_code("11030300") is None
+    assert sqlite_addr.districts("12000000") == ()
+    assert sqlite_addr.subdistricts("") == ()
+
+
+def test_sqlite_data_version(sqlite_addr):
+    assert sqlite_addr.data_version() == "25660901"
+
+
+def test_sqlite_search_names(sqlite_addr):
+    result = sqlite_addr.search("บางพลี")
+
+    assert result == (
+        ("บางพลี", "11030000", "district"),
+        ("บางพลีใหญ่", "11030100", "subdistrict"),
+    )
+
+
+def test_sqlite_search_ignores_wildcards(sqlite_addr):
+    assert sqlite_addr.search("%") == ()
+    assert sqlite_addr.search("บ_งแก้ว") == ()
+    assert sqlite_addr.search("บาง%แก้ว") == sqlite_addr.search("บางแก้ว")
+
+
+def test_sqlite_is_read_only(sqlite_addr):
+    with pytest.raises(sqlite3.OperationalError):
+        sqlite_addr._query("DELETE FROM provinces")
+
+
+def test_sqlite_pool_serves_threads(tmp_path):
+    path = tmp_path / "thai_address.sqlite"
+    encode_sqlite(FLATTENED_DATA, str(path), "25660901")
+
+    with SqliteThaiAddr(str(path), pool_size=2) as addr:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(addr.find_by_zip, ["10540"] * 100))
+
+    assert all(len(r) == 2 for r in results)
+    assert addr._opened <= 2
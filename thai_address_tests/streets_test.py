@@ -0,0 +1,77 @@
+import pytest
+
+from thai_address.streets import StreetZipIndex
+
+STREET_ZIPS_DATA = {
+    "version": 1,
+    "subdistricts": {
+        "10270300": {
+            "zip": "10240",
+            "streets": {"ซอยนวมินทร์": [[103, 111, "10230"]]},
+        },
+        "10270200": {
+            "zip": "10240",
+            "streets": {"ซอยนวมินทร์": [[74, 74, "10230"], [64, 68, "10230"]]},
+        },
+    },
+}
+
+
+def test_resolve_zip_within_range():
+    index = StreetZipIndex(STREET_ZIPS_DATA)
+
+    result = [index.resolve_zip("10270200", "ซอยนวมินทร์", n) for n in (64, 66, 68, 74)]
+
+    assert result == ["10230", "10230", "10230", "10230"]
+
+
+def test_resolve_zip_outside_ranges_falls_back_to_district_zip():
+    index = StreetZipIndex(STREET_ZIPS_DATA)
+
+    result = [index.resolve_zip("10270200", "ซอยนวมินทร์", n) for n in (1, 69, 73, 75)]
+
+    assert result == ["10240", "10240", "10240", "10240"]
+
+
+def test_resolve_zip_on_other_street_falls_back_to_district_zip():
+    index = StreetZipIndex(STREET_ZIPS_DATA)
+
+    result = index.resolve_zip("10270300", "ถนนรามอินทรา", 105)
+
+    assert result == "10240"
+
+
+def test_resolve_zip_normalizes_street():
+    index = StreetZipIndex(STREET_ZIPS_DATA)
+
+    result = index.resolve_zip("10270300", "ซ. นวมินทร์", 105)
+
+    assert result == "10230"
+
+
+def test_resolve_zip_of_unqualified_subdistrict():
+    index = StreetZipIndex(STREET_ZIPS_DATA)
+
+    result = index.resolve_zip("10270100", "ซอยนวมินทร์", 105)
+
+    assert result is None
+
+
+def test_reject_overlapping_ranges():
+    data = {
+        "version": 1,
+        "subdistricts": {
+            "10270300": {
+                "zip": "10240",
+                "streets": {"ซอยนวมินทร์": [[103, 111, "10230"], [111, 113, "10510"]]},
+            }
+        },
+    }
+
+    with pytest.raises(ValueError):
+        StreetZipIndex(data)
+
+
+def test_reject_unsupported_version():
+    with pytest.raises(ValueError):
+        StreetZipIndex({"version": 2, "subdistricts": {}})